@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Фоновое автосохранение сцены.
+
+Редактор между командами передает автосохранению снимок сцены - поверхностную
+копию словаря фигур. Снимок записывается в файл фоновым потоком, а редактор
+продолжает работу. Фигуры при этом не копируются: пока снимок записывается,
+редактор перед изменением фигуры заменяет ее копией (копирование при записи,
+см. VectorEditor._writable_shapes), поэтому в файл попадает согласованное
+состояние сцены на момент снимка. Файл записывается во временный файл
+и атомарно переименовывается.
+"""
+
+import os
+import threading
+import time
+
+
+class Autosaver:
+    """Фоновая запись снимков сцены в файл."""
+    
+    def __init__(self, path, interval, codec='zlib'):
+        """
+        Инициализация автосохранения.
+        
+        Args:
+            path (str): Путь файла сцены
+            interval (float): Минимальный интервал между сохранениями в секундах
+            codec (str, optional): Кодек сжатого формата ('zlib' или 'lzma')
+        """
+        self.path = path
+        self.interval = interval
+        self.codec = codec
+        self.saves = 0  # Количество выполненных сохранений
+        self.last_duration = 0.0  # Длительность последнего сохранения в секундах
+        self.last_error = None  # Ошибка последнего сохранения
+        self._snapshot = None  # Записываемый снимок (словарь фигур) или None
+        self._next_id = None
+        self._last_snapshot = 0.0
+        self._stopping = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+        self._thread.start()
+    
+    @property
+    def snapshot(self):
+        """
+        Получить снимок, который еще не записан.
+        
+        Returns:
+            dict: Словарь фигур снимка или None, если запись не выполняется
+        """
+        return self._snapshot
+    
+    def due(self):
+        """
+        Проверить, пора ли делать следующий снимок.
+        
+        Returns:
+            bool: True, если интервал истек и предыдущий снимок уже записан
+        """
+        return self._snapshot is None and time.monotonic() - self._last_snapshot >= self.interval
+    
+    def offer(self, shapes, next_id):
+        """
+        Передать снимок сцены фоновому потоку.
+        
+        Вызывается редактором между командами; копируется только словарь фигур.
+        
+        Args:
+            shapes (dict): Словарь фигур редактора
+            next_id (int): Следующий свободный ID
+        
+        Returns:
+            bool: True, если снимок принят (предыдущий уже записан)
+        """
+        with self._condition:
+            if self._snapshot is not None or self._stopping:
+                return False
+            self._snapshot = dict(shapes)
+            self._next_id = next_id
+            self._last_snapshot = time.monotonic()
+            self._condition.notify()
+        return True
+    
+    def stop(self):
+        """Дождаться записи последнего снимка и остановить фоновый поток."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join()
+    
+    def _run(self):
+        """Цикл фонового потока: ждать снимок и записывать его."""
+        while True:
+            with self._condition:
+                while self._snapshot is None and not self._stopping:
+                    self._condition.wait()
+                if self._snapshot is None:
+                    return
+                shapes, next_id = self._snapshot, self._next_id
+            self._write(shapes, next_id)
+            with self._condition:
+                self._snapshot = None
+    
+    def _write(self, shapes, next_id):
+        """Записать снимок во временный файл и атомарно заменить им файл сцены."""
+        from scene_format import write_scene
+        
+        start = time.perf_counter()
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'wb') as file:
+                write_scene(file, shapes, next_id, self.codec)
+            os.replace(temp_path, self.path)
+            self.last_error = None
+            self.saves += 1
+        except Exception as e:
+            self.last_error = e
+        self.last_duration = time.perf_counter() - start
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Контроль регрессий производительности редактора.
+
+Выполняет набор бенчмарков основных операций:
+  create.<тип>  - создание фигур каждого типа командой create (разбор
+                  параметров, конструктор, добавление в индексы);
+  info          - get_info() для всех фигур сцены;
+  to_json       - to_json() для всех фигур сцены;
+  list          - вывод команды list;
+  save_load     - сохранение и загрузка сцены (pickle);
+  save_load.compressed - то же в сжатом поколоночном формате.
+
+Для каждой операции измеряются медианное время и пиковый объем выделенной
+памяти (tracemalloc). Результаты сравниваются с базовыми значениями
+для текущей машины из JSON-файла; если время или память выросли больше
+допустимого порога, скрипт завершается с кодом 1. При первом запуске
+на машине (или с флагом --update) результаты сохраняются как базовые.
+
+Использование:
+    python3 bench_regression.py [--count N] [--runs N] [--threshold PCT]
+                                [--memory-threshold PCT] [--baseline FILE]
+                                [--machine NAME] [--update]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench_utils import generate_scene
+from main import VectorEditor
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baselines.json')
+
+
+def machine_key():
+    """
+    Получить ключ текущей машины для базовых значений.
+    
+    Returns:
+        str: Имя хоста, архитектура и версия интерпретатора
+    """
+    return f"{platform.node()}-{platform.machine()}-{platform.python_implementation()}" \
+           f"{'.'.join(platform.python_version_tuple()[:2])}"
+
+
+def make_editor(shapes=None):
+    """
+    Создать редактор без запросов подтверждения.
+    
+    Args:
+        shapes (dict, optional): Фигуры сцены
+    
+    Returns:
+        VectorEditor: Редактор
+    """
+    editor = VectorEditor()
+    editor.assume_yes = True
+    if shapes:
+        editor.shapes = dict(shapes)
+        editor.next_id = max(shapes) + 1
+        editor._rebuild_indexes()
+    return editor
+
+
+def create_benchmark(shape_type, params, count):
+    """Получить бенчмарк создания фигур одного типа командой create."""
+    args = [shape_type] + [str(index + 3) for index in range(len(params))]
+    
+    def run():
+        editor = make_editor()
+        create = editor.create_shape
+        for _ in range(count):
+            create(args)
+    
+    return run
+
+
+def build_benchmarks(count, directory):
+    """
+    Получить набор бенчмарков.
+    
+    Args:
+        count (int): Количество фигур в сцене
+        directory (str): Каталог для временных файлов
+    
+    Returns:
+        dict: Имя операции -> функция без аргументов
+    """
+    benchmarks = {}
+    for shape_type, info in VectorEditor().shape_types.items():
+        if info['params'] is not None:
+            # Для многоугольника и ломаной - координаты минимального количества вершин
+            params = 2 * info['min_points'] * ['x'] if 'min_points' in info else info['params']
+            benchmarks[f'create.{shape_type}'] = create_benchmark(shape_type, params, max(count // 9, 1))
+    
+    scene = generate_scene(count)
+    editor = make_editor(scene)
+    shapes = list(scene.values())
+    benchmarks['info'] = lambda: [shape.get_info() for shape in shapes]
+    benchmarks['to_json'] = lambda: [shape.to_json() for shape in shapes]
+    benchmarks['list'] = lambda: editor.list_shapes([])
+    
+    def save_load(*options):
+        filename = os.path.join(directory, 'scene.shapes')
+        
+        def run():
+            editor.save_shapes([filename, *options])
+            make_editor().load_shapes([filename])
+        
+        return run
+    
+    benchmarks['save_load'] = save_load()
+    benchmarks['save_load.compressed'] = save_load('--compress')
+    return benchmarks
+
+
+def measure(benchmark, runs):
+    """
+    Измерить время и пиковую память операции.
+    
+    Вывод команд редактора отправляется в os.devnull.
+    
+    Args:
+        benchmark (callable): Операция
+        runs (int): Количество замеров времени
+    
+    Returns:
+        dict: {'time': медианное время в с, 'peak': пиковая память в байтах}
+    """
+    with open(os.devnull, 'w', encoding='utf-8') as sink, contextlib.redirect_stdout(sink):
+        benchmark()  # прогрев: импорты, компиляция разборщиков параметров
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            benchmark()
+            timings.append(time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            benchmark()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {'time': statistics.median(timings), 'peak': peak}
+
+
+def compare(results, baseline, threshold, memory_threshold):
+    """
+    Сравнить результаты с базовыми значениями.
+    
+    Args:
+        results (dict): Имя операции -> измерения
+        baseline (dict): Имя операции -> базовые измерения
+        threshold (float): Допустимый рост времени (доля)
+        memory_threshold (float): Допустимый рост пиковой памяти (доля)
+    
+    Returns:
+        list: Строки с описанием регрессий
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric, limit, unit in (('time', threshold, 'время'), ('peak', memory_threshold, 'память')):
+            if base[metric] > 0 and current[metric] > base[metric] * (1 + limit):
+                growth = current[metric] / base[metric] - 1
+                regressions.append(f"{name}: {unit} +{growth:.0%} (порог {limit:.0%})")
+    return regressions
+
+
+def load_baselines(path):
+    """
+    Загрузить файл базовых значений.
+    
+    Args:
+        path (str): Путь к JSON-файлу
+    
+    Returns:
+        dict: Ключ машины -> {'recorded': дата, 'count': N, 'metrics': {...}}
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_baselines(path, baselines):
+    """Атомарно записать файл базовых значений."""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(baselines, file, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def main():
+    """Запустить бенчмарки и сравнить их с базовыми значениями машины."""
+    parser = argparse.ArgumentParser(description="Контроль регрессий производительности")
+    parser.add_argument('--count', type=int, default=2000, help="количество фигур в сцене")
+    parser.add_argument('--runs', type=int, default=5, help="количество замеров каждой операции")
+    parser.add_argument('--threshold', type=float, default=25.0,
+                        help="допустимый рост времени, %%")
+    parser.add_argument('--memory-threshold', type=float, default=10.0,
+                        help="допустимый рост пиковой памяти, %%")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="JSON-файл базовых значений")
+    parser.add_argument('--machine', default=None, help="ключ машины (по умолчанию хост, архитектура и Python)")
+    parser.add_argument('--update', action='store_true', help="сохранить результаты как базовые")
+    args = parser.parse_args()
+    if args.count < 9 or args.runs < 1:
+        parser.error("--count должен быть не меньше 9, --runs - не меньше 1")
+    
+    machine = args.machine or machine_key()
+    baselines = load_baselines(args.baseline)
+    entry = baselines.get(machine)
+    if entry is not None and entry.get('count') != args.count:
+        print(f"Базовые значения записаны для --count {entry.get('count')}, сравнение невозможно")
+        sys.exit(1)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        benchmarks = build_benchmarks(args.count, directory)
+        results = {}
+        for name, benchmark in benchmarks.items():
+            results[name] = measure(benchmark, args.runs)
+    
+    base_metrics = entry['metrics'] if entry is not None else {}
+    print(f"Машина: {machine}, фигур: {args.count}")
+    print(f"  {'операция':<24} {'время, мс':>10} {'база':>10} {'память, КБ':>11} {'база':>10}")
+    for name, current in results.items():
+        base = base_metrics.get(name)
+        base_time = f"{base['time'] * 1000:10.2f}" if base else f"{'-':>10}"
+        base_peak = f"{base['peak'] / 1024:10.1f}" if base else f"{'-':>10}"
+        print(f"  {name:<24} {current['time'] * 1000:10.2f} {base_time} {current['peak'] / 1024:11.1f} {base_peak}")
+    
+    if entry is None or args.update:
+        baselines[machine] = {
+            'recorded': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'count': args.count,
+            'metrics': results
+        }
+        save_baselines(args.baseline, baselines)
+        print(f"Базовые значения сохранены в {args.baseline}")
+        sys.exit(0)
+    
+    regressions = compare(results, base_metrics, args.threshold / 100, args.memory_threshold / 100)
+    if regressions:
+        print("ОШИБКА: обнаружены регрессии производительности:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("Регрессий не обнаружено")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
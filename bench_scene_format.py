@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Бенчмарк форматов файлов сцены: pickle против сжатого поколоночного формата.
+
+Для каждого формата измеряются размер файлов и время сохранения и загрузки.
+С параметром --shards дополнительно измеряется сцена, разбитая на N шардов,
+которые записываются и читаются параллельно.
+
+Использование:
+    python3 bench_scene_format.py [--count N] [--shards N]
+"""
+
+import argparse
+import os
+import pickle
+import tempfile
+import time
+
+from bench_utils import generate_scene
+from scene_format import write_scene, read_scene
+from scene_shards import write_sharded_scene, read_sharded_scene
+
+
+def save_pickle(filename, shapes, next_id):
+    """Сохранить сцену так же, как команда save без сжатия."""
+    with open(filename, 'wb') as file:
+        pickle.dump({'shapes': shapes, 'next_id': next_id}, file)
+
+
+def load_pickle(filename):
+    """Загрузить сцену, сохраненную save_pickle."""
+    with open(filename, 'rb') as file:
+        data = pickle.load(file)
+    return data['shapes'], data['next_id']
+
+
+def compressed_format(codec):
+    """Получить функции сохранения и загрузки сжатого формата."""
+    def save(filename, shapes, next_id):
+        with open(filename, 'wb') as file:
+            write_scene(file, shapes, next_id, codec)
+    
+    def load(filename):
+        with open(filename, 'rb') as file:
+            return read_scene(file)
+    
+    return save, load
+
+
+def sharded_format(codec, shards):
+    """Получить функции сохранения и загрузки сцены из шардов."""
+    def save(filename, shapes, next_id):
+        write_sharded_scene(filename, shapes, next_id, shards, codec)
+    
+    def load(filename):
+        with open(filename, 'rb') as file:
+            shapes, next_id, _ = read_sharded_scene(file, os.path.dirname(filename))
+        return shapes, next_id
+    
+    return save, load
+
+
+def directory_size(directory):
+    """Получить общий размер файлов в каталоге."""
+    return sum(entry.stat().st_size for entry in os.scandir(directory))
+
+
+def measure(directory, save, load, shapes, next_id):
+    """
+    Измерить сохранение и загрузку сцены.
+    
+    Returns:
+        tuple: (размер файлов в байтах, время сохранения в с, время загрузки в с)
+    """
+    filename = os.path.join(directory, 'scene.shapes')
+    start = time.perf_counter()
+    save(filename, shapes, next_id)
+    save_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    loaded, _ = load(filename)
+    load_time = time.perf_counter() - start
+    
+    assert len(loaded) == len(shapes)
+    return directory_size(directory), save_time, load_time
+
+
+def main():
+    """Запустить бенчмарк форматов."""
+    parser = argparse.ArgumentParser(description="Бенчмарк форматов файлов сцены")
+    parser.add_argument('--count', type=int, default=100000, help="количество фигур в сцене")
+    parser.add_argument('--shards', type=int, default=0, help="количество шардов (0 - не измерять)")
+    args = parser.parse_args()
+    
+    shapes = generate_scene(args.count)
+    next_id = args.count + 1
+    formats = [
+        ('pickle', save_pickle, load_pickle),
+        ('zlib', *compressed_format('zlib')),
+        ('lzma', *compressed_format('lzma')),
+    ]
+    if args.shards:
+        formats.append((f'zlib x{args.shards}', *sharded_format('zlib', args.shards)))
+        formats.append((f'lzma x{args.shards}', *sharded_format('lzma', args.shards)))
+    
+    print(f"Фигур в сцене: {args.count}")
+    print(f"{'формат':<10}{'размер, КБ':>14}{'сохранение, с':>16}{'загрузка, с':>14}")
+    baseline = None
+    for name, save, load in formats:
+        with tempfile.TemporaryDirectory() as directory:
+            size, save_time, load_time = measure(directory, save, load, shapes, next_id)
+        baseline = baseline or size
+        print(f"{name:<10}{size / 1024:>14.1f}{save_time:>16.3f}{load_time:>14.3f}"
+              f"   ({size / baseline:.0%} от pickle)")
+
+
+if __name__ == '__main__':
+    main()
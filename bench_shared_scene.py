@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Бенчмарк передачи сцены рабочим процессам: пул с фигурами против
+разделяемой памяти (shared_scene.py).
+
+Рабочие процессы считают по каждому классу фигур сумму, минимум и максимум
+каждого параметра. В первом варианте фигуры (VectorEditor.shapes) передаются
+в пул порциями и сериализуются pickle для каждого процесса. Во втором сцена
+один раз публикуется в разделяемой памяти, а процессы подключаются к ней
+при запуске и читают столбцы параметров без копирования.
+
+Использование:
+    python3 bench_shared_scene.py [--count N] [--workers N] [--chunk N]
+"""
+
+import argparse
+import math
+import multiprocessing
+import time
+
+from bench_utils import generate_scene
+from shared_scene import attach_scene, publish_scene
+
+_scene = None  # Сцена, к которой подключен рабочий процесс
+
+
+def _summary(values):
+    """Сумма, минимум и максимум значений."""
+    return math.fsum(values), min(values), max(values)
+
+
+def summarize_shapes(shapes):
+    """
+    Посчитать статистику параметров по объектам фигур.
+    
+    Args:
+        shapes (list): Фигуры
+    
+    Returns:
+        dict: (путь класса, параметр) -> (количество, сумма, минимум, максимум)
+    """
+    by_class = {}
+    for shape in shapes:
+        by_class.setdefault(type(shape), []).append(shape)
+    result = {}
+    for cls, items in by_class.items():
+        class_path = f"{cls.__module__}.{cls.__qualname__}"
+        for param in cls.PARAMS:
+            values = [getattr(shape, param) for shape in items]
+            result[(class_path, param)] = (len(values), *_summary(values))
+    return result
+
+
+def _attach(name):
+    """Подключить рабочий процесс к сцене в разделяемой памяти."""
+    global _scene
+    _scene = attach_scene(name)
+
+
+def summarize_columns(task):
+    """
+    Посчитать статистику параметров по столбцам сцены в разделяемой памяти.
+    
+    Args:
+        task (tuple): (путь класса, номер первой фигуры, номер после последней)
+    
+    Returns:
+        dict: (путь класса, параметр) -> (количество, сумма, минимум, максимум)
+    """
+    class_path, start, stop = task
+    result = {}
+    for param, column in _scene.types[class_path].columns.items():
+        values = column[start:stop]
+        result[(class_path, param)] = (len(values), *_summary(values))
+        values.release()
+    return result
+
+
+def merge(parts):
+    """Объединить статистику порций."""
+    result = {}
+    for part in parts:
+        for key, (count, total, low, high) in part.items():
+            if key in result:
+                old_count, old_total, old_low, old_high = result[key]
+                result[key] = (old_count + count, old_total + total, min(old_low, low), max(old_high, high))
+            else:
+                result[key] = (count, total, low, high)
+    return result
+
+
+def run_pool(shapes, workers, chunk):
+    """Передать фигуры в пул порциями и посчитать статистику."""
+    values = list(shapes.values())
+    chunks = [values[start:start + chunk] for start in range(0, len(values), chunk)]
+    with multiprocessing.Pool(workers) as pool:
+        return merge(pool.map(summarize_shapes, chunks))
+
+
+def run_shared(scene, workers, chunk):
+    """Посчитать статистику в пуле, подключенном к сцене в разделяемой памяти."""
+    tasks = [(class_path, start, min(start + chunk, len(shapes)))
+             for class_path, shapes in scene.types.items()
+             for start in range(0, len(shapes), chunk)]
+    with multiprocessing.Pool(workers, initializer=_attach, initargs=(scene.name,)) as pool:
+        return merge(pool.map(summarize_columns, tasks))
+
+
+def same_results(left, right):
+    """Совпадает ли статистика (суммы - с точностью до округления)."""
+    if left.keys() != right.keys():
+        return False
+    for key in left:
+        (count_a, total_a, low_a, high_a), (count_b, total_b, low_b, high_b) = left[key], right[key]
+        if (count_a, low_a, high_a) != (count_b, low_b, high_b) or not math.isclose(total_a, total_b,
+                                                                                     rel_tol=1e-9, abs_tol=1e-6):
+            return False
+    return True
+
+
+def main():
+    """Запустить бенчмарк."""
+    parser = argparse.ArgumentParser(description="Бенчмарк сцены в разделяемой памяти")
+    parser.add_argument('--count', type=int, default=200000, help="количество фигур в сцене")
+    parser.add_argument('--workers', type=int, default=4, help="количество рабочих процессов")
+    parser.add_argument('--chunk', type=int, default=10000, help="фигур в одной задаче")
+    args = parser.parse_args()
+    
+    shapes = generate_scene(args.count)
+    print(f"Фигур в сцене: {args.count}, процессов: {args.workers}")
+    
+    start = time.perf_counter()
+    expected = run_pool(shapes, args.workers, args.chunk)
+    pool_time = time.perf_counter() - start
+    print(f"{'пул с фигурами':<28}{pool_time:>8.3f} с")
+    
+    start = time.perf_counter()
+    scene = publish_scene(shapes, args.count + 1)
+    publish_time = time.perf_counter() - start
+    size = scene.size
+    try:
+        start = time.perf_counter()
+        result = run_shared(scene, args.workers, args.chunk)
+        shared_time = time.perf_counter() - start
+    finally:
+        scene.unlink()
+    
+    print(f"{'публикация в памяти':<28}{publish_time:>8.3f} с   ({size / 1024 / 1024:.1f} МБ)")
+    print(f"{'пул с разделяемой памятью':<28}{shared_time:>8.3f} с   "
+          f"(x{pool_time / shared_time:.1f}, с публикацией x{pool_time / (publish_time + shared_time):.1f})")
+    if not same_results(expected, result):
+        raise SystemExit("Результаты не совпадают")
+    print("Результаты совпадают")
+
+
+if __name__ == '__main__':
+    main()
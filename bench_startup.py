@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Бенчмарк времени запуска векторного редактора.
+
+Запускает `main.py --batch` с пустым скриптом:
+  1. один раз под `-X importtime`, чтобы показать самые дорогие импорты
+     и проверить, что тяжелые модули не загружаются при старте;
+  2. несколько раз для замера времени запуска "по часам".
+
+Время запуска редактора сравнивается со временем запуска пустого
+интерпретатора; если разница превышает бюджет, скрипт завершается с кодом 1.
+
+Использование:
+    python3 bench_startup.py [--runs N] [--budget-ms MS]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+
+# Модули, которые не должны загружаться при запуске редактора
+LAZY_MODULES = ('json', 'pickle', 'uuid', 'shape', 'shapes_2d', 'shapes_3d')
+
+
+def parse_importtime(stderr):
+    """
+    Разобрать вывод `-X importtime`.
+    
+    Args:
+        stderr (str): Стандартный поток ошибок интерпретатора
+    
+    Returns:
+        list: Список кортежей (модуль с отступом вложенности, собственное время в мкс,
+              накопленное время в мкс)
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        # Вложенные импорты выделяются отступом после первого пробела
+        imports.append((module[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def measure_imports(script):
+    """
+    Получить список модулей, импортируемых при запуске редактора.
+    
+    Args:
+        script (str): Путь к пустому скрипту
+    
+    Returns:
+        list: Результат parse_importtime
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', MAIN, '--batch', script],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True
+    )
+    return parse_importtime(result.stderr)
+
+
+def measure_wall_time(command, runs):
+    """
+    Измерить медианное время выполнения команды.
+    
+    Args:
+        command (list): Команда для запуска
+        runs (int): Количество запусков
+    
+    Returns:
+        float: Медианное время в миллисекундах
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    """Запустить бенчмарк и проверить бюджет времени запуска."""
+    parser = argparse.ArgumentParser(description="Бенчмарк времени запуска редактора")
+    parser.add_argument('--runs', type=int, default=20, help="количество запусков для замера")
+    parser.add_argument('--budget-ms', type=float, default=25.0,
+                        help="допустимое время запуска сверх пустого интерпретатора, мс")
+    args = parser.parse_args()
+    
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as script:
+        script_name = script.name
+    try:
+        imports = measure_imports(script_name)
+        interpreter_ms = measure_wall_time([sys.executable, '-c', 'pass'], args.runs)
+        editor_ms = measure_wall_time([sys.executable, MAIN, '--batch', script_name], args.runs)
+    finally:
+        os.remove(script_name)
+    
+    failed = False
+    
+    print("Самые дорогие импорты (накопленное время):")
+    top_level = [entry for entry in imports if not entry[0].startswith(' ')]
+    for module, _, cumulative_us in sorted(top_level, key=lambda entry: -entry[2])[:10]:
+        print(f"  {module:<30} {cumulative_us / 1000:8.2f} мс")
+    
+    loaded = {module.strip() for module, _, _ in imports}
+    eager = [module for module in LAZY_MODULES if module in loaded]
+    if eager:
+        print(f"ОШИБКА: при запуске загружаются модули: {', '.join(eager)}")
+        failed = True
+    
+    overhead_ms = editor_ms - interpreter_ms
+    print(f"Запуск интерпретатора: {interpreter_ms:.2f} мс")
+    print(f"Запуск редактора:      {editor_ms:.2f} мс (+{overhead_ms:.2f} мс, бюджет {args.budget_ms:.2f} мс)")
+    if overhead_ms > args.budget_ms:
+        print("ОШИБКА: превышен бюджет времени запуска")
+        failed = True
+    
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Вспомогательные функции для бенчмарков векторного редактора.
+"""
+
+import random
+
+from shapes_2d import Point, Line, Circle, Square, Rectangle, Oval, RegularPolygon
+from shapes_3d import Parallelepiped, Tetrahedron
+
+
+def _random_shape(rng, kind):
+    """Создать случайную фигуру указанного вида."""
+    coord = lambda: round(rng.uniform(-1000, 1000), 2)
+    size = lambda: round(rng.uniform(0.5, 50), 2)
+    if kind == 0:
+        return Point(coord(), coord())
+    if kind == 1:
+        return Line(coord(), coord(), coord(), coord())
+    if kind == 2:
+        return Circle(coord(), coord(), size())
+    if kind == 3:
+        return Square(coord(), coord(), size())
+    if kind == 4:
+        return Rectangle(coord(), coord(), size(), size())
+    if kind == 5:
+        return Oval(coord(), coord(), size(), size())
+    if kind == 6:
+        return RegularPolygon(coord(), coord(), rng.randint(3, 12), size())
+    if kind == 7:
+        return Parallelepiped(coord(), coord(), coord(), size(), size(), size())
+    return Tetrahedron(coord(), coord(), coord(), size())
+
+
+def generate_scene(count, seed=0):
+    """
+    Сгенерировать сцену из фигур всех типов.
+    
+    Args:
+        count (int): Количество фигур
+        seed (int, optional): Начальное значение генератора случайных чисел
+    
+    Returns:
+        dict: Словарь фигур (id -> фигура)
+    """
+    rng = random.Random(seed)
+    shapes = {}
+    for shape_id in range(1, count + 1):
+        shape = _random_shape(rng, shape_id % 9)
+        shape.name = f"{type(shape).__name__} {shape_id}"
+        shape.id = shape_id
+        shapes[shape_id] = shape
+    return shapes
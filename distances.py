@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Матрица попарных расстояний между фигурами (команда distances).
+
+Матрица N x N записывается в файл формата .npy (заголовок NumPy версии 1.0
+и данные float64 или float32 в порядке little-endian по строкам), который
+открывается, например, numpy.load(path, mmap_mode='r'). Сам NumPy для
+записи не нужен: файл отображается в память (mmap), а матрица вычисляется
+квадратными блоками (tile x tile). Матрица симметрична, поэтому считаются
+только блоки на диагонали и над ней, а блок под диагональю записывается
+транспонированием. В памяти одновременно находится один блок, поэтому
+объем памяти не зависит от количества фигур.
+
+Расстояние между фигурами - расстояние между центрами их ограничивающих
+прямоугольников (для всех типов фигур это центр фигуры). Для кругов можно
+вычислить расстояние между границами: max(0, d - r1 - r2).
+"""
+
+import math
+import mmap
+import struct
+import sys
+from array import array
+from itertools import repeat
+from operator import sub
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+DEFAULT_TILE = 512
+
+# Тип элементов: код array -> описание dtype NumPy
+DTYPES = {'f8': ('d', '<f8'), 'f4': ('f', '<f4')}
+
+
+def npy_header(shape, descr):
+    """
+    Получить заголовок файла .npy версии 1.0.
+    
+    Args:
+        shape (tuple): Размеры массива
+        descr (str): Описание типа элементов NumPy (например, '<f8')
+    
+    Returns:
+        bytes: Заголовок, дополненный пробелами до длины, кратной 64
+    """
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': {shape!r}, }}"
+    padding = -(len(NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header = (header + ' ' * padding + '\n').encode('latin-1')
+    return NPY_MAGIC + struct.pack('<H', len(header)) + header
+
+
+def write_npy_vector(path, values, typecode, descr):
+    """
+    Записать одномерный массив в файл .npy.
+    
+    Args:
+        path (str): Путь к файлу
+        values (list): Значения
+        typecode (str): Код типа array ('q', 'd', ...)
+        descr (str): Описание типа элементов NumPy ('<i8', '<f8', ...)
+    """
+    data = array(typecode, values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    with open(path, 'wb') as file:
+        file.write(npy_header((len(data),), descr))
+        file.write(data)
+
+
+def shape_points(shapes):
+    """
+    Получить центры фигур.
+    
+    Args:
+        shapes (list): Фигуры одной размерности
+    
+    Returns:
+        list: Кортежи координат центров ограничивающих прямоугольников
+    
+    Raises:
+        ValueError: Если фигуры разной размерности
+    """
+    dimensions = {shape.dimension for shape in shapes}
+    if len(dimensions) > 1:
+        raise ValueError("Выборка должна содержать фигуры одной размерности")
+    points = []
+    for shape in shapes:
+        box = shape.get_bounding_box()
+        half = len(box) // 2
+        points.append(tuple((low + high) / 2 for low, high in zip(box[:half], box[half:])))
+    return points
+
+
+def shape_radii(shapes):
+    """
+    Получить радиусы кругов для расстояний между границами.
+    
+    Args:
+        shapes (list): Фигуры
+    
+    Returns:
+        list: Радиусы
+    
+    Raises:
+        ValueError: Если среди фигур есть не круги
+    """
+    if any(type(shape).__name__ != 'Circle' for shape in shapes):
+        raise ValueError("Расстояния между границами вычисляются только для кругов")
+    return [shape.radius for shape in shapes]
+
+
+def _tile_rows(points, radii, row_start, row_end, col_start, col_end, typecode):
+    """Вычислить строки блока матрицы расстояний."""
+    columns = points[col_start:col_end]
+    dist = math.dist
+    rows = []
+    for i in range(row_start, row_end):
+        distances = map(dist, repeat(points[i]), columns)
+        if radii is not None:
+            radius = radii[i]
+            distances = [max(0.0, value - radius) for value in map(sub, distances, radii[col_start:col_end])]
+        rows.append(array(typecode, distances))
+    return rows
+
+
+def write_distance_matrix(path, points, radii=None, dtype='f8', tile=DEFAULT_TILE):
+    """
+    Вычислить матрицу расстояний блоками и записать ее в файл .npy.
+    
+    Args:
+        path (str): Путь к файлу
+        points (list): Кортежи координат точек
+        radii (list, optional): Радиусы кругов (расстояния между границами)
+        dtype (str, optional): Тип элементов 'f8' или 'f4'
+        tile (int, optional): Сторона квадратного блока
+    
+    Returns:
+        int: Количество вычисленных блоков
+    
+    Raises:
+        ValueError: Если точек нет или параметры некорректны
+    """
+    if not points:
+        raise ValueError("Нет фигур для вычисления расстояний")
+    if dtype not in DTYPES:
+        raise ValueError(f"Неизвестный тип элементов '{dtype}' (ожидается {' или '.join(DTYPES)})")
+    if tile < 1:
+        raise ValueError("Размер блока должен быть положительным")
+    typecode, descr = DTYPES[dtype]
+    count = len(points)
+    itemsize = array(typecode).itemsize
+    row_bytes = count * itemsize
+    header = npy_header((count, count), descr)
+    swap = sys.byteorder == 'big'
+    
+    tiles = 0
+    with open(path, 'w+b') as file:
+        file.write(header)
+        file.truncate(len(header) + row_bytes * count)
+        with mmap.mmap(file.fileno(), 0) as matrix:
+            
+            def write_rows(rows, first_row, first_column):
+                position = len(header) + first_row * row_bytes + first_column * itemsize
+                for row in rows:
+                    if swap:
+                        row.byteswap()
+                    matrix[position:position + len(row) * itemsize] = row
+                    position += row_bytes
+            
+            for row_start in range(0, count, tile):
+                row_end = min(row_start + tile, count)
+                for col_start in range(row_start, count, tile):
+                    col_end = min(col_start + tile, count)
+                    rows = _tile_rows(points, radii, row_start, row_end, col_start, col_end, typecode)
+                    if col_start != row_start:
+                        # Блок под диагональю - транспонированный блок над ней
+                        transposed = [array(typecode, column) for column in zip(*rows)]
+                        write_rows(transposed, col_start, row_start)
+                    write_rows(rows, row_start, col_start)
+                    tiles += 1
+            matrix.flush()
+    return tiles
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Разделяемые (flyweight) записи геометрии фигур.
+
+Фигуры одного класса с одинаковыми параметрами геометрии (например, квадраты
+с одинаковой стороной) ссылаются на одну неизменяемую запись GeometryRecord.
+Запись хранит общие объекты значений параметров и кэш производных метрик
+(площадь, периметр, объем и т.д.), поэтому метрики вычисляются один раз
+для всех таких фигур. Имена фигур интернируются.
+"""
+
+import sys
+import weakref
+from functools import wraps
+
+
+class GeometryRecord:
+    """Неизменяемая запись параметров геометрии с кэшем метрик."""
+    
+    __slots__ = ('shape_class', 'values', 'metrics', '__weakref__')
+    
+    def __init__(self, shape_class, values):
+        """
+        Инициализация записи.
+        
+        Args:
+            shape_class (type): Класс фигуры
+            values (tuple): Значения параметров геометрии (в порядке GEOMETRY класса)
+        """
+        self.shape_class = shape_class
+        self.values = values
+        self.metrics = {}  # имя метода -> вычисленное значение
+    
+    def __reduce__(self):
+        # При загрузке из pickle запись снова попадает в хранилище
+        return intern_geometry, (self.shape_class, self.values)
+
+
+class GeometryStore:
+    """Хранилище записей геометрии; записи удаляются, когда на них не остается ссылок."""
+    
+    def __init__(self):
+        """Инициализация хранилища."""
+        self._records = weakref.WeakValueDictionary()
+    
+    def __len__(self):
+        return len(self._records)
+    
+    def table_size(self):
+        """
+        Оценить память таблицы хранилища (без самих записей).
+        
+        Returns:
+            int: Размер словаря, ключей и слабых ссылок в байтах
+        """
+        data = self._records.data
+        return sys.getsizeof(data) + sum(sys.getsizeof(key) + sys.getsizeof(ref) for key, ref in data.items())
+    
+    def intern(self, shape_class, values):
+        """
+        Получить общую запись для параметров геометрии.
+        
+        Args:
+            shape_class (type): Класс фигуры
+            values (tuple): Значения параметров геометрии
+        
+        Returns:
+            GeometryRecord: Общая запись
+        """
+        key = (shape_class, values)
+        record = self._records.get(key)
+        if record is None:
+            record = GeometryRecord(shape_class, values)
+            self._records[key] = record
+        return record
+
+
+GEOMETRY_STORE = GeometryStore()
+
+
+def intern_geometry(shape_class, values):
+    """
+    Получить общую запись геометрии из глобального хранилища.
+    
+    Args:
+        shape_class (type): Класс фигуры
+        values (tuple): Значения параметров геометрии
+    
+    Returns:
+        GeometryRecord: Общая запись
+    """
+    return GEOMETRY_STORE.intern(shape_class, values)
+
+
+def intern_name(name):
+    """
+    Интернировать имя фигуры.
+    
+    Args:
+        name: Имя фигуры
+    
+    Returns:
+        Интернированная строка (или исходное значение, если это не строка)
+    """
+    return sys.intern(name) if type(name) is str else name
+
+
+def share_geometry(shapes):
+    """
+    Привязать фигуры к общим записям геометрии.
+    
+    После этого одинаковые значения параметров разных фигур хранятся
+    в памяти одним объектом.
+    
+    Args:
+        shapes (iterable): Фигуры
+    
+    Returns:
+        int: Количество различных записей геометрии в хранилище
+    """
+    for shape in shapes:
+        shape.geometry
+    return len(GEOMETRY_STORE)
+
+
+def cached_metric(method):
+    """
+    Декоратор метода метрики, зависящей только от параметров геометрии.
+    
+    Значение вычисляется один раз на запись геометрии и затем берется из ее кэша.
+    
+    Args:
+        method (callable): Метод фигуры без аргументов
+    
+    Returns:
+        callable: Метод с кэшированием
+    """
+    name = method.__name__
+    
+    @wraps(method)
+    def wrapper(self):
+        record = self.__dict__.get('_geometry') or self.geometry
+        try:
+            return record.metrics[name]
+        except KeyError:
+            value = record.metrics[name] = method(self)
+            return value
+    
+    return wrapper
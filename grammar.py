@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Грамматика аргументов команды create.
+
+Описание типа фигуры из VectorEditor.shape_types (список параметров и их типов
+или минимальное количество вершин) один раз компилируется в функцию разбора,
+которая за один проход преобразует и проверяет аргументы. Скомпилированные
+функции кэшируются редактором, поэтому при воспроизведении больших скриптов
+разбор почти ничего не стоит.
+"""
+
+
+class GrammarError(ValueError):
+    """Ошибка разбора аргументов команды."""
+    pass
+
+
+class ArgumentCountError(GrammarError):
+    """Недостаточно аргументов."""
+    pass
+
+
+class ArgumentTypeError(GrammarError):
+    """Аргумент не удалось преобразовать к нужному типу."""
+    pass
+
+
+# Сообщения об ошибках преобразования для поддерживаемых типов
+TYPE_NAMES = {
+    float: 'числом',
+    int: 'целым числом'
+}
+
+
+def compile_shape_parser(params, types=None):
+    """
+    Скомпилировать функцию разбора аргументов фигуры.
+    
+    Args:
+        params (list): Имена параметров конструктора фигуры по порядку
+        types (dict, optional): Типы параметров (имя -> тип), по умолчанию float
+    
+    Returns:
+        callable: Функция parse(tokens) -> (список значений, имя или None)
+    """
+    types = types or {}
+    converters = tuple(types.get(param, float) for param in params)
+    count = len(params)
+    
+    def type_error(tokens):
+        # Медленный путь: выясняем, какой именно параметр не разобран
+        for param, converter, token in zip(params, converters, tokens):
+            try:
+                converter(token)
+            except ValueError:
+                return ArgumentTypeError(f"Параметр {param} должен быть {TYPE_NAMES.get(converter, converter.__name__)}")
+        return ArgumentTypeError("Параметры должны быть числами")
+    
+    if all(converter is float for converter in converters):
+        def parse(tokens):
+            if len(tokens) < count:
+                raise ArgumentCountError(f"Недостаточно параметров: ожидается {count}")
+            try:
+                values = list(map(float, tokens[:count]))
+            except ValueError:
+                raise type_error(tokens) from None
+            return values, (tokens[count] if len(tokens) > count else None)
+    else:
+        def parse(tokens):
+            if len(tokens) < count:
+                raise ArgumentCountError(f"Недостаточно параметров: ожидается {count}")
+            try:
+                values = [converter(token) for converter, token in zip(converters, tokens)]
+            except ValueError:
+                raise type_error(tokens) from None
+            return values, (tokens[count] if len(tokens) > count else None)
+    
+    return parse
+
+
+def read_vertex_file(path):
+    """
+    Прочитать координаты вершин из текстового файла.
+    
+    Числа x, y разделяются пробелами, переводами строк или запятыми
+    (например, по одной вершине "x,y" или "x y" в строке).
+    
+    Args:
+        path (str): Путь к файлу
+    
+    Returns:
+        list: Координаты вершин x, y подряд
+    
+    Raises:
+        GrammarError: Если файл не читается или содержит не числа либо нечетное их количество
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            tokens = file.read().replace(',', ' ').split()
+    except OSError as e:
+        raise GrammarError(f"Не удалось прочитать файл вершин '{path}': {e.strerror}")
+    try:
+        values = list(map(float, tokens))
+    except ValueError:
+        bad = next(token for token in tokens if not _is_number(token))
+        raise ArgumentTypeError(f"Файл вершин '{path}' содержит не число: '{bad}'") from None
+    if len(values) % 2:
+        raise GrammarError(f"Файл вершин '{path}' содержит нечетное количество координат")
+    return values
+
+
+def _is_number(token):
+    """Является ли лексема числом."""
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+
+def compile_vertex_parser(min_points):
+    """
+    Скомпилировать функцию разбора вершин фигуры (многоугольник, ломаная).
+    
+    Аргументы - координаты вершин x1 y1 x2 y2 ... или ссылка на файл вершин
+    @путь (см. read_vertex_file), за которыми может следовать имя фигуры.
+    При перечислении координат имя определяется по нечетному количеству аргументов,
+    поэтому имя не может быть числом: нечетное количество координат - ошибка.
+    
+    Args:
+        min_points (int): Минимальное количество вершин
+    
+    Returns:
+        callable: Функция parse(tokens) -> ([координаты вершин], имя или None)
+    """
+    count = 2 * min_points
+    
+    def parse(tokens):
+        if tokens and tokens[0].startswith('@'):
+            values = read_vertex_file(tokens[0][1:])
+            name = tokens[1] if len(tokens) > 1 else None
+        else:
+            name = None
+            if len(tokens) % 2:
+                if _is_number(tokens[-1]):
+                    raise GrammarError("Координаты вершин должны задаваться парами x y")
+                name = tokens[-1]
+                tokens = tokens[:-1]
+            try:
+                values = list(map(float, tokens))
+            except ValueError:
+                bad = next(index for index, token in enumerate(tokens) if not _is_number(token))
+                axis = 'x' if bad % 2 == 0 else 'y'
+                raise ArgumentTypeError(f"Координата {axis}{bad // 2 + 1} должна быть числом") from None
+        if len(values) < count:
+            raise ArgumentCountError(f"Недостаточно вершин: ожидается не менее {min_points}")
+        return [values], name
+    
+    return parse
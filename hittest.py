@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Пакетная проверка попадания точек в 2D фигуры (команда hit).
+
+Для набора точек кандидаты находятся одним проходом по пространственному
+индексу (SpatialTree.query_points): каждая фигура получает сразу все точки
+из своего ограничивающего прямоугольника. Затем точное условие попадания
+для типа фигуры проверяется над всеми точками-кандидатами одной фигуры:
+
+  Point            - расстояние до точки не больше допуска
+  Line             - расстояние до отрезка не больше допуска
+  Circle           - расстояние до центра не больше радиуса
+  Oval             - уравнение эллипса
+  Square/Rectangle - границы по осям
+  RegularPolygon   - расстояние до центра, спроецированное на нормаль
+                     ближайшей стороны, не больше апофемы
+  Polygon          - правило чет-нечет по ребрам многоугольника
+  Polyline         - расстояние до ближайшего звена не больше допуска
+  Group            - попадание хотя бы в одну вложенную фигуру
+
+Для остальных типов используются контуры сетки фигуры (Shape.get_mesh)
+и правило чет-нечет. Точки на границе фигуры считаются попавшими.
+"""
+
+import math
+
+
+def _hit_point(shape, xs, ys, indices, tolerance):
+    """Попадание в окрестность точки."""
+    x0, y0 = shape.x, shape.y
+    limit = tolerance * tolerance
+    return [i for i in indices if (xs[i] - x0) ** 2 + (ys[i] - y0) ** 2 <= limit]
+
+
+def _hit_line(shape, xs, ys, indices, tolerance):
+    """Попадание в окрестность отрезка."""
+    x1, y1 = shape.x1, shape.y1
+    dx, dy = shape.x2 - x1, shape.y2 - y1
+    length2 = dx * dx + dy * dy
+    limit = tolerance * tolerance
+    if length2 == 0:
+        return [i for i in indices if (xs[i] - x1) ** 2 + (ys[i] - y1) ** 2 <= limit]
+    result = []
+    for i in indices:
+        x, y = xs[i] - x1, ys[i] - y1
+        # Параметр ближайшей точки отрезка, ограниченный отрезком [0, 1]
+        t = min(1.0, max(0.0, (x * dx + y * dy) / length2))
+        if (x - t * dx) ** 2 + (y - t * dy) ** 2 <= limit:
+            result.append(i)
+    return result
+
+
+def _hit_circle(shape, xs, ys, indices, tolerance):
+    """Попадание в круг."""
+    cx, cy = shape.center_x, shape.center_y
+    limit = shape.radius * shape.radius
+    return [i for i in indices if (xs[i] - cx) ** 2 + (ys[i] - cy) ** 2 <= limit]
+
+
+def _hit_oval(shape, xs, ys, indices, tolerance):
+    """Попадание в эллипс."""
+    cx, cy = shape.center_x, shape.center_y
+    kx, ky = 1 / shape.radius_x, 1 / shape.radius_y
+    return [i for i in indices if ((xs[i] - cx) * kx) ** 2 + ((ys[i] - cy) * ky) ** 2 <= 1]
+
+
+def _hit_box(x1, y1, x2, y2, xs, ys, indices):
+    """Попадание в прямоугольник со сторонами, параллельными осям."""
+    return [i for i in indices if x1 <= xs[i] <= x2 and y1 <= ys[i] <= y2]
+
+
+def _hit_square(shape, xs, ys, indices, tolerance):
+    """Попадание в квадрат."""
+    return _hit_box(shape.x, shape.y, shape.x + shape.side_length, shape.y + shape.side_length, xs, ys, indices)
+
+
+def _hit_rectangle(shape, xs, ys, indices, tolerance):
+    """Попадание в прямоугольник."""
+    return _hit_box(shape.x, shape.y, shape.x + shape.width, shape.y + shape.height, xs, ys, indices)
+
+
+def _hit_regular_polygon(shape, xs, ys, indices, tolerance):
+    """Попадание в правильный многоугольник (нижняя сторона горизонтальна)."""
+    cx, cy = shape.center_x, shape.center_y
+    radius2 = shape.get_radius() ** 2
+    apothem = shape.get_apothem()
+    apothem2 = apothem * apothem
+    step = 2 * math.pi / shape.num_sides
+    half_step = step / 2
+    offset = math.pi / 2  # нормаль нижней стороны направлена под углом -pi/2
+    atan2, cos = math.atan2, math.cos
+    result = []
+    for i in indices:
+        dx, dy = xs[i] - cx, ys[i] - cy
+        distance2 = dx * dx + dy * dy
+        if distance2 <= apothem2:
+            result.append(i)  # внутри вписанной окружности
+        elif distance2 <= radius2:
+            # Угол до нормали ближайшей стороны
+            angle = abs((atan2(dy, dx) + offset) % step - half_step)
+            if math.sqrt(distance2) * cos(half_step - angle) <= apothem:
+                result.append(i)
+    return result
+
+
+def _inside_edges(x, y, edges):
+    """
+    Проверить попадание точки в область, ограниченную ребрами.
+    
+    Используется правило чет-нечет. Точка, лежащая на ребре, считается
+    попавшей: для нее сам луч не дает однозначного ответа.
+    
+    Args:
+        x (float): X-координата точки
+        y (float): Y-координата точки
+        edges (list): Ребра (x1, y1, x2, y2)
+    
+    Returns:
+        bool: True, если точка внутри области или на ее границе
+    """
+    inside = False
+    for x1, y1, x2, y2 in edges:
+        if ((x2 - x1) * (y - y1) == (y2 - y1) * (x - x1)
+                and min(x1, x2) <= x <= max(x1, x2) and min(y1, y2) <= y <= max(y1, y2)):
+            return True
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
+def _hit_polygon(shape, xs, ys, indices, tolerance):
+    """Попадание в многоугольник (правило чет-нечет по ребрам, без тесселяции)."""
+    vertices = shape.vertices
+    vx = vertices[0::2].tolist()
+    vy = vertices[1::2].tolist()
+    edges = list(zip(vx[-1:] + vx[:-1], vy[-1:] + vy[:-1], vx, vy))
+    return [i for i in indices if _inside_edges(xs[i], ys[i], edges)]
+
+
+def _hit_polyline(shape, xs, ys, indices, tolerance):
+    """Попадание в окрестность ломаной (расстояние до ближайшего звена)."""
+    vertices = shape.vertices
+    vx = vertices[0::2].tolist()
+    vy = vertices[1::2].tolist()
+    segments = [(x1, y1, x2 - x1, y2 - y1, (x2 - x1) ** 2 + (y2 - y1) ** 2)
+                for x1, y1, x2, y2 in zip(vx, vy, vx[1:], vy[1:])]
+    limit = tolerance * tolerance
+    result = []
+    for i in indices:
+        for x1, y1, dx, dy, length2 in segments:
+            x, y = xs[i] - x1, ys[i] - y1
+            t = min(1.0, max(0.0, (x * dx + y * dy) / length2)) if length2 else 0.0
+            if (x - t * dx) ** 2 + (y - t * dy) ** 2 <= limit:
+                result.append(i)
+                break
+    return result
+
+
+def _hit_group(shape, xs, ys, indices, tolerance):
+    """Попадание хотя бы в одну нераздельную фигуру группы."""
+    remaining = indices
+    result = []
+    for leaf in shape.iter_leaves():
+        x1, y1, x2, y2 = leaf.get_bounding_box()
+        candidates = _hit_box(x1 - tolerance, y1 - tolerance, x2 + tolerance, y2 + tolerance, xs, ys, remaining)
+        if not candidates:
+            continue
+        matched = set(kernel_for(type(leaf))(leaf, xs, ys, candidates, tolerance))
+        if matched:
+            result.extend(matched)
+            remaining = [i for i in remaining if i not in matched]
+            if not remaining:
+                break
+    result.sort()
+    return result
+
+
+def _hit_mesh(shape, xs, ys, indices, tolerance):
+    """Попадание в контуры сетки фигуры (правило чет-нечет)."""
+    contours = shape.get_mesh().contours()
+    edges = [(x1, y1, x2, y2) for contour in contours
+             for (x1, y1), (x2, y2) in zip(contour, contour[1:] + contour[:1])]
+    return [i for i in indices if _inside_edges(xs[i], ys[i], edges)]
+
+
+# Проверки попадания по именам классов фигур (ищутся по MRO класса)
+KERNELS = {
+    'Point': _hit_point,
+    'Line': _hit_line,
+    'Circle': _hit_circle,
+    'Oval': _hit_oval,
+    'Square': _hit_square,
+    'Rectangle': _hit_rectangle,
+    'RegularPolygon': _hit_regular_polygon,
+    'Polygon': _hit_polygon,
+    'Polyline': _hit_polyline,
+    'Group': _hit_group
+}
+
+_kernels = {}  # класс -> функция проверки
+
+
+def kernel_for(cls):
+    """
+    Получить функцию проверки попадания для класса фигур.
+    
+    Args:
+        cls (type): Класс 2D фигур
+    
+    Returns:
+        callable: Функция (фигура, xs, ys, номера точек, допуск) -> номера попавших точек
+    """
+    kernel = _kernels.get(cls)
+    if kernel is None:
+        kernel = next((KERNELS[base.__name__] for base in cls.__mro__ if base.__name__ in KERNELS), _hit_mesh)
+        _kernels[cls] = kernel
+    return kernel
+
+
+def iter_hits(shapes, index, xs, ys, tolerance=0.0):
+    """
+    Найти попадания точек в фигуры, перебирая фигуры.
+    
+    Args:
+        shapes (dict): Словарь фигур (id -> фигура)
+        index (SpatialTree): Пространственный индекс 2D фигур
+        xs (list): X-координаты точек
+        ys (list): Y-координаты точек
+        tolerance (float, optional): Допуск для точек и отрезков
+    
+    Yields:
+        tuple: Пары (ID фигуры, список номеров точек, попавших в фигуру)
+    """
+    for shape_id, indices in index.query_points((xs, ys), tolerance):
+        shape = shapes[shape_id]
+        matched = kernel_for(type(shape))(shape, xs, ys, indices, tolerance)
+        if matched:
+            yield shape_id, matched
+
+
+def hit_test(shapes, index, xs, ys, tolerance=0.0):
+    """
+    Найти фигуры, содержащие каждую из точек.
+    
+    Args:
+        shapes (dict): Словарь фигур (id -> фигура)
+        index (SpatialTree): Пространственный индекс 2D фигур
+        xs (list): X-координаты точек
+        ys (list): Y-координаты точек
+        tolerance (float, optional): Допуск для точек и отрезков
+    
+    Returns:
+        list: Для каждой точки - отсортированный список ID фигур, которые ее содержат
+    """
+    result = [[] for _ in xs]
+    for shape_id, indices in iter_hits(shapes, index, xs, ys, tolerance):
+        for i in indices:
+            result[i].append(shape_id)
+    for ids in result:
+        ids.sort()
+    return result
@@ -7,22 +7,46 @@
 """
 
 import sys
-import json
-import uuid
 import os
-import pickle
-from shape import Shape
-from shapes_2d import Point, Line, Circle, Square, Rectangle, Oval, RegularPolygon
-from shapes_3d import Parallelepiped, Tetrahedron
+import time
+from importlib import import_module
+from itertools import islice
+from spatial import SpatialTree
+from metrics import Metrics
+
+# Модули json, pickle, модули фигур и вспомогательные модули команд
+# импортируются при первом использовании, чтобы запуск редактора
+# (в том числе в пакетном режиме из скриптов) оставался быстрым.
 
 
 class VectorEditor:
     """Класс векторного редактора с CLI интерфейсом."""
     
+    # Команды, изменяющие сцену (после них автосохранение делает новый снимок)
+    MODIFYING_COMMANDS = frozenset(('create', 'delete', 'clear', 'load', 'merge', 'move', 'scale', 'rotate',
+                                    'group', 'ungroup'))
+    
+    # Количество строк вывода info, записываемых в stdout одним блоком
+    INFO_CHUNK_LINES = 1000
+    
+    # Количество фигур каждого вида, выводимых командой diff подробно
+    DIFF_DETAILS = 10
+    
     def __init__(self):
         """Инициализация редактора."""
         self.shapes = {}  # Словарь для хранения фигур (id -> фигура)
         self.next_id = 1  # Счетчик для генерации ID
+        self.assume_yes = False  # Подтверждать операции без запроса (пакетный режим)
+        self._shape_parsers = {}  # Скомпилированные функции разбора параметров (тип -> функция)
+        self._queries = {}  # Скомпилированные запросы select (текст -> запрос)
+        self.selected_ids = []  # Результат последней команды select
+        self.profiler = None  # Профилировщик команд (создается командами profile и mem)
+        self.metrics = Metrics()  # Задержки команд и счетчики событий
+        self.autosaver = None  # Фоновое автосохранение (создается командой autosave)
+        self._unsaved_changes = False  # Сцена изменена после последнего снимка автосохранения
+        self.shared_scene = None  # Снимок сцены в разделяемой памяти (создается командой share)
+        self.index2d = SpatialTree(2)  # Квадродерево для поиска 2D фигур по области
+        self.index3d = SpatialTree(3)  # Октодерево для поиска 3D фигур по области
         self.commands = {
             'help': self.show_help,
             'create': self.create_shape,
@@ -32,55 +56,107 @@ class VectorEditor:
             'clear': self.clear_shapes,
             'save': self.save_shapes,
             'load': self.load_shapes,
+            'merge': self.merge_shapes,
+            'diff': self.diff_command,
+            'query3d': self.query_3d,
+            'hit': self.hit_command,
+            'coverage': self.coverage_command,
+            'distances': self.distances_command,
+            'export': self.export_command,
+            'select': self.select_command,
+            'top': self.top_command,
+            'group': self.group_command,
+            'ungroup': self.ungroup_command,
+            'mesh': self.mesh_command,
+            'move': self.move_selection,
+            'scale': self.scale_selection,
+            'rotate': self.rotate_selection,
+            'profile': self.profile_command,
+            'mem': self.mem_command,
+            'memstat': self.memstat_command,
+            'metrics': self.metrics_command,
+            'autosave': self.autosave_command,
+            'share': self.share_command,
             'exit': self.exit_editor
         }
         
         # Словарь доступных типов фигур и их конструкторов
+        # (классы загружаются при первом обращении, см. _get_shape_class)
         self.shape_types = {
             'point': {
-                'class': Point,
+                'module': 'shapes_2d',
+                'class_name': 'Point',
                 'params': ['x', 'y'],
                 'help': 'Создать точку: create point x y [name]'
             },
             'line': {
-                'class': Line,
+                'module': 'shapes_2d',
+                'class_name': 'Line',
                 'params': ['x1', 'y1', 'x2', 'y2'],
                 'help': 'Создать отрезок: create line x1 y1 x2 y2 [name]'
             },
             'circle': {
-                'class': Circle,
+                'module': 'shapes_2d',
+                'class_name': 'Circle',
                 'params': ['center_x', 'center_y', 'radius'],
                 'help': 'Создать круг: create circle center_x center_y radius [name]'
             },
             'square': {
-                'class': Square,
+                'module': 'shapes_2d',
+                'class_name': 'Square',
                 'params': ['x', 'y', 'side_length'],
                 'help': 'Создать квадрат: create square x y side_length [name]'
             },
             'rectangle': {
-                'class': Rectangle,
+                'module': 'shapes_2d',
+                'class_name': 'Rectangle',
                 'params': ['x', 'y', 'width', 'height'],
                 'help': 'Создать прямоугольник: create rectangle x y width height [name]'
             },
             'oval': {
-                'class': Oval,
+                'module': 'shapes_2d',
+                'class_name': 'Oval',
                 'params': ['center_x', 'center_y', 'radius_x', 'radius_y'],
                 'help': 'Создать овал: create oval center_x center_y radius_x radius_y [name]'
             },
             'polygon': {
-                'class': RegularPolygon,
+                'module': 'shapes_2d',
+                'class_name': 'RegularPolygon',
                 'params': ['center_x', 'center_y', 'num_sides', 'side_length'],
+                'types': {'num_sides': int},
                 'help': 'Создать правильный многоугольник: create polygon center_x center_y num_sides side_length [name]'
             },
+            'poly': {
+                'module': 'shapes_2d',
+                'class_name': 'Polygon',
+                'params': ['vertices'],
+                'min_points': 3,
+                'help': 'Создать многоугольник: create poly x1 y1 x2 y2 x3 y3 ... | @файл [name]'
+            },
+            'polyline': {
+                'module': 'shapes_2d',
+                'class_name': 'Polyline',
+                'params': ['vertices'],
+                'min_points': 2,
+                'help': 'Создать ломаную: create polyline x1 y1 x2 y2 ... | @файл [name]'
+            },
             'parallelepiped': {
-                'class': Parallelepiped,
+                'module': 'shapes_3d',
+                'class_name': 'Parallelepiped',
                 'params': ['x', 'y', 'z', 'width', 'height', 'depth'],
                 'help': 'Создать параллелепипед: create parallelepiped x y z width height depth [name]'
             },
             'tetrahedron': {
-                'class': Tetrahedron,
+                'module': 'shapes_3d',
+                'class_name': 'Tetrahedron',
                 'params': ['x', 'y', 'z', 'edge_length'],
                 'help': 'Создать тетраэдр: create tetrahedron x y z edge_length [name]'
+            },
+            'group': {
+                'module': 'shapes_group',
+                'class_name': 'Group',
+                'params': None,  # группы создаются командой group
+                'help': 'Сгруппировать фигуры: group <выборка> [name]'
             }
         }
     
@@ -94,14 +170,40 @@ class VectorEditor:
         print("\n\033[1;36mДоступные команды:\033[0m")
         print("  \033[1;37mhelp                      \033[0m- Показать эту справку")
         print("  \033[1;37mcreate <тип> <параметры>  \033[0m- Создать новую фигуру")
-        print("  \033[1;37mlist                      \033[0m- Показать список всех фигур")
-        print("  \033[1;37minfo <id>                 \033[0m- Показать информацию о фигуре")
-        print("  \033[1;37mdelete <id>               \033[0m- Удалить фигуру")
+        print("  \033[1;37mlist [<выборка>] [--sort-by <поле> [--desc]]\033[0m- Показать список фигур")
+        print("  \033[1;37minfo <id>|<выборка> [--table|--ndjson]\033[0m- Показать информацию о фигурах")
+        print("  \033[1;37mdelete <id>|<выборка>     \033[0m- Удалить фигуру или выборку фигур")
         print("  \033[1;37mclear                     \033[0m- Удалить все фигуры")
-        print("  \033[1;37msave <filename>           \033[0m- Сохранить фигуры в файл")
+        print("  \033[1;37msave <filename> [--compress [zlib|lzma]] [--shards N]\033[0m- Сохранить фигуры в файл")
         print("  \033[1;37mload <filename>           \033[0m- Загрузить фигуры из файла")
+        print("  \033[1;37mmerge <filename>          \033[0m- Добавить фигуры из файла к текущим")
+        print("  \033[1;37mdiff <file_a> <file_b>    \033[0m- Сравнить два файла сцены")
+        print("  \033[1;37mquery3d x1 y1 z1 x2 y2 z2 \033[0m- Найти 3D фигуры в области")
+        print("  \033[1;37mhit x y [x y ...] [--tol d]\033[0m- Найти 2D фигуры, содержащие точки")
+        print("  \033[1;37mhit --sample N [--tol d]  \033[0m- Проверить N случайных точек сцены")
+        print("  \033[1;37mcoverage [<выборка>] [--error e]\033[0m- Площадь объединения 2D фигур (без перекрытий)")
+        print("  \033[1;37mdistances <выборка> <file> [--boundary] [--dtype f8|f4] [--tile N]\033[0m- Матрица расстояний в файл .npy")
+        print("  \033[1;37mexport stl <file> [<выборка>]\033[0m- Экспортировать 3D фигуры в двоичный STL")
+        print("  \033[1;37mselect <запрос>           \033[0m- Найти фигуры по условиям (выборка selected)")
+        print("  \033[1;37mtop K by <поле> [<тип>|<выборка>]\033[0m- Показать K фигур с наибольшим значением поля")
+        print("  \033[1;37mgroup <выборка> [name]    \033[0m- Объединить фигуры в группу")
+        print("  \033[1;37mungroup <id>              \033[0m- Разгруппировать группу")
+        print("  \033[1;37mmesh <выборка> [lod]      \033[0m- Построить сетки фигур (тесселяция)")
+        print("  \033[1;37mmove <выборка> dx dy [dz] \033[0m- Переместить фигуры")
+        print("  \033[1;37mscale <выборка> k [px py [pz]]\033[0m- Масштабировать фигуры")
+        print("  \033[1;37mrotate <выборка> угол [px py]\033[0m- Повернуть фигуры (в градусах)")
+        print("  \033[1;37mprofile on|off|dump <file>\033[0m- Профилирование команд (cProfile)")
+        print("  \033[1;37mmem snapshot|diff|off     \033[0m- Анализ выделений памяти (tracemalloc)")
+        print("  \033[1;37mmemstat [размер выборки]  \033[0m- Оценка памяти сцены по типам фигур")
+        print("  \033[1;37mmetrics [reset]           \033[0m- Показать метрики производительности")
+        print("  \033[1;37mmetrics export <file> [сек]|off\033[0m- Периодически записывать метрики (Prometheus)")
+        print("  \033[1;37mautosave <file> [сек] [zlib|lzma]|off\033[0m- Фоновое автосохранение сцены")
+        print("  \033[1;37mshare publish [имя]|off   \033[0m- Опубликовать снимок сцены в разделяемой памяти")
         print("  \033[1;37mexit                      \033[0m- Выйти из редактора")
         
+        print("\n\033[1;36mВыборка фигур:\033[0m")
+        print("  \033[1;37mall | 5,9,200-300 | type=<тип> | region=x1,y1,x2,y2 | region=x1,y1,z1,x2,y2,z2 | selected\033[0m")
+        
         print("\n\033[1;36mДоступные типы фигур:\033[0m")
         for shape_type, info in self.shape_types.items():
             print(f"  \033[1;37m{info['help']}\033[0m")
@@ -122,95 +224,652 @@ class VectorEditor:
             print(f"\033[1;31mОшибка: Неизвестный тип фигуры '{shape_type}'\033[0m")
             print("\033[1;33mИспользуйте 'help' для просмотра доступных типов фигур\033[0m")
             return
-        
-        shape_info = self.shape_types[shape_type]
-        required_params = shape_info['params']
-        
-        # Проверяем, достаточно ли параметров
-        if len(args) - 1 < len(required_params):
-            print(f"\033[1;31mОшибка: Недостаточно параметров для создания фигуры '{shape_type}'\033[0m")
-            print(f"\033[1;33mИспользование: {shape_info['help']}\033[0m")
+        if self.shape_types[shape_type]['params'] is None:
+            print(f"\033[1;31mОшибка: Фигуры типа '{shape_type}' создаются командой {shape_type}\033[0m")
             return
         
-        # Извлекаем параметры
-        params = args[1:len(required_params) + 1]
+        # Разбираем параметры скомпилированной для этого типа функцией
+        from grammar import ArgumentCountError, GrammarError
         
-        # Проверяем, являются ли параметры числами
         try:
-            # Преобразуем строковые параметры в числа
-            numeric_params = []
-            for param in params:
-                # Для num_sides в многоугольнике нужно целое число
-                if shape_type == 'polygon' and param == params[2]:
-                    numeric_params.append(int(param))
-                else:
-                    numeric_params.append(float(param))
-        except ValueError:
-            print("\033[1;31mОшибка: Параметры должны быть числами\033[0m")
+            numeric_params, name = self._get_shape_parser(shape_type)(args[1:])
+        except ArgumentCountError:
+            print(f"\033[1;31mОшибка: Недостаточно параметров для создания фигуры '{shape_type}'\033[0m")
+            print(f"\033[1;33mИспользование: {self.shape_types[shape_type]['help']}\033[0m")
+            return
+        except GrammarError as e:
+            print(f"\033[1;31mОшибка: {e}\033[0m")
             return
         
-        # Проверяем, указано ли имя
-        name = None
-        if len(args) > len(required_params) + 1:
-            name = args[len(required_params) + 1]
-        else:
+        if name is None:
             # Если имя не указано, используем тип фигуры с порядковым номером
             name = f"{shape_type.capitalize()} {self.next_id}"
         
         # Создаем фигуру
         try:
-            shape_class = shape_info['class']
+            shape_class = self._get_shape_class(shape_type)
             shape = shape_class(*numeric_params, name=name)
             
             # Назначаем ID и добавляем в словарь
-            shape.id = self.next_id
-            self.shapes[shape.id] = shape
-            self.next_id += 1
+            self._add_shape(shape)
+            self.metrics.increment('shapes_created')
             
             print(f"\033[1;32mСоздана фигура: {shape}\033[0m")
         except Exception as e:
             print(f"\033[1;31mОшибка при создании фигуры: {e}\033[0m")
     
-    def list_shapes(self, args=None):
+    def _get_shape_class(self, shape_type):
         """
-        Показать список всех фигур.
+        Получить класс фигуры, импортируя его модуль при первом обращении.
         
         Args:
-            args: Не используется
+            shape_type (str): Тип фигуры из словаря shape_types
+        
+        Returns:
+            type: Класс фигуры
         """
-        if not self.shapes:
-            print("\033[1;33mСписок фигур пуст\033[0m")
+        shape_info = self.shape_types[shape_type]
+        shape_class = shape_info.get('class')
+        if shape_class is None:
+            module = import_module(shape_info['module'])
+            shape_class = shape_info['class'] = getattr(module, shape_info['class_name'])
+        return shape_class
+    
+    def _get_shape_parser(self, shape_type):
+        """
+        Получить функцию разбора параметров фигуры, компилируя ее при первом обращении.
+        
+        Args:
+            shape_type (str): Тип фигуры из словаря shape_types
+        
+        Returns:
+            callable: Функция разбора (см. grammar.compile_shape_parser и compile_vertex_parser)
+        """
+        parser = self._shape_parsers.get(shape_type)
+        if parser is None:
+            from grammar import compile_shape_parser, compile_vertex_parser
+            
+            shape_info = self.shape_types[shape_type]
+            if 'min_points' in shape_info:
+                parser = compile_vertex_parser(shape_info['min_points'])
+            else:
+                parser = compile_shape_parser(shape_info['params'], shape_info.get('types'))
+            self._shape_parsers[shape_type] = parser
+        return parser
+    
+    def _confirm(self, message):
+        """
+        Запросить подтверждение операции.
+        
+        Args:
+            message (str): Текст вопроса
+        
+        Returns:
+            bool: True, если операция подтверждена
+        """
+        if self.assume_yes:
+            return True
+        print(f"\033[1;33m{message} (y/n)\033[0m")
+        confirm = input("\033[1;32m> \033[0m").strip().lower()
+        return confirm == 'y' or confirm == 'yes' or confirm == 'да'
+    
+    def _add_shape(self, shape):
+        """
+        Назначить фигуре ID, добавить ее в редактор и в индексы.
+        
+        Args:
+            shape (Shape): Добавляемая фигура
+        """
+        shape.id = self.next_id
+        shape.geometry  # привязываем фигуру к общей записи геометрии
+        self.shapes[shape.id] = shape
+        self.next_id += 1
+        self._index_for(shape).insert(shape.id, shape.get_bounding_box())
+    
+    def _index_for(self, shape):
+        """
+        Получить пространственный индекс для фигуры.
+        
+        Args:
+            shape (Shape): Фигура
+        
+        Returns:
+            SpatialTree: Индекс 2D или 3D фигур
+        """
+        return self.index3d if shape.dimension == 3 else self.index2d
+    
+    def _remove_shape(self, shape_id):
+        """
+        Удалить фигуру из редактора и из индексов.
+        
+        Args:
+            shape_id (int): ID фигуры
+        
+        Returns:
+            Shape: Удаленная фигура
+        """
+        shape = self.shapes.pop(shape_id)
+        self._index_for(shape).remove(shape_id)
+        return shape
+    
+    def _remove_shapes(self, shape_ids):
+        """
+        Удалить фигуры из редактора и из индексов.
+        
+        Если удаляется значительная часть сцены, индексы перестраиваются целиком.
+        
+        Args:
+            shape_ids (list): ID фигур
+        """
+        if len(shape_ids) * 4 >= len(self.shapes):
+            for shape_id in shape_ids:
+                del self.shapes[shape_id]
+            self._rebuild_indexes()
             return
+        for shape_id in shape_ids:
+            self._remove_shape(shape_id)
+    
+    def _writable_shapes(self, shape_ids):
+        """
+        Получить фигуры для изменения на месте.
         
-        print("\n\033[1;36mСписок фигур:\033[0m")
-        for shape_id, shape in self.shapes.items():
-            print(f"  \033[1;34m{shape_id}\033[0m: \033[1;37m{shape}\033[0m")
+        Если фигура входит в снимок, который записывает автосохранение,
+        в редакторе она заменяется копией (копирование при записи),
+        чтобы снимок оставался согласованным.
+        
+        Args:
+            shape_ids (list): ID фигур
+        
+        Returns:
+            list: Фигуры, которые можно изменять
+        """
+        snapshot = self.autosaver.snapshot if self.autosaver is not None else None
+        if not snapshot:
+            return [self.shapes[shape_id] for shape_id in shape_ids]
+        
+        shapes = []
+        for shape_id in shape_ids:
+            shape = self.shapes[shape_id]
+            if snapshot.get(shape_id) is shape:
+                shape = self.shapes[shape_id] = shape.clone()
+            shapes.append(shape)
+        return shapes
     
-    def show_shape_info(self, args):
+    def _rebuild_indexes(self):
+        """Перестроить индексы по текущему набору фигур."""
+        self.index2d.rebuild(
+            (shape_id, shape.get_bounding_box())
+            for shape_id, shape in self.shapes.items()
+            if shape.dimension == 2
+        )
+        self.index3d.rebuild(
+            (shape_id, shape.get_bounding_box())
+            for shape_id, shape in self.shapes.items()
+            if shape.dimension == 3
+        )
+    
+    def _reindex_shapes(self, shape_ids):
+        """
+        Обновить индексы после изменения геометрии фигур.
+        
+        Если изменена значительная часть сцены, индексы перестраиваются целиком.
+        
+        Args:
+            shape_ids (list): ID измененных фигур
+        """
+        if len(shape_ids) * 4 >= len(self.shapes):
+            self._rebuild_indexes()
+            return
+        for shape_id in shape_ids:
+            shape = self.shapes[shape_id]
+            self._index_for(shape).update(shape_id, shape.get_bounding_box())
+    
+    def _resolve_selection(self, spec):
         """
-        Показать подробную информацию о фигуре.
+        Получить ID фигур, соответствующих выборке.
         
         Args:
-            args (list): Аргументы команды (ID фигуры)
+            spec (str): Строка выборки (см. selection.py)
+        
+        Returns:
+            list: Отсортированный список ID или None, если выборка некорректна
+        """
+        from selection import SelectionError, parse_selection, ids_in_ranges
+        
+        try:
+            kind, value = parse_selection(spec)
+        except SelectionError as e:
+            print(f"\033[1;31mОшибка: {e}\033[0m")
+            return None
+        
+        if kind == 'all':
+            return sorted(self.shapes)
+        if kind == 'selected':
+            return [shape_id for shape_id in self.selected_ids if shape_id in self.shapes]
+        if kind == 'ids':
+            return sorted(ids_in_ranges(value, self.shapes))
+        if kind == 'type':
+            if value not in self.shape_types:
+                print(f"\033[1;31mОшибка: Неизвестный тип фигуры '{value}'\033[0m")
+                return None
+            shape_class = self._get_shape_class(value)
+            return sorted(shape_id for shape_id, shape in self.shapes.items()
+                          if isinstance(shape, shape_class))
+        index = self.index2d if len(value) == 4 else self.index3d
+        return sorted(index.query(value))
+    
+    def select_command(self, args):
+        """
+        Найти фигуры по условиям запроса и запомнить их как выборку selected.
+        
+        Args:
+            args (list): Лексемы запроса (см. query.py)
         """
         if not args:
-            print("\033[1;31mОшибка: Не указан ID фигуры\033[0m")
+            print("\033[1;31mОшибка: Не указан запрос\033[0m")
+            print("\033[1;33mИспользование: select type=circle and area>10 and center_x<100\033[0m")
+            return
+        
+        from query import QueryError, compile_query
+        from selection import format_id_ranges
+        
+        text = ' '.join(args)
+        query = self._queries.get(text)
+        if query is None:
+            type_classes = {shape_type: self._get_shape_class(shape_type) for shape_type in self.shape_types}
+            try:
+                query = compile_query(text, type_classes)
+            except QueryError as e:
+                print(f"\033[1;31mОшибка в запросе: {e}\033[0m")
+                return
+            self._queries[text] = query
+        
+        self.selected_ids = query.select(self.shapes)
+        if not self.selected_ids:
+            print("\033[1;33mПодходящих фигур не найдено\033[0m")
+            return
+        print(f"\033[1;32mНайдено фигур: {len(self.selected_ids)}\033[0m")
+        print(f"  ID: {format_id_ranges(self.selected_ids)}")
+    
+    def group_command(self, args):
+        """
+        Объединить выбранные фигуры в группу.
+        
+        Фигуры удаляются из сцены и становятся дочерними фигурами новой группы
+        (сохраняя свои ID).
+        
+        Args:
+            args (list): Аргументы команды (выборка и необязательное название группы)
+        """
+        if not args:
+            print("\033[1;31mОшибка: Не указана выборка фигур\033[0m")
+            print("\033[1;33mИспользование: group <выборка> [name]\033[0m")
+            return
+        shape_ids = self._resolve_selection(args[0])
+        if shape_ids is None:
+            return
+        if not shape_ids:
+            print("\033[1;33mВыборка не содержит фигур\033[0m")
+            return
+        
+        from shapes_group import make_group
+        
+        try:
+            group = make_group(self._writable_shapes(shape_ids), args[1] if len(args) > 1 else "Group")
+        except ValueError as e:
+            print(f"\033[1;31mОшибка: {e}\033[0m")
             return
+        for shape_id in shape_ids:
+            self._remove_shape(shape_id)
+        self._add_shape(group)
+        print(f"\033[1;32mСоздана группа: {group}\033[0m")
+    
+    def ungroup_command(self, args):
+        """
+        Разгруппировать группу: вернуть ее дочерние фигуры в сцену.
         
+        Args:
+            args (list): Аргументы команды (ID группы)
+        """
+        if not args:
+            print("\033[1;31mОшибка: Не указан ID группы\033[0m")
+            return
         try:
             shape_id = int(args[0])
         except ValueError:
             print("\033[1;31mОшибка: ID должен быть числом\033[0m")
             return
+        group = self.shapes.get(shape_id)
+        if group is None or not type(group).COMPOSITE:
+            print(f"\033[1;31mОшибка: Группа с ID {shape_id} не найдена\033[0m")
+            return
+        
+        group = self._writable_shapes([shape_id])[0]
+        self._remove_shape(shape_id)
+        children = group.children
+        for child in children:
+            child.parent = None
+            self.shapes[child.id] = child
+            self._index_for(child).insert(child.id, child.get_bounding_box())
+        # Дочерние фигуры встают в конец словаря; восстанавливаем порядок по ID,
+        # только если кто-то из них оказался раньше последней фигуры сцены
+        if children and min(child.id for child in children) < next(reversed(self.shapes)):
+            self.shapes = dict(sorted(self.shapes.items()))
+        print(f"\033[1;32mРазгруппировано фигур: {len(children)}\033[0m")
+    
+    def mesh_command(self, args):
+        """
+        Построить (или взять из кэша) сетки выбранных фигур и показать их размеры.
+        
+        Args:
+            args (list): Аргументы команды (выборка и необязательный уровень детализации)
+        """
+        from tessellation import DEFAULT_LOD, MAX_LOD
+        
+        if not args or len(args) > 2:
+            print("\033[1;31mОшибка: Неверные аргументы команды mesh\033[0m")
+            print(f"\033[1;33mИспользование: mesh <выборка> [lod], lod от 0 до {MAX_LOD} (по умолчанию {DEFAULT_LOD})\033[0m")
+            return
+        try:
+            lod = int(args[1]) if len(args) > 1 else DEFAULT_LOD
+            if not 0 <= lod <= MAX_LOD:
+                raise ValueError
+        except ValueError:
+            print(f"\033[1;31mОшибка: Уровень детализации должен быть целым числом от 0 до {MAX_LOD}\033[0m")
+            return
+        shape_ids = self._resolve_selection(args[0])
+        if shape_ids is None:
+            return
+        if not shape_ids:
+            print("\033[1;33mВыборка не содержит фигур\033[0m")
+            return
+        
+        start = time.perf_counter()
+        meshes = [self.shapes[shape_id].get_mesh(lod) for shape_id in shape_ids]
+        elapsed = time.perf_counter() - start
+        
+        if len(shape_ids) <= 10:
+            for shape_id, mesh in zip(shape_ids, meshes):
+                print(f"  \033[1;34m{shape_id}\033[0m: вершин {mesh.vertex_count}, треугольников {mesh.triangle_count}")
+        vertices = sum(mesh.vertex_count for mesh in meshes)
+        triangles = sum(mesh.triangle_count for mesh in meshes)
+        print(f"\033[1;32mСетки фигур: {len(meshes)}, вершин {vertices}, треугольников {triangles} "
+              f"(lod {lod}, {elapsed * 1000:.1f} мс)\033[0m")
+    
+    def _parse_transform_args(self, args, usage, min_numbers, max_numbers):
+        """
+        Разобрать аргументы команды преобразования.
+        
+        Args:
+            args (list): Аргументы команды (выборка и числа)
+            usage (str): Строка с описанием использования команды
+            min_numbers (int): Минимальное количество чисел
+            max_numbers (int): Максимальное количество чисел
         
-        if shape_id not in self.shapes:
-            print(f"\033[1;31mОшибка: Фигура с ID {shape_id} не найдена\033[0m")
+        Returns:
+            tuple: Пара (ID фигур, числа) или None при ошибке
+        """
+        if len(args) < min_numbers + 1:
+            print("\033[1;31mОшибка: Недостаточно параметров\033[0m")
+            print(f"\033[1;33mИспользование: {usage}\033[0m")
+            return None
+        
+        try:
+            numbers = [float(arg) for arg in args[1:max_numbers + 1]]
+        except ValueError:
+            print("\033[1;31mОшибка: Параметры должны быть числами\033[0m")
+            return None
+        
+        shape_ids = self._resolve_selection(args[0])
+        if shape_ids is None:
+            return None
+        if not shape_ids:
+            print("\033[1;33mВыборка не содержит фигур\033[0m")
+            return None
+        return shape_ids, numbers
+    
+    def move_selection(self, args):
+        """
+        Переместить выбранные фигуры.
+        
+        Args:
+            args (list): Аргументы команды (выборка, dx, dy и необязательный dz)
+        """
+        parsed = self._parse_transform_args(args, "move <выборка> dx dy [dz]", 2, 3)
+        if parsed is None:
             return
+        shape_ids, numbers = parsed
+        from transforms import move_shapes
+        
+        move_shapes(self._writable_shapes(shape_ids), *numbers)
+        self._reindex_shapes(shape_ids)
+        print(f"\033[1;32mПеремещено фигур: {len(shape_ids)}\033[0m")
+    
+    def scale_selection(self, args):
+        """
+        Масштабировать выбранные фигуры.
+        
+        Args:
+            args (list): Аргументы команды (выборка, коэффициент и необязательный центр)
+        """
+        parsed = self._parse_transform_args(args, "scale <выборка> k [px py [pz]]", 1, 4)
+        if parsed is None:
+            return
+        shape_ids, numbers = parsed
+        from transforms import scale_shapes
+        
+        try:
+            scale_shapes(self._writable_shapes(shape_ids), *numbers)
+        except ValueError as e:
+            print(f"\033[1;31mОшибка: {e}\033[0m")
+            return
+        self._reindex_shapes(shape_ids)
+        print(f"\033[1;32mМасштабировано фигур: {len(shape_ids)}\033[0m")
+    
+    def rotate_selection(self, args):
+        """
+        Повернуть выбранные фигуры.
+        
+        Args:
+            args (list): Аргументы команды (выборка, угол в градусах и необязательный центр)
+        """
+        parsed = self._parse_transform_args(args, "rotate <выборка> угол [px py]", 1, 3)
+        if parsed is None:
+            return
+        shape_ids, numbers = parsed
+        from transforms import rotate_shapes
+        
+        try:
+            rotate_shapes(self._writable_shapes(shape_ids), *numbers)
+        except ValueError as e:
+            print(f"\033[1;31mОшибка: {e}\033[0m")
+            return
+        self._reindex_shapes(shape_ids)
+        print(f"\033[1;32mПовернуто фигур: {len(shape_ids)}\033[0m")
+    
+    def list_shapes(self, args=None):
+        """
+        Показать список фигур.
+        
+        Args:
+            args (list, optional): Выборка фигур (по умолчанию - все фигуры)
+                и необязательный порядок --sort-by <поле> [--desc]
+        """
+        if not self.shapes:
+            print("\033[1;33mСписок фигур пуст\033[0m")
+            return
+        
+        args = list(args or [])
+        sort_field = None
+        descending = False
+        if '--desc' in args:
+            args.remove('--desc')
+            descending = True
+        if '--sort-by' in args:
+            position = args.index('--sort-by')
+            if position + 1 >= len(args):
+                print("\033[1;31mОшибка: Не указано поле сортировки\033[0m")
+                return
+            sort_field = args[position + 1].lower()
+            del args[position:position + 2]
+            if not self._check_rank_field(sort_field):
+                return
+        
+        shape_ids = list(self.shapes)
+        if args:
+            shape_ids = self._resolve_selection(args[0])
+            if shape_ids is None:
+                return
+            if not shape_ids:
+                print("\033[1;33mВыборка не содержит фигур\033[0m")
+                return
+        
+        print("\n\033[1;36mСписок фигур:\033[0m")
+        if sort_field is None:
+            for shape_id in shape_ids:
+                print(f"  \033[1;34m{shape_id}\033[0m: \033[1;37m{self.shapes[shape_id]}\033[0m")
+            return
+        
+        from ranking import sort_ids
+        
+        ranked, missing = sort_ids(self.shapes, shape_ids, sort_field, descending)
+        for value, shape_id in ranked:
+            print(f"  \033[1;34m{shape_id}\033[0m: \033[1;37m{self.shapes[shape_id]}\033[0m ({sort_field}={value:g})")
+        for shape_id in missing:
+            print(f"  \033[1;34m{shape_id}\033[0m: \033[1;37m{self.shapes[shape_id]}\033[0m")
+    
+    def top_command(self, args):
+        """
+        Показать K фигур с наибольшими значениями метрики или параметра.
+        
+        Args:
+            args (list): Аргументы команды: K, by, поле и необязательный тип или выборка
+        """
+        usage = "\033[1;33mИспользование: top K by area|perimeter|volume|surface_area|... [<тип>|<выборка>]\033[0m"
+        if len(args) < 3 or args[1].lower() != 'by':
+            print("\033[1;31mОшибка: Неверные аргументы команды top\033[0m")
+            print(usage)
+            return
+        try:
+            k = int(args[0])
+            if k < 1:
+                raise ValueError
+        except ValueError:
+            print("\033[1;31mОшибка: K должно быть положительным целым числом\033[0m")
+            return
+        field = args[2].lower()
+        if not self._check_rank_field(field):
+            return
+        
+        if len(args) > 3 and args[3].lower() in self.shape_types:
+            shape_class = self._get_shape_class(args[3].lower())
+            shape_ids = [shape_id for shape_id, shape in self.shapes.items() if isinstance(shape, shape_class)]
+        elif len(args) > 3:
+            shape_ids = self._resolve_selection(args[3])
+            if shape_ids is None:
+                return
+        else:
+            shape_ids = list(self.shapes)
+        
+        from ranking import top_k
+        
+        best = top_k(self.shapes, shape_ids, field, k)
+        if not best:
+            print(f"\033[1;33mНет фигур с полем {field}\033[0m")
+            return
+        print(f"\n\033[1;36mФигуры с наибольшим значением {field}:\033[0m")
+        for rank, (value, shape_id) in enumerate(best, 1):
+            print(f"  {rank}. \033[1;34m{shape_id}\033[0m: {field}={value:g} \033[1;37m{self.shapes[shape_id]}\033[0m")
+    
+    def _check_rank_field(self, field):
+        """
+        Проверить, что поле есть хотя бы у одного типа фигур.
+        
+        Args:
+            field (str): Имя метрики или параметра
+        
+        Returns:
+            bool: True, если поле известно
+        """
+        from query import field_getter
+        
+        if any(field_getter(self._get_shape_class(shape_type), field) for shape_type in self.shape_types):
+            return True
+        print(f"\033[1;31mОшибка: Неизвестное поле '{field}'\033[0m")
+        return False
+    
+    def show_shape_info(self, args):
+        """
+        Показать подробную информацию о фигуре или выборке фигур.
+        
+        Одна фигура, заданная числом, выводится отформатированным JSON.
+        Для выборки выводится таблица или NDJSON (--ndjson) - по строке на фигуру;
+        строки записываются в stdout блоками.
+        
+        Args:
+            args (list): Аргументы команды (ID фигуры или выборка и необязательный
+                формат --table или --ndjson)
+        """
+        args = list(args)
+        output_format = None
+        for flag in ('--table', '--ndjson'):
+            if flag in args:
+                args.remove(flag)
+                output_format = flag[2:]
+        if len(args) != 1:
+            print("\033[1;31mОшибка: Не указан ID фигуры\033[0m" if not args
+                  else "\033[1;31mОшибка: Неверные аргументы команды info\033[0m")
+            print("\033[1;33mИспользование: info <id>|<выборка> [--table|--ndjson]\033[0m")
+            return
+        
+        if args[0].isdigit():
+            shape_id = int(args[0])
+            if shape_id not in self.shapes:
+                print(f"\033[1;31mОшибка: Фигура с ID {shape_id} не найдена\033[0m")
+                return
+            if output_format is None:
+                self._print_shape_info(self.shapes[shape_id])
+                return
+            shape_ids = [shape_id]
+        else:
+            shape_ids = self._resolve_selection(args[0])
+            if shape_ids is None:
+                return
+            if not shape_ids:
+                print("\033[1;33mВыборка не содержит фигур\033[0m")
+                return
+        
+        if output_format == 'ndjson':
+            import json
+            
+            encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+            lines = (encode(self.shapes[shape_id].get_info()) for shape_id in shape_ids)
+        else:
+            print(f"\n\033[1;36mИнформация о фигурах ({len(shape_ids)} шт.):\033[0m")
+            print(f"  {'id':>8}  {'тип':<15} {'имя':<20} {'площадь/объем':>16} {'периметр/поверхн.':>18}")
+            lines = (self._format_info_row(self.shapes[shape_id]) for shape_id in shape_ids)
+        
+        write = sys.stdout.write
+        while True:
+            chunk = list(islice(lines, self.INFO_CHUNK_LINES))
+            if not chunk:
+                break
+            chunk.append('')
+            write('\n'.join(chunk))
+        sys.stdout.flush()
+    
+    def _print_shape_info(self, shape):
+        """
+        Вывести информацию о фигуре отформатированным JSON.
+        
+        Args:
+            shape (Shape): Фигура
+        """
+        import json
         
-        shape = self.shapes[shape_id]
         info = shape.get_info()
         
-        print(f"\n\033[1;36mИнформация о фигуре {shape_id}:\033[0m")
+        print(f"\n\033[1;36mИнформация о фигуре {shape.id}:\033[0m")
         # Форматируем JSON для лучшего отображения
         formatted_json = json.dumps(info, indent=2, ensure_ascii=False)
         # Добавляем цвета для ключей и значений
@@ -218,34 +877,72 @@ class VectorEditor:
         formatted_json = formatted_json.replace(':', '\033[0m:')
         print(formatted_json)
     
+    @staticmethod
+    def _format_info_row(shape):
+        """
+        Получить строку таблицы команды info.
+        
+        Args:
+            shape (Shape): Фигура
+        
+        Returns:
+            str: ID, тип, имя и основные метрики фигуры
+        """
+        try:
+            if shape.dimension == 2:
+                measure, boundary = shape.get_area(), shape.get_perimeter()
+            else:
+                measure, boundary = shape.get_volume(), shape.get_surface_area()
+            metrics = f"{measure:>16.6g} {boundary:>18.6g}"
+        except Exception as e:
+            metrics = f"{'ошибка: ' + str(e):>35}"
+        return f"  {shape.id:>8}  {type(shape).__name__:<15} {str(shape.name):<20} {metrics}"
+    
     def delete_shape(self, args):
         """
-        Удалить фигуру.
+        Удалить фигуру или выборку фигур.
+        
+        Для выборки подтверждение запрашивается один раз.
         
         Args:
-            args (list): Аргументы команды (ID фигуры)
+            args (list): Аргументы команды (ID фигуры или выборка)
         """
         if not args:
             print("\033[1;31mОшибка: Не указан ID фигуры\033[0m")
             return
         
-        try:
+        if args[0].isdigit():
             shape_id = int(args[0])
-        except ValueError:
-            print("\033[1;31mОшибка: ID должен быть числом\033[0m")
+            if shape_id not in self.shapes:
+                print(f"\033[1;31mОшибка: Фигура с ID {shape_id} не найдена\033[0m")
+                return
+            
+            # Запрос подтверждения перед удалением
+            shape = self.shapes[shape_id]
+            if self._confirm(f"Вы уверены, что хотите удалить фигуру: {shape}?"):
+                self._remove_shape(shape_id)
+                self.metrics.increment('shapes_deleted')
+                print(f"\033[1;32mУдалена фигура: {shape}\033[0m")
+            else:
+                print("\033[1;33mУдаление отменено\033[0m")
             return
         
-        if shape_id not in self.shapes:
-            print(f"\033[1;31mОшибка: Фигура с ID {shape_id} не найдена\033[0m")
-            return
+        from selection import format_id_ranges
         
-        # Запрос подтверждения перед удалением
-        shape = self.shapes[shape_id]
-        print(f"\033[1;33mВы уверены, что хотите удалить фигуру: {shape}? (y/n)\033[0m")
-        confirm = input("\033[1;32m> \033[0m").strip().lower()
-        if confirm == 'y' or confirm == 'yes' or confirm == 'да':
-            self.shapes.pop(shape_id)
-            print(f"\033[1;32mУдалена фигура: {shape}\033[0m")
+        shape_ids = self._resolve_selection(args[0])
+        if shape_ids is None:
+            return
+        if not shape_ids:
+            print("\033[1;33mВыборка не содержит фигур\033[0m")
+            return
+        if args[0].lower() == 'selected':
+            question = f"Вы уверены, что хотите удалить найденные фигуры ({len(shape_ids)} шт.)?"
+        else:
+            question = f"Вы уверены, что хотите удалить фигуры {format_id_ranges(shape_ids)} ({len(shape_ids)} шт.)?"
+        if self._confirm(question):
+            self._remove_shapes(shape_ids)
+            self.metrics.increment('shapes_deleted', len(shape_ids))
+            print(f"\033[1;32mУдалено фигур: {len(shape_ids)}\033[0m")
         else:
             print("\033[1;33mУдаление отменено\033[0m")
     
@@ -262,10 +959,10 @@ class VectorEditor:
             
         count = len(self.shapes)
         # Запрос подтверждения перед удалением всех фигур
-        print(f"\033[1;33mВы уверены, что хотите удалить все фигуры ({count} шт.)? (y/n)\033[0m")
-        confirm = input("\033[1;32m> \033[0m").strip().lower()
-        if confirm == 'y' or confirm == 'yes' or confirm == 'да':
+        if self._confirm(f"Вы уверены, что хотите удалить все фигуры ({count} шт.)?"):
             self.shapes.clear()
+            self._rebuild_indexes()
+            self.metrics.increment('shapes_deleted', count)
             print(f"\033[1;32mУдалено фигур: {count}\033[0m")
         else:
             print("\033[1;33mУдаление отменено\033[0m")
@@ -275,26 +972,68 @@ class VectorEditor:
         Сохранить фигуры в файл.
         
         Args:
-            args (list): Аргументы команды (имя файла)
+            args (list): Аргументы команды (имя файла и необязательные флаги
+                --compress [zlib|lzma] и --shards N)
         """
         if not args:
             print("\033[1;31mОшибка: Не указано имя файла\033[0m")
             return
         
         filename = args[0]
+        codec = None
+        shards = None
+        usage = "\033[1;33mИспользование: save <filename> [--compress [zlib|lzma]] [--shards N]\033[0m"
+        options = args[1:]
+        while options:
+            option = options.pop(0)
+            if option == '--compress':
+                codec = 'zlib'
+                if options and not options[0].startswith('--'):
+                    codec = options.pop(0).lower()
+                if codec not in ('zlib', 'lzma'):
+                    print(f"\033[1;31mОшибка: Неизвестный кодек сжатия '{codec}'\033[0m")
+                    return
+            elif option == '--shards':
+                try:
+                    shards = int(options.pop(0))
+                    if shards < 1:
+                        raise ValueError
+                except (IndexError, ValueError):
+                    print("\033[1;31mОшибка: Количество шардов должно быть положительным целым числом\033[0m")
+                    return
+            else:
+                print(f"\033[1;31mОшибка: Неизвестный параметр '{option}'\033[0m")
+                print(usage)
+                return
         
         # Добавляем расширение .shapes, если оно не указано
         if not filename.endswith('.shapes'):
             filename += '.shapes'
         
         try:
+            if shards is not None:
+                from scene_shards import write_sharded_scene
+                
+                size = write_sharded_scene(filename, self.shapes, self.next_id, shards, codec or 'zlib')
+                self.metrics.increment('bytes_saved', size)
+                print(f"\033[1;32mФигуры успешно сохранены в файл '{filename}' (шардов: {shards})\033[0m")
+                return
+            
             with open(filename, 'wb') as file:
-                # Создаем словарь с данными для сохранения
-                data = {
-                    'shapes': self.shapes,
-                    'next_id': self.next_id
-                }
-                pickle.dump(data, file)
+                if codec is None:
+                    import pickle
+                    
+                    # Создаем словарь с данными для сохранения
+                    data = {
+                        'shapes': self.shapes,
+                        'next_id': self.next_id
+                    }
+                    pickle.dump(data, file)
+                else:
+                    from scene_format import write_scene
+                    
+                    write_scene(file, self.shapes, self.next_id, codec)
+                self.metrics.increment('bytes_saved', file.tell())
             print(f"\033[1;32mФигуры успешно сохранены в файл '{filename}'\033[0m")
         except Exception as e:
             print(f"\033[1;31mОшибка при сохранении фигур: {e}\033[0m")
@@ -322,7 +1061,7 @@ class VectorEditor:
         
         try:
             with open(filename, 'rb') as file:
-                data = pickle.load(file)
+                data = self._read_scene_file(file)
                 
                 # Проверяем структуру загруженных данных
                 if not isinstance(data, dict) or 'shapes' not in data or 'next_id' not in data:
@@ -331,21 +1070,739 @@ class VectorEditor:
                 
                 # Запрос подтверждения перед загрузкой, если есть текущие фигуры
                 if self.shapes:
-                    print(f"\033[1;33mВнимание: У вас уже есть {len(self.shapes)} фигур. Загрузка заменит их. Продолжить? (y/n)\033[0m")
-                    confirm = input("\033[1;32m> \033[0m").strip().lower()
-                    if not (confirm == 'y' or confirm == 'yes' or confirm == 'да'):
+                    if not self._confirm(f"Внимание: У вас уже есть {len(self.shapes)} фигур. Загрузка заменит их. Продолжить?"):
                         print("\033[1;33mЗагрузка отменена\033[0m")
                         return
                 
                 # Очищаем текущие фигуры и загружаем новые
                 self.shapes = data['shapes']
                 self.next_id = data['next_id']
+                from flyweight import share_geometry
+                share_geometry(self.shapes.values())
+                self._rebuild_indexes()
+                self.metrics.increment('shapes_loaded', len(self.shapes))
+                self.metrics.increment('bytes_loaded', data.get('size', file.tell()))
                 
                 print(f"\033[1;32mФигуры успешно загружены из файла '{filename}'\033[0m")
                 print(f"\033[1;32mЗагружено фигур: {len(self.shapes)}\033[0m")
         except Exception as e:
             print(f"\033[1;31mОшибка при загрузке фигур: {e}\033[0m")
     
+    def query_3d(self, args):
+        """
+        Найти 3D фигуры, пересекающие область.
+        
+        Args:
+            args (list): Аргументы команды (координаты двух противоположных углов области)
+        """
+        if len(args) < 6:
+            print("\033[1;31mОшибка: Недостаточно параметров\033[0m")
+            print("\033[1;33mИспользование: query3d x1 y1 z1 x2 y2 z2\033[0m")
+            return
+        
+        try:
+            x1, y1, z1, x2, y2, z2 = (float(arg) for arg in args[:6])
+        except ValueError:
+            print("\033[1;31mОшибка: Параметры должны быть числами\033[0m")
+            return
+        
+        box = (min(x1, x2), min(y1, y2), min(z1, z2), max(x1, x2), max(y1, y2), max(z1, z2))
+        found = sorted(self.index3d.query(box))
+        if not found:
+            print("\033[1;33mВ указанной области нет 3D фигур\033[0m")
+            return
+        
+        print(f"\n\033[1;36mНайдено 3D фигур: {len(found)}\033[0m")
+        for shape_id in found:
+            print(f"  \033[1;34m{shape_id}\033[0m: \033[1;37m{self.shapes[shape_id]}\033[0m")
+    
+    def hit_command(self, args):
+        """
+        Найти 2D фигуры, содержащие точки (или проверить случайную выборку точек).
+        
+        Args:
+            args (list): Аргументы команды: координаты точек или --sample N,
+                необязательный допуск --tol для точек и отрезков
+        """
+        usage = "\033[1;33mИспользование: hit x y [x y ...] [--tol d] | hit --sample N [--tol d]\033[0m"
+        tolerance = 0.0
+        sample = None
+        coordinates = []
+        try:
+            position = 0
+            while position < len(args):
+                arg = args[position]
+                if arg in ('--tol', '--sample'):
+                    if position + 1 >= len(args):
+                        raise ValueError
+                    if arg == '--tol':
+                        tolerance = float(args[position + 1])
+                    else:
+                        sample = int(args[position + 1])
+                    position += 2
+                else:
+                    coordinates.append(float(arg))
+                    position += 1
+            if tolerance < 0 or (sample is not None and (sample < 1 or coordinates)):
+                raise ValueError
+        except ValueError:
+            print("\033[1;31mОшибка: Неверные аргументы команды hit\033[0m")
+            print(usage)
+            return
+        if sample is None and (not coordinates or len(coordinates) % 2):
+            print("\033[1;31mОшибка: Координаты точек должны задаваться парами x y\033[0m")
+            print(usage)
+            return
+        
+        from hittest import hit_test
+        
+        if sample is not None:
+            boxes = [shape.get_bounding_box() for shape in self.shapes.values() if shape.dimension == 2]
+            if not boxes:
+                print("\033[1;33mВ сцене нет 2D фигур\033[0m")
+                return
+            import random
+            
+            min_x = min(box[0] for box in boxes)
+            min_y = min(box[1] for box in boxes)
+            max_x = max(box[2] for box in boxes)
+            max_y = max(box[3] for box in boxes)
+            xs = [random.uniform(min_x, max_x) for _ in range(sample)]
+            ys = [random.uniform(min_y, max_y) for _ in range(sample)]
+            start = time.perf_counter()
+            hits = hit_test(self.shapes, self.index2d, xs, ys, tolerance)
+            elapsed = time.perf_counter() - start
+            covered = sum(1 for ids in hits if ids)
+            print(f"\033[1;32mТочек: {sample}, попавших в фигуры: {covered} ({covered / sample:.1%}), "
+                  f"попаданий: {sum(map(len, hits))} ({elapsed * 1000:.1f} мс)\033[0m")
+            return
+        
+        xs = coordinates[0::2]
+        ys = coordinates[1::2]
+        for x, y, ids in zip(xs, ys, hit_test(self.shapes, self.index2d, xs, ys, tolerance)):
+            if not ids:
+                print(f"\033[1;33mТочка ({x:g}, {y:g}): фигур нет\033[0m")
+                continue
+            print(f"\n\033[1;36mТочка ({x:g}, {y:g}): фигур {len(ids)}\033[0m")
+            for shape_id in ids:
+                print(f"  \033[1;34m{shape_id}\033[0m: \033[1;37m{self.shapes[shape_id]}\033[0m")
+    
+    def coverage_command(self, args):
+        """
+        Вычислить площадь объединения 2D фигур (перекрытия учитываются один раз).
+        
+        Args:
+            args (list): Аргументы команды: необязательная выборка и допустимая
+                относительная погрешность --error для криволинейных фигур
+        """
+        from scene_coverage import DEFAULT_RELATIVE_ERROR, coverage_area
+        
+        relative_error = DEFAULT_RELATIVE_ERROR
+        spec = 'all'
+        try:
+            position = 0
+            while position < len(args):
+                if args[position] == '--error':
+                    relative_error = float(args[position + 1])
+                    if not 0 < relative_error < 1:
+                        raise ValueError
+                    position += 2
+                elif spec == 'all' and position == 0:
+                    spec = args[position]
+                    position += 1
+                else:
+                    raise ValueError
+        except (ValueError, IndexError):
+            print("\033[1;31mОшибка: Неверные аргументы команды coverage\033[0m")
+            print("\033[1;33mИспользование: coverage [<выборка>] [--error e], 0 < e < 1 (по умолчанию 0.001)\033[0m")
+            return
+        shape_ids = self._resolve_selection(spec)
+        if shape_ids is None:
+            return
+        shapes = [self.shapes[shape_id] for shape_id in shape_ids if self.shapes[shape_id].dimension == 2]
+        if not shapes:
+            print("\033[1;33mВыборка не содержит 2D фигур\033[0m")
+            return
+        
+        start = time.perf_counter()
+        result = coverage_area(shapes, relative_error)
+        elapsed = time.perf_counter() - start
+        total = sum(shape.get_area() for shape in shapes)
+        
+        print(f"\n\033[1;36mПокрытие 2D фигур: {len(shapes)}\033[0m")
+        if result.exact:
+            print(f"  Площадь объединения: \033[1;32m{result.area:g}\033[0m (точно)")
+        else:
+            print(f"  Площадь объединения: \033[1;32m{result.area:g} ± {result.error:.3g}\033[0m")
+        print(f"  Сумма площадей фигур: {total:g}")
+        print(f"  Площадь перекрытий: {max(total - result.area, 0.0):g}")
+        print(f"  Выпуклых частей: {result.pieces}, ячеек: {result.cells} ({elapsed * 1000:.1f} мс)")
+    
+    def export_command(self, args):
+        """
+        Экспортировать 3D фигуры в файл другого формата.
+        
+        Args:
+            args (list): Аргументы команды: формат (stl), имя файла
+                и необязательная выборка (по умолчанию все фигуры)
+        """
+        if len(args) not in (2, 3) or args[0].lower() != 'stl':
+            print("\033[1;31mОшибка: Неверные аргументы команды export\033[0m")
+            print("\033[1;33mИспользование: export stl <filename> [<выборка>] (поддерживается формат stl)\033[0m")
+            return
+        shape_ids = self._resolve_selection(args[2] if len(args) > 2 else 'all')
+        if shape_ids is None:
+            return
+        shapes = [self.shapes[shape_id] for shape_id in shape_ids if self.shapes[shape_id].dimension == 3]
+        if not shapes:
+            print("\033[1;33mВыборка не содержит 3D фигур\033[0m")
+            return
+        filename = args[1]
+        if not filename.endswith('.stl'):
+            filename += '.stl'
+        
+        from stl import write_stl
+        
+        start = time.perf_counter()
+        try:
+            with open(filename, 'wb') as file:
+                triangles = write_stl(file, shapes)
+                size = file.tell()
+        except OSError as e:
+            print(f"\033[1;31mОшибка при экспорте фигур: {e}\033[0m")
+            return
+        elapsed = time.perf_counter() - start
+        
+        print(f"\033[1;32mФигуры экспортированы в файл '{filename}': фигур {len(shapes)}, "
+              f"треугольников {triangles} ({size / 1024:.1f} КБ, {elapsed * 1000:.1f} мс)\033[0m")
+        skipped = len(shape_ids) - len(shapes)
+        if skipped:
+            print(f"\033[1;33mПропущено 2D фигур: {skipped}\033[0m")
+    
+    def distances_command(self, args):
+        """
+        Вычислить матрицу попарных расстояний между фигурами выборки и записать ее в файл .npy.
+        
+        Рядом записывается файл <имя>.ids.npy с ID фигур в порядке строк матрицы.
+        
+        Args:
+            args (list): Аргументы команды: выборка, имя файла и необязательные
+                флаги --boundary, --dtype f8|f4 и --tile N
+        """
+        from distances import DEFAULT_TILE, DTYPES, shape_points, shape_radii, write_distance_matrix, write_npy_vector
+        
+        usage = f"Использование: distances <выборка> <filename> [--boundary] [--dtype f8|f4] [--tile N (по умолчанию {DEFAULT_TILE})]"
+        args = list(args)
+        boundary = '--boundary' in args
+        if boundary:
+            args.remove('--boundary')
+        dtype = 'f8'
+        tile = DEFAULT_TILE
+        try:
+            for flag in ('--dtype', '--tile'):
+                if flag in args:
+                    position = args.index(flag)
+                    value = args[position + 1]
+                    del args[position:position + 2]
+                    if flag == '--dtype':
+                        dtype = value.lower()
+                        if dtype not in DTYPES:
+                            raise ValueError
+                    else:
+                        tile = int(value)
+                        if tile < 1:
+                            raise ValueError
+            if len(args) != 2:
+                raise ValueError
+        except (ValueError, IndexError):
+            print("\033[1;31mОшибка: Неверные аргументы команды distances\033[0m")
+            print(f"\033[1;33m{usage}\033[0m")
+            return
+        
+        shape_ids = self._resolve_selection(args[0])
+        if shape_ids is None:
+            return
+        if not shape_ids:
+            print("\033[1;33mВыборка не содержит фигур\033[0m")
+            return
+        filename = args[1]
+        if not filename.endswith('.npy'):
+            filename += '.npy'
+        
+        shapes = [self.shapes[shape_id] for shape_id in shape_ids]
+        start = time.perf_counter()
+        try:
+            points = shape_points(shapes)
+            radii = shape_radii(shapes) if boundary else None
+            tiles = write_distance_matrix(filename, points, radii, dtype, tile)
+            write_npy_vector(filename[:-len('.npy')] + '.ids.npy', shape_ids, 'q', '<i8')
+        except ValueError as e:
+            print(f"\033[1;31mОшибка: {e}\033[0m")
+            return
+        except OSError as e:
+            print(f"\033[1;31mОшибка при записи матрицы расстояний: {e}\033[0m")
+            return
+        elapsed = time.perf_counter() - start
+        
+        size = len(shape_ids) ** 2 * int(dtype[1:])
+        kind = "между границами" if boundary else "между центрами"
+        print(f"\033[1;32mМатрица расстояний {kind} {len(shape_ids)}x{len(shape_ids)} ({size / 1024 / 1024:.1f} МБ) "
+              f"записана в файл '{filename}'\033[0m")
+        print(f"  Блоков: {tiles}, время: {elapsed:.2f} с")
+    
+    def _get_profiler(self):
+        """
+        Получить профилировщик команд, создавая его при первом обращении.
+        
+        Returns:
+            CommandProfiler: Профилировщик
+        """
+        if self.profiler is None:
+            from profiling import CommandProfiler
+            
+            self.profiler = CommandProfiler()
+        return self.profiler
+    
+    def profile_command(self, args):
+        """
+        Управлять профилированием времени выполнения команд.
+        
+        Args:
+            args (list): Аргументы команды (on, off или dump с именем файла)
+        """
+        action = args[0].lower() if args else None
+        if action == 'on':
+            self._get_profiler().start()
+            print("\033[1;32mПрофилирование команд включено\033[0m")
+        elif action == 'off':
+            if self.profiler is None or not self.profiler.enabled:
+                print("\033[1;33mПрофилирование не было включено\033[0m")
+                return
+            self.profiler.stop()
+            print("\033[1;32mПрофилирование команд выключено\033[0m")
+            print("\n\033[1;36mСамые затратные функции:\033[0m")
+            print(self.profiler.report())
+        elif action == 'dump':
+            if len(args) < 2:
+                print("\033[1;31mОшибка: Не указано имя файла\033[0m")
+                return
+            if self.profiler is None or not self.profiler.has_stats():
+                print("\033[1;31mОшибка: Нет данных профилирования, используйте 'profile on'\033[0m")
+                return
+            try:
+                self.profiler.dump(args[1])
+                print(f"\033[1;32mСтатистика профилирования сохранена в файл '{args[1]}'\033[0m")
+            except OSError as e:
+                print(f"\033[1;31mОшибка при сохранении статистики: {e}\033[0m")
+        else:
+            print("\033[1;31mОшибка: Неизвестное действие\033[0m")
+            print("\033[1;33mИспользование: profile on|off|dump <filename>\033[0m")
+    
+    def mem_command(self, args):
+        """
+        Анализировать выделения памяти командами.
+        
+        Args:
+            args (list): Аргументы команды (snapshot, diff или off)
+        """
+        action = args[0].lower() if args else None
+        if action == 'snapshot':
+            traced = self._get_profiler().take_snapshot()
+            print(f"\033[1;32mСнимок памяти сохранен (отслеживается {traced / 1024:.1f} КБ)\033[0m")
+        elif action == 'diff':
+            if self.profiler is None or not self.profiler.has_snapshot():
+                print("\033[1;31mОшибка: Нет снимка памяти, используйте 'mem snapshot'\033[0m")
+                return
+            print("\n\033[1;36mМеста выделения памяти с наибольшим приростом:\033[0m")
+            for line in self.profiler.diff():
+                print(f"  \033[1;37m{line}\033[0m")
+        elif action == 'off':
+            if self.profiler is not None and self.profiler.has_snapshot():
+                self.profiler.stop_tracing()
+            print("\033[1;32mОтслеживание памяти выключено\033[0m")
+        else:
+            print("\033[1;31mОшибка: Неизвестное действие\033[0m")
+            print("\033[1;33mИспользование: mem snapshot|diff|off\033[0m")
+    
+    def memstat_command(self, args):
+        """
+        Показать оценку памяти сцены по типам фигур и категориям.
+        
+        Args:
+            args (list): Аргументы команды (необязательный размер выборки одного типа)
+        """
+        from memstat import CATEGORIES, DEFAULT_SAMPLE_SIZE, format_size, process_rss, scene_memory
+        
+        usage = f"Использование: memstat [размер выборки] (по умолчанию {DEFAULT_SAMPLE_SIZE})"
+        if len(args) > 1:
+            print("\033[1;31mОшибка: Неверные аргументы команды memstat\033[0m")
+            print(f"\033[1;33m{usage}\033[0m")
+            return
+        try:
+            sample_size = int(args[0]) if args else DEFAULT_SAMPLE_SIZE
+            if sample_size < 1:
+                raise ValueError
+        except ValueError:
+            print("\033[1;31mОшибка: Размер выборки должен быть положительным целым числом\033[0m")
+            return
+        
+        start = time.perf_counter()
+        report = scene_memory(self, sample_size)
+        elapsed = time.perf_counter() - start
+        
+        print(f"\n\033[1;36mПамять сцены ({len(self.shapes)} фигур, оценка по выборке, {elapsed * 1000:.1f} мс):\033[0m")
+        if report['types']:
+            header = ''.join(f"{category:>11}" for category in CATEGORIES)
+            print(f"  {'тип':<15}{'фигур':>9}{'выборка':>9}{header}{'всего':>11}")
+            print(f"  {'':<33}{'байт на фигуру':^55}".rstrip())
+            for row in report['types']:
+                sizes = ''.join(f"{row['per_shape'][category]:>11.0f}" for category in CATEGORIES)
+                print(f"  \033[1;37m{row['type']:<15}\033[0m{row['count']:>9}{row['sampled']:>9}"
+                      f"{sizes}{format_size(row['total']):>11}")
+        shared = ', '.join(f"{name} {format_size(size)}" for name, size in report['shared'].items())
+        print(f"  Общие структуры: {shared} (узлов индексов: {report['nodes']})")
+        
+        rss, peak = process_rss()
+        line = f"Итого по оценке: {format_size(report['total'])}"
+        if rss is not None:
+            line += f", {'пиковый ' if peak else ''}RSS процесса: {format_size(rss)}"
+        print(f"\033[1;32m{line}\033[0m")
+    
+    def metrics_command(self, args):
+        """
+        Показать метрики производительности или настроить их экспорт.
+        
+        Args:
+            args (list): Аргументы команды (пусто, reset или export с именем файла и интервалом)
+        """
+        action = args[0].lower() if args else None
+        if action == 'reset':
+            self.metrics.reset()
+            print("\033[1;32mМетрики сброшены\033[0m")
+            return
+        if action == 'export':
+            if len(args) < 2:
+                print("\033[1;31mОшибка: Не указано имя файла\033[0m")
+                print("\033[1;33mИспользование: metrics export <filename> [интервал в секундах] | metrics export off\033[0m")
+                return
+            if args[1].lower() == 'off':
+                self.metrics.export_path = None
+                print("\033[1;32mЭкспорт метрик выключен\033[0m")
+                return
+            try:
+                interval = float(args[2]) if len(args) > 2 else self.metrics.export_interval
+            except ValueError:
+                print("\033[1;31mОшибка: Интервал должен быть числом\033[0m")
+                return
+            self.metrics.export_path = args[1]
+            self.metrics.export_interval = interval
+            try:
+                self.metrics.export()
+            except OSError as e:
+                self.metrics.export_path = None
+                print(f"\033[1;31mОшибка при записи метрик: {e}\033[0m")
+                return
+            print(f"\033[1;32mМетрики записываются в файл '{args[1]}' не чаще раза в {interval:g} с\033[0m")
+            return
+        if action is not None:
+            print("\033[1;31mОшибка: Неизвестное действие\033[0m")
+            print("\033[1;33mИспользование: metrics [reset] | metrics export <filename> [интервал] | metrics export off\033[0m")
+            return
+        
+        print("\n\033[1;36mЗадержки команд (мс):\033[0m")
+        print(f"  \033[1;37m{'команда':<12}{'кол-во':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}\033[0m")
+        for command, count, p50, p95, p99, maximum in self.metrics.summary():
+            print(f"  {command:<12}{count:>8}{p50 * 1000:>10.3f}{p95 * 1000:>10.3f}"
+                  f"{p99 * 1000:>10.3f}{maximum * 1000:>10.3f}")
+        
+        print("\n\033[1;36mСчетчики:\033[0m")
+        for counter, value in self.metrics.counters.items():
+            print(f"  \033[1;37m{counter:<16}\033[0m{value}")
+    
+    def merge_shapes(self, args):
+        """
+        Добавить фигуры из файла сцены к текущим.
+        
+        Фигуры читаются поблочно и получают новые ID из непрерывного диапазона,
+        начинающегося с текущего next_id (в порядке следования в файле).
+        
+        Args:
+            args (list): Аргументы команды (имя файла)
+        """
+        if not args:
+            print("\033[1;31mОшибка: Не указано имя файла\033[0m")
+            return
+        
+        filename = args[0]
+        if not filename.endswith('.shapes'):
+            filename += '.shapes'
+        if not os.path.exists(filename):
+            print(f"\033[1;31mОшибка: Файл '{filename}' не найден\033[0m")
+            return
+        
+        first_id = self.next_id
+        try:
+            with open(filename, 'rb') as file:
+                for chunk in self._iter_scene_file(file):
+                    for _, shape in chunk:
+                        if type(shape).COMPOSITE:
+                            # Вложенные фигуры групп тоже получают новые ID
+                            for descendant in shape.iter_descendants():
+                                descendant.id = self.next_id
+                                self.next_id += 1
+                        self._add_shape(shape)
+                size = file.tell()
+        except Exception as e:
+            # Откатываем частично добавленные фигуры
+            for shape_id in range(first_id, self.next_id):
+                if shape_id in self.shapes:
+                    self._remove_shape(shape_id)
+            self.next_id = first_id
+            print(f"\033[1;31mОшибка при объединении сцен: {e}\033[0m")
+            return
+        
+        count = self.next_id - first_id
+        self.metrics.increment('shapes_loaded', count)
+        self.metrics.increment('bytes_loaded', size)
+        if count:
+            print(f"\033[1;32mДобавлено фигур из файла '{filename}': {count} (ID {first_id}-{self.next_id - 1})\033[0m")
+        else:
+            print(f"\033[1;33mВ файле '{filename}' нет фигур\033[0m")
+    
+    def diff_command(self, args):
+        """
+        Сравнить два файла сцены: добавленные, удаленные и измененные фигуры.
+        
+        Args:
+            args (list): Аргументы команды (имена двух файлов)
+        """
+        if len(args) != 2:
+            print("\033[1;31mОшибка: Укажите два файла сцены\033[0m")
+            print("\033[1;33mИспользование: diff <filename_a> <filename_b>\033[0m")
+            return
+        filenames = [name if name.endswith('.shapes') else name + '.shapes' for name in args]
+        for filename in filenames:
+            if not os.path.exists(filename):
+                print(f"\033[1;31mОшибка: Файл '{filename}' не найден\033[0m")
+                return
+        
+        from scene_diff import diff_scenes
+        from selection import format_id_ranges
+        
+        start = time.perf_counter()
+        try:
+            result = diff_scenes(*filenames)
+        except Exception as e:
+            print(f"\033[1;31mОшибка при сравнении сцен: {e}\033[0m")
+            return
+        elapsed = time.perf_counter() - start
+        
+        print(f"\n\033[1;36mСравнение '{filenames[0]}' и '{filenames[1]}':\033[0m")
+        if result.identical:
+            print("\033[1;32mСцены совпадают\033[0m")
+        for title, shape_ids, color, sign in (('Добавлено', result.added, '32', '+'),
+                                               ('Удалено', result.removed, '31', '-'),
+                                               ('Изменено', result.changed, '33', '~')):
+            if not shape_ids:
+                continue
+            print(f"  {title}: {len(shape_ids)} ({format_id_ranges(shape_ids)})")
+            for shape_id in shape_ids[:self.DIFF_DETAILS]:
+                if sign == '~':
+                    line = f"{result.old[shape_id]} -> {result.new[shape_id]}"
+                else:
+                    line = str((result.new if sign == '+' else result.old)[shape_id])
+                print(f"    \033[1;{color}m{sign} {line}\033[0m")
+            if len(shape_ids) > self.DIFF_DETAILS:
+                print(f"    ... и еще {len(shape_ids) - self.DIFF_DETAILS}")
+        print(f"  Блоков и шардов: {result.chunks}, совпали без чтения: {result.skipped_chunks} "
+              f"(фигур {result.skipped_shapes}), прочитано фигур: {result.decoded_shapes} ({elapsed * 1000:.1f} мс)")
+    
+    def _iter_scene_file(self, file):
+        """
+        Последовательно прочитать фигуры из файла сцены любого формата.
+        
+        Сжатый формат и сцены из шардов читаются поблочно; файл pickle
+        загружается целиком.
+        
+        Args:
+            file: Файл, открытый для чтения в двоичном режиме
+        
+        Yields:
+            list: Пары (ID, фигура) очередного блока
+        """
+        from scene_format import MAGIC
+        
+        prefix = file.read(len(MAGIC))
+        file.seek(0)
+        if prefix == MAGIC:
+            from scene_format import iter_chunks
+            
+            yield from iter_chunks(file)
+            return
+        
+        from scene_shards import is_manifest
+        
+        if is_manifest(prefix):
+            from scene_shards import iter_sharded_chunks
+            
+            yield from iter_sharded_chunks(file, os.path.dirname(os.path.abspath(file.name)))
+            return
+        
+        data = self._read_scene_file(file)
+        if not isinstance(data, dict) or 'shapes' not in data:
+            raise ValueError("Некорректный формат файла")
+        yield sorted(data['shapes'].items())
+    
+    def _read_scene_file(self, file):
+        """
+        Прочитать файл сцены в формате pickle, в сжатом формате или манифест шардов.
+        
+        Args:
+            file: Файл, открытый для чтения в двоичном режиме
+        
+        Returns:
+            dict: Данные сцены с ключами 'shapes' и 'next_id'
+                (для сцены из шардов также 'size' - общий размер файлов)
+        """
+        from scene_format import MAGIC
+        
+        prefix = file.read(len(MAGIC))
+        file.seek(0)
+        if prefix == MAGIC:
+            from scene_format import read_scene
+            
+            shapes, next_id = read_scene(file)
+            return {'shapes': shapes, 'next_id': next_id}
+        
+        from scene_shards import is_manifest
+        
+        if is_manifest(prefix):
+            from scene_shards import read_sharded_scene
+            
+            shapes, next_id, size = read_sharded_scene(file, os.path.dirname(os.path.abspath(file.name)))
+            return {'shapes': shapes, 'next_id': next_id, 'size': size}
+        
+        import pickle
+        
+        return pickle.load(file)
+    
+    def autosave_command(self, args):
+        """
+        Управлять фоновым автосохранением сцены.
+        
+        Args:
+            args (list): Аргументы команды: <file> [интервал] [zlib|lzma], off или пусто (состояние)
+        """
+        if not args:
+            if self.autosaver is None:
+                print("\033[1;33mАвтосохранение выключено\033[0m")
+                return
+            autosaver = self.autosaver
+            print(f"\033[1;36mАвтосохранение в файл '{autosaver.path}' каждые {autosaver.interval:g} с\033[0m")
+            print(f"  Сохранений: {autosaver.saves}, последнее заняло {autosaver.last_duration * 1000:.1f} мс")
+            if autosaver.last_error is not None:
+                print(f"\033[1;31m  Ошибка последнего сохранения: {autosaver.last_error}\033[0m")
+            return
+        
+        if args[0].lower() == 'off':
+            if self.autosaver is None:
+                print("\033[1;33mАвтосохранение уже выключено\033[0m")
+                return
+            self._stop_autosave()
+            print("\033[1;32mАвтосохранение выключено\033[0m")
+            return
+        
+        filename = args[0]
+        if not filename.endswith('.shapes'):
+            filename += '.shapes'
+        try:
+            interval = float(args[1]) if len(args) > 1 else 60.0
+            if interval < 0:
+                raise ValueError
+        except ValueError:
+            print("\033[1;31mОшибка: Интервал должен быть неотрицательным числом секунд\033[0m")
+            return
+        codec = args[2].lower() if len(args) > 2 else 'zlib'
+        if codec not in ('zlib', 'lzma'):
+            print(f"\033[1;31mОшибка: Неизвестный кодек сжатия '{codec}'\033[0m")
+            return
+        
+        from autosave import Autosaver
+        
+        self._stop_autosave()
+        self.autosaver = Autosaver(filename, interval, codec)
+        self._unsaved_changes = True
+        print(f"\033[1;32mСцена сохраняется в файл '{filename}' в фоне не чаще раза в {interval:g} с\033[0m")
+    
+    def _stop_autosave(self):
+        """Записать несохраненные изменения и остановить автосохранение."""
+        if self.autosaver is None:
+            return
+        if self._unsaved_changes:
+            # Дожидаемся записи предыдущего снимка, чтобы не потерять последние изменения
+            while not self.autosaver.offer(self.shapes, self.next_id):
+                time.sleep(0.01)
+            self._unsaved_changes = False
+        self.autosaver.stop()
+        self.autosaver = None
+    
+    def share_command(self, args):
+        """
+        Опубликовать снимок сцены в разделяемой памяти для рабочих процессов.
+        
+        Args:
+            args (list): Аргументы команды: publish [имя], off или пусто (состояние)
+        """
+        if not args:
+            if self.shared_scene is None:
+                print("\033[1;33mСцена не опубликована\033[0m")
+                return
+            scene = self.shared_scene
+            print(f"\033[1;36mСцена опубликована в разделяемой памяти '{scene.name}'\033[0m")
+            print(f"  Фигур: {scene.count}, классов в столбцах: {len(scene.types)}, размер: {scene.size} байт")
+            return
+        
+        action = args[0].lower()
+        if action == 'off':
+            if self.shared_scene is None:
+                print("\033[1;33mСцена не опубликована\033[0m")
+                return
+            name = self.shared_scene.name
+            self._stop_sharing()
+            print(f"\033[1;32mБлок разделяемой памяти '{name}' удален\033[0m")
+            return
+        if action != 'publish' or len(args) > 2:
+            print("\033[1;33mИспользование: share publish [имя] | share off | share\033[0m")
+            return
+        
+        from shared_scene import publish_scene
+        
+        # Новый снимок заменяет прежний: подключенные процессы продолжают
+        # работать со старым блоком, пока не отключатся от него
+        self._stop_sharing()
+        start = time.perf_counter()
+        try:
+            self.shared_scene = publish_scene(self.shapes, self.next_id, args[1] if len(args) > 1 else None)
+        except FileExistsError:
+            print(f"\033[1;31mОшибка: Блок разделяемой памяти '{args[1]}' уже существует\033[0m")
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        scene = self.shared_scene
+        print(f"\033[1;32mСнимок сцены ({scene.count} фигур, {scene.size} байт) опубликован "
+              f"в разделяемой памяти '{scene.name}' за {elapsed:.1f} мс\033[0m")
+    
+    def _stop_sharing(self):
+        """Удалить опубликованный снимок сцены."""
+        if self.shared_scene is None:
+            return
+        self.shared_scene.unlink()
+        self.shared_scene = None
+    
+    def close(self):
+        """Завершить работу редактора: дописать автосохранение и удалить опубликованную сцену."""
+        self._stop_autosave()
+        self._stop_sharing()
+    
     def exit_editor(self, args=None):
         """
         Выйти из редактора.
@@ -364,7 +1821,7 @@ class VectorEditor:
             command_line (str): Строка с командой
         """
         # Разбиваем строку на команду и аргументы
-        parts = command_line.strip().split()
+        parts = command_line.split()
         if not parts:
             return
         
@@ -373,11 +1830,56 @@ class VectorEditor:
         
         # Выполняем команду, если она существует
         if command in self.commands:
-            self.commands[command](args)
+            handler = self.commands[command]
+            start = time.perf_counter()
+            try:
+                if self.profiler is not None and self.profiler.enabled and command not in ('profile', 'mem'):
+                    self.profiler.call(handler, args)
+                else:
+                    handler(args)
+            finally:
+                self.metrics.observe(command, time.perf_counter() - start)
+                self.metrics.gauges['shapes'] = len(self.shapes)
+                export_error = self.metrics.maybe_export()
+                if export_error is not None:
+                    print(f"\033[1;31mОшибка при записи метрик: {export_error}. Экспорт метрик выключен\033[0m")
+                if command in self.MODIFYING_COMMANDS:
+                    self._unsaved_changes = True
+                if self._unsaved_changes and self.autosaver is not None and self.autosaver.due():
+                    if self.autosaver.offer(self.shapes, self.next_id):
+                        self._unsaved_changes = False
         else:
             print(f"Ошибка: Неизвестная команда '{command}'")
             print("Используйте 'help' для просмотра доступных команд")
     
+    def run_batch(self, filename):
+        """
+        Выполнить команды из файла без интерактивных запросов.
+        
+        Пустые строки и строки, начинающиеся с '#', пропускаются.
+        Операции, требующие подтверждения, выполняются без запроса.
+        
+        Args:
+            filename (str): Имя файла со скриптом или '-' для стандартного ввода
+        """
+        self.assume_yes = True
+        try:
+            script = sys.stdin if filename == '-' else open(filename, encoding='utf-8')
+        except OSError as e:
+            print(f"\033[1;31mОшибка: Не удалось открыть скрипт '{filename}': {e}\033[0m")
+            sys.exit(1)
+        try:
+            for command_line in script:
+                command_line = command_line.strip()
+                if command_line and not command_line.startswith('#'):
+                    try:
+                        self.process_command(command_line)
+                    except Exception as e:
+                        print(f"\033[1;31mОшибка: {e}\033[0m")
+        finally:
+            if script is not sys.stdin:
+                script.close()
+    
     def run(self):
         """Запустить интерактивный режим редактора."""
         print("\033[1;36m" + "=" * 60 + "\033[0m")
@@ -400,6 +1902,22 @@ class VectorEditor:
                 print(f"\033[1;31mОшибка: {e}\033[0m")
 
 
-if __name__ == "__main__":
+def main(argv):
+    """
+    Точка входа редактора.
+    
+    Args:
+        argv (list): Аргументы командной строки (без имени программы)
+    """
     editor = VectorEditor()
-    editor.run()
+    try:
+        if argv and argv[0] == '--batch':
+            editor.run_batch(argv[1] if len(argv) > 1 else '-')
+        else:
+            editor.run()
+    finally:
+        editor.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Оценка памяти сцены по типам фигур (команда memstat).
+
+Обходить глубоко все объекты сцены дорого, поэтому для каждого типа фигур
+измеряется случайная выборка, а средний размер умножается на количество
+фигур этого типа. Память фигуры делится на категории:
+
+  object     - сам объект фигуры (sys.getsizeof)
+  attributes - словарь атрибутов и значения параметров
+  names      - строка имени
+  index      - запись в пространственном индексе (прямоугольник и доля таблицы)
+  caches     - запись геометрии с кэшем метрик, сетки, агрегаты групп,
+               кэш метрик фигур с массивом вершин
+
+Объекты, на которые ссылаются несколько владельцев (интернированные имена,
+общие записи геометрии, значения параметров), делятся между ними поровну
+по счетчику ссылок. Для групп к размеру добавляется оценка вложенных фигур
+по выборке их нераздельных фигур. Общие структуры (словарь фигур, узлы
+индексов, таблица хранилища геометрии) оцениваются отдельно.
+"""
+
+import random
+import sys
+from collections import Counter
+from itertools import islice
+
+from flyweight import GEOMETRY_STORE
+from tessellation import Mesh
+
+DEFAULT_SAMPLE_SIZE = 200
+GROUP_SAMPLE_SIZE = 16  # нераздельных фигур группы в выборке
+
+CATEGORIES = ('object', 'attributes', 'names', 'index', 'caches')
+CACHE_ATTRS = ('_geometry', '_meshes', '_aggregates', '_metrics')
+
+
+def _owners(container, key):
+    """Количество владельцев значения container[key] (по счетчику ссылок)."""
+    return max(sys.getrefcount(container[key]) - _BASE_REFS + 1, 1)
+
+
+# Счетчик ссылок значения с единственным владельцем при вызове _owners
+_BASE_REFS = sys.getrefcount({0: object()}[0])
+
+
+def _shared_size(container, key):
+    """Доля размера значения container[key], приходящаяся на одного владельца."""
+    return sys.getsizeof(container[key]) / _owners(container, key)
+
+
+def _deep_size(value):
+    """Размер значения вместе с вложенными контейнерами, сетками и массивами."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        size += sum(map(_deep_size, value))
+    elif isinstance(value, dict):
+        size += sum(_deep_size(key) + _deep_size(item) for key, item in value.items())
+    elif isinstance(value, Mesh):
+        size += sum(_deep_size(getattr(value, attr)) for attr in Mesh.__slots__)
+    return size
+
+
+def _record_size(record):
+    """Размер записи геометрии с кэшем метрик и долями общих значений."""
+    values, metrics = record.values, record.metrics
+    size = sys.getsizeof(record) + sys.getsizeof(values) + sys.getsizeof(metrics)
+    size += sum(_shared_size(values, index) for index in range(len(values)))
+    size += sum(_shared_size(metrics, key) for key in metrics)
+    return size
+
+
+def _cache_size(state, key):
+    """Размер кэшированного атрибута фигуры."""
+    if key == '_geometry':
+        return _record_size(state[key]) / _owners(state, key)
+    if key == '_metrics':
+        # Пара (массив вершин, метрики): массив уже учтен в атрибутах
+        return sys.getsizeof(state[key]) + _deep_size(state[key][1])
+    return _deep_size(state[key])
+
+
+def shape_cost(shape, index=None):
+    """
+    Оценить память фигуры по категориям.
+    
+    Args:
+        shape (Shape): Фигура
+        index (SpatialTree, optional): Индекс, в котором хранится фигура
+    
+    Returns:
+        dict: Категория -> размер в байтах
+    """
+    cost = dict.fromkeys(CATEGORIES, 0)
+    cost['object'] = sys.getsizeof(shape)
+    state = shape.__dict__
+    attributes = sys.getsizeof(state)
+    for key in list(state):
+        if key == 'name':
+            cost['names'] += _shared_size(state, key)
+        elif key in CACHE_ATTRS:
+            if state[key] is not None:
+                cost['caches'] += _cache_size(state, key)
+        elif key != 'parent':
+            attributes += _shared_size(state, key)
+    cost['attributes'] = attributes
+    if index is not None:
+        cost['index'] = index.entry_size(shape.id)
+    
+    if getattr(shape, 'COMPOSITE', False):
+        leaves = list(islice(shape.iter_leaves(), GROUP_SAMPLE_SIZE))
+        if leaves:
+            scale = shape.count_leaves() / len(leaves)
+            for leaf in leaves:
+                for category, size in shape_cost(leaf).items():
+                    cost[category] += size * scale
+    return cost
+
+
+def sample_shapes(shapes, sample_size, rng=None):
+    """
+    Получить случайную выборку фигур каждого типа.
+    
+    Args:
+        shapes (list): Фигуры сцены
+        sample_size (int): Наибольший размер выборки одного типа
+        rng (random.Random, optional): Генератор случайных чисел
+    
+    Returns:
+        tuple: (Counter тип -> количество, dict тип -> список фигур выборки)
+    """
+    counts = Counter(map(type, shapes))
+    samples = {cls: [] for cls in counts}
+    rng = rng or random.Random()
+    positions = rng.sample(range(len(shapes)), min(len(shapes), sample_size * len(counts)))
+    for position in positions:
+        shape = shapes[position]
+        bucket = samples[type(shape)]
+        if len(bucket) < sample_size:
+            bucket.append(shape)
+    # Редкие типы могли не попасть в выборку - ищем их фигуры отдельно
+    for cls, bucket in samples.items():
+        if not bucket:
+            bucket.extend(islice((shape for shape in shapes if type(shape) is cls), sample_size))
+    return counts, samples
+
+
+def scene_memory(editor, sample_size=DEFAULT_SAMPLE_SIZE, rng=None):
+    """
+    Оценить память сцены редактора.
+    
+    Args:
+        editor (VectorEditor): Редактор
+        sample_size (int, optional): Наибольший размер выборки одного типа
+        rng (random.Random, optional): Генератор случайных чисел
+    
+    Returns:
+        dict: 'types' - список словарей (type, count, sampled, per_shape, total)
+              по убыванию оценки; 'shared' - общие структуры (имя -> байты);
+              'nodes' - количество узлов индексов; 'total' - общая оценка в байтах
+    """
+    counts, samples = sample_shapes(list(editor.shapes.values()), sample_size, rng)
+    indexes = {2: editor.index2d, 3: editor.index3d}
+    rows = []
+    for cls, count in counts.items():
+        sample = samples[cls]
+        per_shape = dict.fromkeys(CATEGORIES, 0.0)
+        for shape in sample:
+            for category, size in shape_cost(shape, indexes.get(shape.dimension)).items():
+                per_shape[category] += size / len(sample)
+        rows.append({
+            'type': cls.__name__,
+            'count': count,
+            'sampled': len(sample),
+            'per_shape': per_shape,
+            'total': sum(per_shape.values()) * count
+        })
+    rows.sort(key=lambda row: row['total'], reverse=True)
+    
+    shared = {'словарь фигур': sys.getsizeof(editor.shapes)}
+    nodes = 0
+    for index in indexes.values():
+        count, size = index.nodes_size()
+        nodes += count
+        shared['узлы индексов'] = shared.get('узлы индексов', 0) + size
+    shared['хранилище геометрии'] = GEOMETRY_STORE.table_size()
+    return {
+        'types': rows,
+        'shared': shared,
+        'nodes': nodes,
+        'total': sum(row['total'] for row in rows) + sum(shared.values())
+    }
+
+
+def process_rss():
+    """
+    Получить резидентную память процесса.
+    
+    Returns:
+        tuple: (размер в байтах, признак пикового значения) или (None, False),
+            если размер недоступен
+    """
+    try:
+        with open('/proc/self/status', encoding='ascii') as file:
+            for line in file:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024, False
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None, False
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # В macOS ru_maxrss измеряется в байтах, в Linux - в килобайтах
+    return (peak if sys.platform == 'darwin' else peak * 1024), True
+
+
+def format_size(size):
+    """
+    Отформатировать размер в байтах.
+    
+    Args:
+        size (float): Размер в байтах
+    
+    Returns:
+        str: Размер в Б, КБ или МБ
+    """
+    if size < 1024:
+        return f"{size:.0f} Б"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} КБ"
+    return f"{size / 1024 / 1024:.1f} МБ"
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Метрики производительности векторного редактора.
+Содержит гистограммы задержек команд, счетчики событий и экспорт
+в текстовый формат Prometheus.
+"""
+
+import os
+import time
+from bisect import bisect_left
+
+# Верхние границы корзин гистограммы в секундах (ряд 1-2-5 от 1 мкс до 50 с)
+BUCKET_BOUNDS = tuple(
+    mantissa * 10.0 ** exponent
+    for exponent in range(-6, 2)
+    for mantissa in (1, 2, 5)
+)
+
+# Описания счетчиков для экспорта
+COUNTERS = {
+    'shapes_created': 'Количество созданных фигур',
+    'shapes_deleted': 'Количество удаленных фигур',
+    'shapes_loaded': 'Количество загруженных из файлов фигур',
+    'bytes_saved': 'Количество байт, записанных в файлы сцен',
+    'bytes_loaded': 'Количество байт, прочитанных из файлов сцен'
+}
+
+PREFIX = 'vector_editor'
+
+
+class LatencyHistogram:
+    """Гистограмма задержек с корзинами фиксированного размера."""
+    
+    __slots__ = ('counts', 'count', 'total', 'max')
+    
+    def __init__(self):
+        """Инициализация пустой гистограммы."""
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)  # последняя корзина - +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def observe(self, seconds):
+        """
+        Учесть одно измерение.
+        
+        Args:
+            seconds (float): Длительность в секундах
+        """
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+    
+    def percentile(self, fraction):
+        """
+        Оценить перцентиль по корзинам с линейной интерполяцией внутри корзины.
+        
+        Args:
+            fraction (float): Доля от 0 до 1 (например, 0.95)
+        
+        Returns:
+            float: Оценка перцентиля в секундах
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = BUCKET_BOUNDS[index - 1] if index > 0 else 0.0
+                upper = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                estimate = lower + (upper - lower) * (rank - cumulative) / bucket_count
+                return min(estimate, self.max)
+            cumulative += bucket_count
+        return self.max
+
+
+class Metrics:
+    """Набор метрик редактора."""
+    
+    def __init__(self):
+        """Инициализация метрик."""
+        self.histograms = {}  # команда -> LatencyHistogram
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.gauges = {}
+        self.export_path = None
+        self.export_interval = 15.0
+        self._last_export = 0.0
+    
+    def observe(self, command, seconds):
+        """
+        Учесть длительность выполнения команды.
+        
+        Args:
+            command (str): Имя команды
+            seconds (float): Длительность в секундах
+        """
+        histogram = self.histograms.get(command)
+        if histogram is None:
+            histogram = self.histograms[command] = LatencyHistogram()
+        histogram.observe(seconds)
+    
+    def increment(self, counter, value=1):
+        """
+        Увеличить счетчик.
+        
+        Args:
+            counter (str): Имя счетчика из COUNTERS
+            value (int, optional): Величина увеличения
+        """
+        self.counters[counter] += value
+    
+    def reset(self):
+        """Сбросить гистограммы и счетчики."""
+        self.histograms.clear()
+        self.counters = dict.fromkeys(COUNTERS, 0)
+    
+    def summary(self):
+        """
+        Получить сводку задержек по командам.
+        
+        Returns:
+            list: Кортежи (команда, количество, p50, p95, p99, max) в секундах
+        """
+        return [
+            (command, histogram.count, histogram.percentile(0.5), histogram.percentile(0.95),
+             histogram.percentile(0.99), histogram.max)
+            for command, histogram in sorted(self.histograms.items())
+        ]
+    
+    def to_prometheus(self):
+        """
+        Сформировать метрики в текстовом формате Prometheus.
+        
+        Returns:
+            str: Текст метрик
+        """
+        lines = [
+            f"# HELP {PREFIX}_command_duration_seconds Длительность выполнения команд",
+            f"# TYPE {PREFIX}_command_duration_seconds histogram"
+        ]
+        for command, histogram in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKET_BOUNDS, histogram.counts):
+                cumulative += bucket_count
+                lines.append(f'{PREFIX}_command_duration_seconds_bucket{{command="{command}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{PREFIX}_command_duration_seconds_bucket{{command="{command}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{PREFIX}_command_duration_seconds_sum{{command="{command}"}} {histogram.total!r}')
+            lines.append(f'{PREFIX}_command_duration_seconds_count{{command="{command}"}} {histogram.count}')
+        
+        for counter, description in COUNTERS.items():
+            lines.append(f"# HELP {PREFIX}_{counter}_total {description}")
+            lines.append(f"# TYPE {PREFIX}_{counter}_total counter")
+            lines.append(f"{PREFIX}_{counter}_total {self.counters[counter]}")
+        
+        for gauge, value in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {PREFIX}_{gauge} gauge")
+            lines.append(f"{PREFIX}_{gauge} {value}")
+        return '\n'.join(lines) + '\n'
+    
+    def export(self):
+        """Записать метрики в файл экспорта (атомарно, через временный файл)."""
+        temp_path = self.export_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(self.to_prometheus())
+        os.replace(temp_path, self.export_path)
+        self._last_export = time.monotonic()
+    
+    def maybe_export(self):
+        """
+        Записать метрики, если задан файл экспорта и истек интервал экспорта.
+        
+        Вызывается после каждой команды, поэтому пока редактор простаивает,
+        файл экспорта не обновляется. При ошибке записи экспорт выключается.
+        
+        Returns:
+            OSError: Ошибка записи, выключившая экспорт, или None
+        """
+        if self.export_path is not None and time.monotonic() - self._last_export >= self.export_interval:
+            try:
+                self.export()
+            except OSError as e:
+                self.export_path = None
+                return e
+        return None
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Встроенное профилирование команд векторного редактора.
+Содержит класс CommandProfiler - обертку над cProfile и tracemalloc.
+"""
+
+import cProfile
+import io
+import pstats
+import tracemalloc
+
+
+class CommandProfiler:
+    """Профилировщик времени выполнения и выделения памяти командами редактора."""
+    
+    def __init__(self):
+        """Инициализация профилировщика."""
+        self.enabled = False
+        self._profile = None
+        self._snapshot = None
+    
+    def start(self):
+        """Начать профилирование времени выполнения (статистика накапливается заново)."""
+        self._profile = cProfile.Profile()
+        self.enabled = True
+    
+    def stop(self):
+        """Остановить профилирование времени выполнения."""
+        self.enabled = False
+    
+    def has_stats(self):
+        """
+        Проверить, собрана ли статистика времени выполнения.
+        
+        Returns:
+            bool: True, если профилирование запускалось
+        """
+        return self._profile is not None
+    
+    def call(self, func, *args):
+        """
+        Выполнить функцию, учитывая ее в статистике, если профилирование включено.
+        
+        Args:
+            func (callable): Функция
+            *args: Аргументы функции
+        
+        Returns:
+            Результат функции
+        """
+        if not self.enabled:
+            return func(*args)
+        return self._profile.runcall(func, *args)
+    
+    def report(self, limit=15, sort='cumulative'):
+        """
+        Получить отчет о самых затратных функциях.
+        
+        Args:
+            limit (int, optional): Количество функций в отчете
+            sort (str, optional): Ключ сортировки pstats
+        
+        Returns:
+            str: Текст отчета
+        """
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+    
+    def dump(self, filename):
+        """
+        Сохранить статистику в файл в формате pstats.
+        
+        Args:
+            filename (str): Имя файла
+        """
+        self._profile.dump_stats(filename)
+    
+    def take_snapshot(self):
+        """
+        Запомнить снимок выделенной памяти.
+        
+        При первом вызове включает отслеживание выделений tracemalloc;
+        учитываются только выделения, сделанные после этого момента.
+        
+        Returns:
+            int: Текущий объем отслеживаемой памяти в байтах
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._snapshot = self._filtered_snapshot()
+        return tracemalloc.get_traced_memory()[0]
+    
+    def has_snapshot(self):
+        """
+        Проверить, есть ли сохраненный снимок памяти.
+        
+        Returns:
+            bool: True, если снимок сохранен
+        """
+        return self._snapshot is not None and tracemalloc.is_tracing()
+    
+    def diff(self, limit=10):
+        """
+        Сравнить текущее состояние памяти с сохраненным снимком.
+        
+        Args:
+            limit (int, optional): Количество мест выделения в отчете
+        
+        Returns:
+            list: Строки отчета (места выделения с наибольшим приростом)
+        """
+        current = self._filtered_snapshot()
+        differences = current.compare_to(self._snapshot, 'lineno')
+        return [str(difference) for difference in differences[:limit]]
+    
+    def stop_tracing(self):
+        """Выключить отслеживание выделений памяти."""
+        tracemalloc.stop()
+        self._snapshot = None
+    
+    def _filtered_snapshot(self):
+        """Сделать снимок памяти без выделений самого tracemalloc и импорта модулей."""
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ))
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Язык запросов для отбора фигур (команда select).
+
+Запрос - это условия вида <поле> <оператор> <значение>, объединенные
+связками and, or, not и скобками:
+
+    type=circle and area>10 and center_x<100
+    (type=square or type=rectangle) and not name=Tmp
+
+Поля:
+  type                   - тип фигуры (операторы = и !=)
+  name                   - название фигуры (операторы = и !=)
+  id                     - ID фигуры
+  параметры фигуры       - center_x, radius, width, ... (PARAMS класса,
+                           кроме массива вершин)
+  производные метрики    - area, perimeter, volume, surface_area, length,
+                           radius, apothem, height, vertex_count
+                           (методы get_<метрика>)
+
+Запрос компилируется один раз. Для каждого класса фигур условия на тип
+и на отсутствующие у класса поля вычисляются заранее, поэтому классы,
+которые не могут подойти, пропускаются целиком. Остальные условия
+вычисляются по столбцам: значения поля извлекаются сразу для всех
+фигур-кандидатов класса, и каждое следующее условие связки and
+проверяется только на фигурах, прошедших предыдущие (условия на
+параметры проверяются раньше более дорогих производных метрик).
+"""
+
+import operator
+import re
+from itertools import compress, repeat
+from operator import attrgetter
+
+
+class QueryError(ValueError):
+    """Ошибка разбора запроса."""
+    pass
+
+
+# Операторы сравнения
+OPERATORS = {
+    '=': operator.eq,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge
+}
+
+# Производные метрики, доступные в запросах (поле -> метод фигуры)
+METRICS = {
+    name: f'get_{name}'
+    for name in ('area', 'perimeter', 'volume', 'surface_area', 'length', 'radius', 'apothem', 'height',
+                 'vertex_count')
+}
+
+# Поля, не зависящие от класса фигуры
+STRING_FIELDS = ('type', 'name')
+
+TOKEN = re.compile(r'\s*(?:(\(|\)|<=|>=|!=|==|=|<|>)|"([^"]*)"|([^\s()<>=!"]+))')
+
+
+def tokenize(text):
+    """
+    Разбить текст запроса на лексемы.
+    
+    Args:
+        text (str): Текст запроса
+    
+    Returns:
+        list: Пары (вид, значение), где вид - 'op' или 'word'
+    
+    Raises:
+        QueryError: Если в запросе есть недопустимые символы
+    """
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if match is None:
+            raise QueryError(f"Недопустимый символ в запросе: '{text[position:].strip()[:1]}'")
+        symbol, quoted, word = match.groups()
+        if symbol is not None:
+            tokens.append(('op', symbol))
+        else:
+            tokens.append(('word', quoted if quoted is not None else word))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Разбор лексем в дерево запроса методом рекурсивного спуска."""
+    
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+    
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+    
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+    
+    def keyword(self, word):
+        kind, value = self.peek()
+        if kind == 'word' and value.lower() == word:
+            self.position += 1
+            return True
+        return False
+    
+    def parse(self):
+        if not self.tokens:
+            raise QueryError("Пустой запрос")
+        node = self.parse_or()
+        if self.position < len(self.tokens):
+            raise QueryError(f"Неожиданная лексема '{self.peek()[1]}'")
+        return node
+    
+    def parse_or(self):
+        nodes = [self.parse_and()]
+        while self.keyword('or'):
+            nodes.append(self.parse_and())
+        return nodes[0] if len(nodes) == 1 else ('or', nodes)
+    
+    def parse_and(self):
+        nodes = [self.parse_not()]
+        while self.keyword('and'):
+            nodes.append(self.parse_not())
+        return nodes[0] if len(nodes) == 1 else ('and', nodes)
+    
+    def parse_not(self):
+        if self.keyword('not'):
+            return ('not', self.parse_not())
+        if self.peek() == ('op', '('):
+            self.take()
+            node = self.parse_or()
+            if self.take() != ('op', ')'):
+                raise QueryError("Не закрыта скобка")
+            return node
+        return self.parse_comparison()
+    
+    def parse_comparison(self):
+        kind, field = self.take()
+        if kind != 'word':
+            raise QueryError("Ожидается имя поля" + (f", получено '{field}'" if field else ""))
+        kind, symbol = self.take()
+        if kind != 'op' or symbol not in OPERATORS:
+            raise QueryError(f"Ожидается оператор сравнения после '{field}'")
+        kind, value = self.take()
+        if kind != 'word':
+            raise QueryError(f"Ожидается значение после '{field}{symbol}'")
+        field = field.lower()
+        if field in STRING_FIELDS:
+            if symbol not in ('=', '==', '!='):
+                raise QueryError(f"Поле {field} поддерживает только операторы = и !=")
+        else:
+            try:
+                value = float(value)
+            except ValueError:
+                raise QueryError(f"Значение поля {field} должно быть числом") from None
+        return ('cmp', field, symbol, value)
+
+
+class Query:
+    """Скомпилированный запрос."""
+    
+    def __init__(self, text, type_classes):
+        """
+        Скомпилировать запрос.
+        
+        Args:
+            text (str): Текст запроса
+            type_classes (dict): Типы фигур редактора (имя типа -> класс)
+        
+        Raises:
+            QueryError: Если запрос некорректен
+        """
+        self.text = text
+        self.type_classes = type_classes
+        self.tree = _Parser(tokenize(text)).parse()
+        self._plans = {}  # класс -> план вычисления (True, False или дерево)
+        self._check_fields(self.tree)
+    
+    def _check_fields(self, node):
+        """Проверить, что поля и типы запроса существуют."""
+        if node[0] in ('and', 'or'):
+            for child in node[1]:
+                self._check_fields(child)
+        elif node[0] == 'not':
+            self._check_fields(node[1])
+        else:
+            _, field, _, value = node
+            if field == 'type':
+                if value.lower() not in self.type_classes:
+                    raise QueryError(f"Неизвестный тип фигуры '{value}'")
+            elif field not in ('name', 'id') and not any(
+                    field_getter(cls, field) for cls in self.type_classes.values()):
+                raise QueryError(f"Неизвестное поле '{field}'")
+    
+    def plan(self, cls):
+        """
+        Получить план вычисления запроса для класса фигур.
+        
+        Условия на тип и на поля, которых у класса нет, заменяются константами.
+        
+        Args:
+            cls (type): Класс фигур
+        
+        Returns:
+            True, False или дерево условий с функциями извлечения столбцов
+        """
+        plan = self._plans.get(cls)
+        if plan is None:
+            plan = self._plans[cls] = self._fold(self.tree, cls)
+        return plan
+    
+    def _fold(self, node, cls):
+        """Свернуть константные условия дерева для класса."""
+        kind = node[0]
+        if kind == 'not':
+            child = self._fold(node[1], cls)
+            return (not child) if isinstance(child, bool) else ('not', child)
+        if kind in ('and', 'or'):
+            absorbing = kind == 'or'  # значение, которое определяет результат связки
+            children = []
+            for child in node[1]:
+                child = self._fold(child, cls)
+                if child is absorbing:
+                    return absorbing
+                if child is not (not absorbing):
+                    children.append(child)
+            if not children:
+                return not absorbing
+            # Сначала проверяются дешевые условия на атрибуты, затем метрики
+            children.sort(key=_cost)
+            return children[0] if len(children) == 1 else (kind, children)
+        
+        _, field, symbol, value = node
+        compare = OPERATORS[symbol]
+        if field == 'type':
+            matched = issubclass(cls, self.type_classes[value.lower()])
+            return matched if symbol != '!=' else not matched
+        if field == 'name':
+            return ('column', attrgetter('name'), compare, value)
+        if field == 'id':
+            return ('column', attrgetter('id'), compare, value)
+        getter = field_getter(cls, field)
+        if getter is None:
+            return False
+        return ('column', getter, compare, value)
+    
+    def select(self, shapes):
+        """
+        Выполнить запрос.
+        
+        Args:
+            shapes (dict): Словарь фигур (id -> фигура)
+        
+        Returns:
+            list: Отсортированный список ID подходящих фигур
+        """
+        ids = list(shapes)
+        classes = list(map(type, shapes.values()))
+        result = []
+        for cls in set(classes):
+            plan = self.plan(cls)
+            if plan is False:
+                continue
+            class_ids = list(compress(ids, map(operator.is_, classes, repeat(cls))))
+            if plan is True:
+                result.extend(class_ids)
+            else:
+                group = list(map(shapes.__getitem__, class_ids))
+                matched = _evaluate(plan, group, range(len(group)))
+                result.extend(map(class_ids.__getitem__, matched))
+        result.sort()
+        return result
+
+
+def field_getter(cls, field):
+    """
+    Получить функцию извлечения поля для класса фигур.
+    
+    Args:
+        cls (type): Класс фигур
+        field (str): Имя поля
+    
+    Returns:
+        callable: Функция фигура -> значение или None, если у класса нет поля
+    """
+    method = METRICS.get(field)
+    if method is not None and hasattr(cls, method):
+        return getattr(cls, method)
+    if cls.PARAMS is not None and field in cls.PARAMS and field != cls.VERTICES:
+        return attrgetter(field)
+    return None
+
+
+def _cost(node):
+    """Оценить относительную стоимость вычисления узла плана."""
+    if node[0] == 'column':
+        return 0 if isinstance(node[1], attrgetter) else 1
+    return 2
+
+
+def _evaluate(node, group, candidates):
+    """
+    Вычислить план над фигурами группы.
+    
+    Args:
+        node: Узел плана
+        group (list): Фигуры одного класса
+        candidates (sequence): Возрастающие индексы фигур, которые нужно проверить
+    
+    Returns:
+        list: Возрастающие индексы фигур, удовлетворяющих условию
+    """
+    kind = node[0]
+    if kind == 'column':
+        _, getter, compare, value = node
+        shapes = group if len(candidates) == len(group) else map(group.__getitem__, candidates)
+        column = map(getter, shapes)
+        return list(compress(candidates, map(compare, column, repeat(value))))
+    if kind == 'and':
+        for child in node[1]:
+            candidates = _evaluate(child, group, candidates)
+            if not candidates:
+                break
+        return list(candidates)
+    if kind == 'or':
+        matched = set()
+        remaining = list(candidates)
+        for child in node[1]:
+            matched.update(_evaluate(child, group, remaining))
+            remaining = [index for index in remaining if index not in matched]
+            if not remaining:
+                break
+        return sorted(matched)
+    # not
+    excluded = set(_evaluate(node[1], group, candidates))
+    return [index for index in candidates if index not in excluded]
+
+
+def compile_query(text, type_classes):
+    """
+    Скомпилировать запрос.
+    
+    Args:
+        text (str): Текст запроса
+        type_classes (dict): Типы фигур редактора (имя типа -> класс)
+    
+    Returns:
+        Query: Скомпилированный запрос
+    
+    Raises:
+        QueryError: Если запрос некорректен
+    """
+    return Query(text, type_classes)
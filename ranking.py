@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ранжирование фигур по метрикам и параметрам (команды top и list --sort-by).
+
+Значения поля вычисляются столбцами по классам фигур (без get_info),
+фигуры классов без такого поля пропускаются. Для выбора K наибольших
+значений используется частичный отбор кучей (heapq.nlargest): O(n log K)
+вместо полной сортировки.
+"""
+
+import heapq
+from itertools import compress, repeat
+from operator import is_, neg
+
+from query import field_getter
+
+
+def _columns(shapes, shape_ids, field):
+    """
+    Вычислить значения поля по классам фигур.
+    
+    Args:
+        shapes (dict): Словарь фигур (id -> фигура)
+        shape_ids (list): ID фигур
+        field (str): Имя метрики или параметра
+    
+    Yields:
+        tuple: Пары (список ID, список значений) для каждого класса, у которого есть поле
+    """
+    classes = [type(shapes[shape_id]) for shape_id in shape_ids]
+    for cls in set(classes):
+        getter = field_getter(cls, field)
+        if getter is None:
+            continue
+        class_ids = list(compress(shape_ids, map(is_, classes, repeat(cls))))
+        yield class_ids, list(map(getter, map(shapes.__getitem__, class_ids)))
+
+
+def top_k(shapes, shape_ids, field, k):
+    """
+    Найти K фигур с наибольшими значениями поля.
+    
+    Args:
+        shapes (dict): Словарь фигур (id -> фигура)
+        shape_ids (list): ID фигур, среди которых выполняется поиск
+        field (str): Имя метрики или параметра
+        k (int): Количество фигур
+    
+    Returns:
+        list: Пары (значение, ID) по убыванию значения (при равенстве - по возрастанию ID)
+    """
+    best = []
+    for class_ids, values in _columns(shapes, shape_ids, field):
+        # Отбор внутри класса, затем слияние небольших списков кандидатов;
+        # ID хранятся со знаком минус, чтобы при равенстве значений выигрывал меньший
+        best.extend(heapq.nlargest(k, zip(values, map(neg, class_ids))))
+    return [(value, -shape_id) for value, shape_id in heapq.nlargest(k, best)]
+
+
+def sort_ids(shapes, shape_ids, field, descending=False):
+    """
+    Упорядочить фигуры по значению поля.
+    
+    Args:
+        shapes (dict): Словарь фигур (id -> фигура)
+        shape_ids (list): ID фигур
+        field (str): Имя метрики или параметра
+        descending (bool, optional): Сортировать по убыванию
+    
+    Returns:
+        tuple: Пара (упорядоченные пары (значение, ID), ID фигур без такого поля)
+    """
+    ranked = []
+    for class_ids, values in _columns(shapes, shape_ids, field):
+        ranked.extend(zip(values, class_ids))
+    if descending:
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+    else:
+        ranked.sort()
+    present = {shape_id for _, shape_id in ranked}
+    missing = [shape_id for shape_id in shape_ids if shape_id not in present]
+    return ranked, missing
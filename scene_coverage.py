@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Площадь объединения 2D фигур (команда coverage).
+
+Сумма get_area() по фигурам учитывает перекрытия несколько раз, поэтому
+площадь покрытия вычисляется по объединению. Каждая фигура представляется
+выпуклыми частями: прямоугольниками со сторонами по осям (квадрат,
+прямоугольник), эллипсами (окружность, овал) и выпуклыми многоугольниками
+(правильный многоугольник, треугольники сетки остальных фигур). Точки,
+отрезки и ломаные площади не имеют, группа представляется частями вложенных фигур.
+
+Площадь объединения прямоугольников вычисляется точно заметающей прямой
+по их вертикальным сторонам с деревом отрезков по координатам y:
+O(n log n). Если есть криволинейные части, плоскость делится на ячейки
+равномерной сетки, которые затем адаптивно делятся на четыре: ячейка,
+целиком лежащая в одной из частей, считается покрытой, ячейка без частей -
+пустой, площадь ячейки, которую пересекает только одна часть, вычисляется
+точно (для эллипса - интегрированием, для многоугольника - отсечением),
+а ячейки, которую пересекают только прямоугольники, - заметающей прямой.
+Остальные ячейки делятся дальше, пока неопределенная
+площадь не станет меньше допустимой погрешности (или не будет исчерпан
+бюджет ячеек); каждая из них дает половину своей площади в оценку
+и половину - в границу погрешности.
+"""
+
+import math
+
+# Результат сравнения части фигуры с ячейкой
+DISJOINT = 0
+PARTIAL = 1
+CONTAINS = 2
+
+# Погрешность по умолчанию (доля от площади) и бюджет неопределенных ячеек
+DEFAULT_RELATIVE_ERROR = 1e-3
+MAX_PENDING_CELLS = 200000
+MAX_LEVELS = 24
+
+
+class BoxPiece:
+    """Прямоугольник со сторонами, параллельными осям."""
+    
+    __slots__ = ('box',)
+    
+    def __init__(self, x1, y1, x2, y2):
+        self.box = (x1, y1, x2, y2)
+    
+    def classify(self, x1, y1, x2, y2):
+        """
+        Сравнить часть с ячейкой.
+        
+        Args:
+            x1, y1, x2, y2 (float): Границы ячейки
+        
+        Returns:
+            int: DISJOINT, PARTIAL или CONTAINS
+        """
+        bx1, by1, bx2, by2 = self.box
+        if bx2 <= x1 or bx1 >= x2 or by2 <= y1 or by1 >= y2:
+            return DISJOINT
+        if bx1 <= x1 and by1 <= y1 and bx2 >= x2 and by2 >= y2:
+            return CONTAINS
+        return PARTIAL
+    
+    def area_in(self, x1, y1, x2, y2):
+        """
+        Вычислить площадь пересечения части с ячейкой.
+        
+        Args:
+            x1, y1, x2, y2 (float): Границы ячейки
+        
+        Returns:
+            float: Площадь пересечения
+        """
+        bx1, by1, bx2, by2 = self.box
+        return max(min(bx2, x2) - max(bx1, x1), 0.0) * max(min(by2, y2) - max(by1, y1), 0.0)
+
+
+class EllipsePiece:
+    """Эллипс с осями, параллельными осям координат."""
+    
+    __slots__ = ('box', 'center_x', 'center_y', 'radius_x', 'radius_y')
+    
+    def __init__(self, center_x, center_y, radius_x, radius_y):
+        self.center_x = center_x
+        self.center_y = center_y
+        self.radius_x = radius_x
+        self.radius_y = radius_y
+        self.box = (center_x - radius_x, center_y - radius_y, center_x + radius_x, center_y + radius_y)
+    
+    def classify(self, x1, y1, x2, y2):
+        """Сравнить часть с ячейкой (в координатах, где эллипс - единичный круг)."""
+        x1 = (x1 - self.center_x) / self.radius_x
+        x2 = (x2 - self.center_x) / self.radius_x
+        y1 = (y1 - self.center_y) / self.radius_y
+        y2 = (y2 - self.center_y) / self.radius_y
+        # Ближайшая к центру точка ячейки
+        dx = x1 if x1 > 0 else (-x2 if x2 < 0 else 0.0)
+        dy = y1 if y1 > 0 else (-y2 if y2 < 0 else 0.0)
+        if dx * dx + dy * dy >= 1:
+            return DISJOINT
+        # Самая дальняя от центра вершина ячейки
+        fx = max(-x1, x2)
+        fy = max(-y1, y2)
+        return CONTAINS if fx * fx + fy * fy <= 1 else PARTIAL
+    
+    def area_in(self, x1, y1, x2, y2):
+        """Вычислить площадь пересечения эллипса с ячейкой."""
+        scale = self.radius_x * self.radius_y
+        return scale * _unit_circle_area((x1 - self.center_x) / self.radius_x,
+                                         (y1 - self.center_y) / self.radius_y,
+                                         (x2 - self.center_x) / self.radius_x,
+                                         (y2 - self.center_y) / self.radius_y)
+
+
+class ConvexPiece:
+    """Выпуклый многоугольник, заданный полуплоскостями a*x + b*y <= c."""
+    
+    __slots__ = ('box', 'points', 'planes')
+    
+    def __init__(self, points):
+        """
+        Инициализация по вершинам.
+        
+        Args:
+            points (list): Вершины (x, y) против часовой стрелки
+        """
+        self.points = points
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        self.box = (min(xs), min(ys), max(xs), max(ys))
+        planes = []
+        for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+            # Внешняя нормаль стороны при обходе против часовой стрелки
+            a, b = y2 - y1, x1 - x2
+            if a or b:
+                planes.append((a, b, a * x1 + b * y1))
+        self.planes = planes
+    
+    def classify(self, x1, y1, x2, y2):
+        """Сравнить часть с ячейкой (точная проверка разделяющих осей)."""
+        bx1, by1, bx2, by2 = self.box
+        if bx2 <= x1 or bx1 >= x2 or by2 <= y1 or by1 >= y2:
+            return DISJOINT
+        contains = True
+        for a, b, c in self.planes:
+            # Ближайшая и самая дальняя вдоль нормали вершины ячейки
+            low = a * (x1 if a > 0 else x2) + b * (y1 if b > 0 else y2)
+            if low >= c:
+                return DISJOINT
+            if contains and a * (x2 if a > 0 else x1) + b * (y2 if b > 0 else y1) > c:
+                contains = False
+        return CONTAINS if contains else PARTIAL
+    
+    def area_in(self, x1, y1, x2, y2):
+        """Вычислить площадь пересечения многоугольника с ячейкой (отсечением по сторонам ячейки)."""
+        points = self.points
+        for axis, bound, keep_low in ((0, x1, False), (0, x2, True), (1, y1, False), (1, y2, True)):
+            clipped = []
+            for start, end in zip(points, points[1:] + points[:1]):
+                start_inside = (start[axis] <= bound) if keep_low else (start[axis] >= bound)
+                end_inside = (end[axis] <= bound) if keep_low else (end[axis] >= bound)
+                if start_inside:
+                    clipped.append(start)
+                if start_inside != end_inside:
+                    t = (bound - start[axis]) / (end[axis] - start[axis])
+                    clipped.append((start[0] + t * (end[0] - start[0]), start[1] + t * (end[1] - start[1])))
+            points = clipped
+            if len(points) < 3:
+                return 0.0
+        return abs(sum(xa * yb - xb * ya for (xa, ya), (xb, yb) in zip(points, points[1:] + points[:1]))) / 2
+
+
+def _unit_circle_area(x1, y1, x2, y2):
+    """
+    Вычислить площадь пересечения единичного круга с прямоугольником.
+    
+    Площадь - интеграл по x от длины пересечения вертикали с кругом
+    и прямоугольником; между точками излома подынтегральная функция
+    имеет вид const или sqrt(1 - t^2), поэтому интеграл берется точно.
+    """
+    x1 = max(x1, -1.0)
+    x2 = min(x2, 1.0)
+    if x1 >= x2 or y1 >= 1 or y2 <= -1:
+        return 0.0
+    
+    def half_chord(t):
+        return math.sqrt(max(1.0 - t * t, 0.0))
+    
+    def chord_integral(t):
+        # Первообразная sqrt(1 - t^2)
+        return (t * half_chord(t) + math.asin(t)) / 2
+    
+    breaks = {x1, x2}
+    for level in (y1, y2):
+        if -1 < level < 1:
+            root = half_chord(level)
+            breaks.update(t for t in (-root, root) if x1 < t < x2)
+    breaks = sorted(breaks)
+    area = 0.0
+    for start, end in zip(breaks, breaks[1:]):
+        middle = half_chord((start + end) / 2)
+        upper = y2 if y2 < middle else None  # None - верхняя граница на окружности
+        lower = y1 if y1 > -middle else None
+        if (y2 if upper is not None else middle) <= (y1 if lower is not None else -middle):
+            continue
+        width = end - start
+        chord = chord_integral(end) - chord_integral(start)
+        area += (upper * width if upper is not None else chord) - \
+            (lower * width if lower is not None else -chord)
+    return area
+
+
+def shape_pieces(shape):
+    """
+    Разложить фигуру на выпуклые части.
+    
+    Args:
+        shape (Shape2D): Фигура
+    
+    Returns:
+        list: Части фигуры (пустой список для фигур без площади)
+    """
+    kind = type(shape).__name__
+    if type(shape).COMPOSITE:
+        return [piece for leaf in shape.iter_leaves() for piece in shape_pieces(leaf)]
+    if kind in ('Point', 'Line', 'Polyline'):
+        return []
+    if kind == 'Square':
+        return [BoxPiece(shape.x, shape.y, shape.x + shape.side_length, shape.y + shape.side_length)]
+    if kind == 'Rectangle':
+        return [BoxPiece(shape.x, shape.y, shape.x + shape.width, shape.y + shape.height)]
+    if kind == 'Circle':
+        return [EllipsePiece(shape.center_x, shape.center_y, shape.radius, shape.radius)]
+    if kind == 'Oval':
+        return [EllipsePiece(shape.center_x, shape.center_y, shape.radius_x, shape.radius_y)]
+    mesh = shape.get_mesh()
+    if kind == 'RegularPolygon':
+        return [ConvexPiece(mesh.points())]
+    return [ConvexPiece(list(triangle)) for triangle in mesh.iter_triangles()]
+
+
+def box_union_area(boxes):
+    """
+    Вычислить площадь объединения прямоугольников заметающей прямой.
+    
+    Args:
+        boxes (list): Прямоугольники (x1, y1, x2, y2)
+    
+    Returns:
+        float: Площадь объединения
+    """
+    boxes = [box for box in boxes if box[2] > box[0] and box[3] > box[1]]
+    if not boxes:
+        return 0.0
+    if len(boxes) == 1:
+        x1, y1, x2, y2 = boxes[0]
+        return (x2 - x1) * (y2 - y1)
+    
+    ys = sorted({y for box in boxes for y in (box[1], box[3])})
+    rank = {y: index for index, y in enumerate(ys)}
+    events = []
+    for x1, y1, x2, y2 in boxes:
+        events.append((x1, 1, rank[y1], rank[y2]))
+        events.append((x2, -1, rank[y1], rank[y2]))
+    events.sort()
+    
+    # Дерево отрезков над промежутками [ys[i], ys[i + 1]]: количество
+    # прямоугольников, целиком покрывающих узел, и покрытая длина узла
+    size = len(ys) - 1
+    count = [0] * (4 * size)
+    covered = [0.0] * (4 * size)
+    
+    def update(node, low, high, start, end, delta):
+        if end <= low or high <= start:
+            return
+        if start <= low and high <= end:
+            count[node] += delta
+        else:
+            middle = (low + high) // 2
+            update(2 * node, low, middle, start, end, delta)
+            update(2 * node + 1, middle, high, start, end, delta)
+        if count[node]:
+            covered[node] = ys[high] - ys[low]
+        elif high - low == 1:
+            covered[node] = 0.0
+        else:
+            covered[node] = covered[2 * node] + covered[2 * node + 1]
+    
+    area = 0.0
+    previous_x = events[0][0]
+    for x, delta, start, end in events:
+        area += covered[1] * (x - previous_x)
+        previous_x = x
+        update(1, 0, size, start, end, delta)
+    return area
+
+
+def _clip(box, x1, y1, x2, y2):
+    """Обрезать прямоугольник границами ячейки."""
+    return (max(box[0], x1), max(box[1], y1), min(box[2], x2), min(box[3], y2))
+
+
+class CoverageResult:
+    """Результат вычисления площади покрытия."""
+    
+    __slots__ = ('area', 'error', 'pieces', 'cells')
+    
+    def __init__(self, area, error, pieces, cells):
+        """
+        Инициализация результата.
+        
+        Args:
+            area (float): Оценка площади объединения
+            error (float): Граница абсолютной погрешности оценки
+            pieces (int): Количество выпуклых частей фигур
+            cells (int): Количество рассмотренных ячеек
+        """
+        self.area = area
+        self.error = error
+        self.pieces = pieces
+        self.cells = cells
+    
+    @property
+    def exact(self):
+        """Вычислена ли площадь точно."""
+        return self.error == 0
+
+
+def coverage_area(shapes, relative_error=DEFAULT_RELATIVE_ERROR, max_cells=MAX_PENDING_CELLS):
+    """
+    Вычислить площадь объединения 2D фигур.
+    
+    Args:
+        shapes (iterable): 2D фигуры
+        relative_error (float, optional): Допустимая относительная погрешность
+        max_cells (int, optional): Наибольшее количество неопределенных ячеек уровня
+    
+    Returns:
+        CoverageResult: Оценка площади и граница ее погрешности
+    """
+    pieces = [piece for shape in shapes for piece in shape_pieces(shape)]
+    if not pieces:
+        return CoverageResult(0.0, 0.0, 0, 0)
+    if all(type(piece) is BoxPiece for piece in pieces):
+        return CoverageResult(box_union_area([piece.box for piece in pieces]), 0.0, len(pieces), 0)
+    
+    # Начальная сетка: ячейка порядка медианного размера частей
+    extents = sorted(max(piece.box[2] - piece.box[0], piece.box[3] - piece.box[1]) for piece in pieces)
+    min_x = min(piece.box[0] for piece in pieces)
+    min_y = min(piece.box[1] for piece in pieces)
+    max_x = max(piece.box[2] for piece in pieces)
+    max_y = max(piece.box[3] for piece in pieces)
+    cell = max(extents[len(extents) // 2], max(max_x - min_x, max_y - min_y) / 1024, 1e-12)
+    columns = int((max_x - min_x) / cell) + 1
+    rows = int((max_y - min_y) / cell) + 1
+    grid = {}
+    for piece in pieces:
+        x1, y1, x2, y2 = piece.box
+        for column in range(int((x1 - min_x) / cell), min(int((x2 - min_x) / cell), columns - 1) + 1):
+            for row in range(int((y1 - min_y) / cell), min(int((y2 - min_y) / cell), rows - 1) + 1):
+                grid.setdefault((column, row), []).append(piece)
+    pending = [(min_x + column * cell, min_y + row * cell, cell, cell_pieces)
+               for (column, row), cell_pieces in grid.items()]
+    
+    area = 0.0
+    cells = 0
+    for _ in range(MAX_LEVELS):
+        undecided = []
+        for x1, y1, size, cell_pieces in pending:
+            cells += 1
+            x2 = x1 + size
+            y2 = y1 + size
+            partial = []
+            for piece in cell_pieces:
+                relation = piece.classify(x1, y1, x2, y2)
+                if relation == CONTAINS:
+                    break
+                if relation == PARTIAL:
+                    partial.append(piece)
+            else:
+                if not partial:
+                    continue
+                if len(partial) == 1:
+                    area += partial[0].area_in(x1, y1, x2, y2)
+                elif all(type(piece) is BoxPiece for piece in partial):
+                    area += box_union_area([_clip(piece.box, x1, y1, x2, y2) for piece in partial])
+                else:
+                    undecided.append((x1, y1, size, partial))
+                continue
+            area += size * size
+        
+        undecided_area = sum(size * size for _, _, size, _ in undecided)
+        if not undecided or undecided_area <= 2 * relative_error * (area + undecided_area / 2) \
+                or 4 * len(undecided) > max_cells:
+            return CoverageResult(area + undecided_area / 2, undecided_area / 2, len(pieces), cells)
+        pending = [(x + dx, y + dy, size / 2, cell_pieces)
+                   for x, y, size, cell_pieces in undecided
+                   for dx in (0.0, size / 2) for dy in (0.0, size / 2)]
+    
+    undecided_area = sum(size * size for _, _, size, _ in pending)
+    return CoverageResult(area + undecided_area / 2, undecided_area / 2, len(pieces), cells)
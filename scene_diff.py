@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Сравнение двух файлов сцены (команда diff).
+
+Для файлов сжатого формата (scene_format.py) и сцен из шардов
+(scene_shards.py) сравнение начинается с заголовков, не читая данных:
+
+  шарды - шарды с одинаковой контрольной суммой SHA-256 пропускаются целиком;
+  блоки - у остальных шардов (или у одиночного файла) читаются только описания
+          блоков, а сжатые данные пропускаются. Блоки с одинаковыми классом,
+          диапазоном ID, количеством фигур и SHA-1 несжатых данных совпадают
+          и тоже пропускаются.
+
+Распаковываются только несовпавшие блоки. Для их фигур вычисляются хэши
+содержимого (класс, параметры и имя; у группы - хэши вложенных фигур),
+по которым определяются добавленные, удаленные и измененные фигуры.
+Файлы в формате pickle не имеют блоков и загружаются целиком.
+"""
+
+import hashlib
+import os
+
+from scene_format import (MAGIC, SceneFormatError, decode_chunk, read_chunk_header, read_chunk_payload,
+                          read_header, skip_chunk_payload)
+from scene_shards import is_manifest, read_manifest
+
+
+class SceneDiff:
+    """Результат сравнения двух сцен."""
+    
+    __slots__ = ('added', 'removed', 'changed', 'old', 'new', 'chunks', 'skipped_chunks',
+                 'skipped_shapes', 'decoded_shapes')
+    
+    def __init__(self):
+        """Инициализация пустого результата."""
+        self.added = []  # ID фигур, которых нет в первой сцене
+        self.removed = []  # ID фигур, которых нет во второй сцене
+        self.changed = []  # ID фигур с разным содержимым
+        self.old = {}  # ID -> фигура первой сцены (для измененных и удаленных)
+        self.new = {}  # ID -> фигура второй сцены (для измененных и добавленных)
+        self.chunks = 0  # Блоков и шардов в обеих сценах
+        self.skipped_chunks = 0  # Совпавших блоков и шардов (не прочитаны)
+        self.skipped_shapes = 0  # Фигур в совпавших блоках одной сцены
+        self.decoded_shapes = 0  # Фигур, прочитанных из обеих сцен
+    
+    @property
+    def identical(self):
+        """Совпадают ли сцены."""
+        return not (self.added or self.removed or self.changed)
+
+
+def shape_digest(shape):
+    """
+    Получить хэш содержимого фигуры.
+    
+    Args:
+        shape (Shape): Фигура
+    
+    Returns:
+        bytes: 16-байтный хэш класса, параметров и имени фигуры
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{type(shape).__module__}.{type(shape).__qualname__}".encode('utf-8'))
+    if getattr(shape, 'COMPOSITE', False):
+        digest.update(repr(shape.name).encode('utf-8'))
+        for child in shape.children:
+            digest.update(shape_digest(child))
+    elif shape.VERTICES:
+        # Массив вершин хэшируется двоичным содержимым, без текстового представления
+        digest.update(repr(shape.name).encode('utf-8'))
+        digest.update(getattr(shape, shape.VERTICES))
+    else:
+        values = tuple([getattr(shape, param) for param in shape.PARAMS])
+        digest.update(repr((values, shape.name)).encode('utf-8'))
+    return digest.digest()
+
+
+class _Source:
+    """Содержимое файла сцены, разложенное на шарды и блоки."""
+    
+    def __init__(self, path):
+        """
+        Разобрать файл сцены, не читая данных блоков.
+        
+        Args:
+            path (str): Путь к файлу сцены
+        """
+        self.shapes = None  # Словарь фигур сцены в формате pickle
+        self.shards = []  # Пары (описание шарда из манифеста, путь файла)
+        self.files = []  # Пути файлов сжатого формата
+        with open(path, 'rb') as file:
+            prefix = file.read(len(MAGIC))
+            file.seek(0)
+            if prefix == MAGIC:
+                self.files.append(path)
+            elif is_manifest(prefix):
+                directory = os.path.dirname(os.path.abspath(path))
+                self.shards = [(entry, os.path.join(directory, entry['file']))
+                               for entry in read_manifest(file)['shards']]
+            else:
+                import pickle
+                
+                data = pickle.load(file)
+                if not isinstance(data, dict) or 'shapes' not in data:
+                    raise SceneFormatError(f"Некорректный формат файла '{path}'")
+                self.shapes = data['shapes']
+    
+    def chunks(self):
+        """
+        Прочитать описания блоков файлов сжатого формата.
+        
+        Returns:
+            list: Тройки (ключ блока, путь файла, (позиция данных, описание, кодек))
+        """
+        result = []
+        for path in self.files:
+            try:
+                file = open(path, 'rb')
+            except OSError:
+                raise SceneFormatError(f"Файл '{os.path.basename(path)}' не найден")
+            with file:
+                codec, _ = read_header(file)
+                while True:
+                    header = read_chunk_header(file)
+                    if header is None:
+                        break
+                    key = (header.class_path, header.count, header.first_id, header.last_id,
+                           header.raw_size, header.digest)
+                    result.append((key, path, (file.tell(), header, codec)))
+                    skip_chunk_payload(file, header)
+        return result
+
+
+def _cancel_common(left, right, key):
+    """
+    Убрать из двух списков совпадающие элементы.
+    
+    Args:
+        left (list): Элементы первой сцены
+        right (list): Элементы второй сцены
+        key (callable): Ключ сравнения элементов
+    
+    Returns:
+        tuple: (оставшиеся элементы первой сцены, второй сцены, совпавшие элементы первой сцены)
+    """
+    pending = {}
+    for item in right:
+        pending.setdefault(key(item), []).append(item)
+    rest_left = []
+    common = []
+    for item in left:
+        matches = pending.get(key(item))
+        if matches:
+            matches.pop()
+            common.append(item)
+        else:
+            rest_left.append(item)
+    rest_right = [item for items in pending.values() for item in items]
+    return rest_left, rest_right, common
+
+
+def _read_chunks(chunks):
+    """Распаковать блоки и получить словарь ID -> фигура."""
+    shapes = {}
+    for _, path, (offset, header, codec) in chunks:
+        with open(path, 'rb') as file:
+            file.seek(offset)
+            shapes.update(decode_chunk(header, read_chunk_payload(file, header, codec)))
+    return shapes
+
+
+def diff_scenes(path_a, path_b):
+    """
+    Сравнить два файла сцены.
+    
+    Args:
+        path_a (str): Путь к первой сцене
+        path_b (str): Путь ко второй сцене
+    
+    Returns:
+        SceneDiff: Добавленные, удаленные и измененные фигуры
+    
+    Raises:
+        SceneFormatError: Если файл поврежден или имеет неизвестный формат
+    """
+    result = SceneDiff()
+    source_a, source_b = _Source(path_a), _Source(path_b)
+    
+    # Шарды с одинаковой контрольной суммой совпадают целиком
+    shards_a, shards_b, common = _cancel_common(source_a.shards, source_b.shards,
+                                                lambda shard: (shard[0]['sha256'], shard[0]['size']))
+    result.chunks += len(source_a.shards) + len(source_b.shards)
+    result.skipped_chunks += 2 * len(common)
+    result.skipped_shapes += sum(entry['count'] for entry, _ in common)
+    source_a.files.extend(path for _, path in shards_a)
+    source_b.files.extend(path for _, path in shards_b)
+    
+    # Совпадающие блоки не распаковываются
+    chunks_a, chunks_b = source_a.chunks(), source_b.chunks()
+    result.chunks += len(chunks_a) + len(chunks_b)
+    if source_a.shapes is None and source_b.shapes is None:
+        chunks_a, chunks_b, common = _cancel_common(chunks_a, chunks_b, lambda chunk: chunk[0])
+        result.skipped_chunks += 2 * len(common)
+        result.skipped_shapes += sum(chunk[0][1] for chunk in common)
+    
+    shapes_a = source_a.shapes if source_a.shapes is not None else _read_chunks(chunks_a)
+    shapes_b = source_b.shapes if source_b.shapes is not None else _read_chunks(chunks_b)
+    result.decoded_shapes = len(shapes_a) + len(shapes_b)
+    
+    for shape_id, shape in shapes_a.items():
+        other = shapes_b.get(shape_id)
+        if other is None:
+            result.removed.append(shape_id)
+            result.old[shape_id] = shape
+        elif shape_digest(shape) != shape_digest(other):
+            result.changed.append(shape_id)
+            result.old[shape_id] = shape
+            result.new[shape_id] = other
+    for shape_id, shape in shapes_b.items():
+        if shape_id not in shapes_a:
+            result.added.append(shape_id)
+            result.new[shape_id] = shape
+    result.added.sort()
+    result.removed.sort()
+    result.changed.sort()
+    return result
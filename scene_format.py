@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Сжатый поколоночный формат файлов сцены.
+
+Структура файла:
+  заголовок       - MAGIC, версия, кодек сжатия, next_id
+  блоки           - фигуры одного класса с ID из одного окна [k * CHUNK_SIZE, (k + 1) * CHUNK_SIZE),
+                    отсортированные по ID
+  терминатор      - блок с пустым именем класса
+
+Блок состоит из несжатого описания (класс, столбцы, количество фигур, диапазон ID,
+длины и SHA-1 несжатых данных) и сжатых данных. Данные блока - это столбцы:
+ID (дельта-кодирование), параметры конструктора (PARAMS класса) и имена фигур.
+Числовые столбцы хранятся с перестановкой байтов (byte shuffle): сначала первые
+байты всех чисел, затем вторые и т.д., что заметно улучшает сжатие координат.
+Массивы вершин (параметр VERTICES класса: многоугольник, ломаная) хранятся
+столбцом переменной длины: количества координат фигур, затем все координаты
+подряд. Фигуры классов без PARAMS сохраняются в блоке с pickle-данными.
+
+Блоки читаются и распаковываются по одному, поэтому память при загрузке
+ограничена размером блока.
+"""
+
+import hashlib
+import pickle
+import struct
+import zlib
+import lzma
+from array import array
+from importlib import import_module
+from itertools import accumulate
+
+MAGIC = b'VSHZ'
+VERSION = 1
+
+# Кодеки сжатия: имя -> (код в заголовке, функция сжатия, фабрика распаковщиков)
+CODECS = {
+    'zlib': (1, lambda data: zlib.compress(data, 6), zlib.decompressobj),
+    'lzma': (2, lambda data: lzma.compress(data, preset=6), lzma.LZMADecompressor)
+}
+CODEC_NAMES = {code: name for name, (code, _, _) in CODECS.items()}
+
+CHUNK_SIZE = 65536  # Размер окна ID блока (максимальное количество фигур в блоке)
+READ_SIZE = 1 << 18  # Размер порции при потоковой распаковке
+
+FILE_HEADER = struct.Struct('<4sBBq')
+CHUNK_HEADER = struct.Struct('<IqqQQ20s')
+PICKLED_COLUMNS = 0xFFFF  # Количество столбцов в блоке с pickle-данными
+VERTEX_TYPECODE = 'v'  # Код столбца массивов вершин переменной длины
+
+
+class SceneFormatError(ValueError):
+    """Ошибка формата файла сцены."""
+    pass
+
+
+class ChunkHeader:
+    """Описание блока файла сцены."""
+    
+    __slots__ = ('class_path', 'columns', 'count', 'first_id', 'last_id',
+                 'raw_size', 'compressed_size', 'digest')
+    
+    def __init__(self, class_path, columns, count, first_id, last_id, raw_size, compressed_size, digest):
+        """
+        Инициализация описания блока.
+        
+        Args:
+            class_path (str): Модуль и имя класса фигур ("shapes_2d.Circle")
+            columns (list): Пары (имя параметра, код типа array) или None для pickle-блока
+            count (int): Количество фигур
+            first_id (int): Наименьший ID в блоке
+            last_id (int): Наибольший ID в блоке
+            raw_size (int): Размер несжатых данных
+            compressed_size (int): Размер сжатых данных
+            digest (bytes): SHA-1 несжатых данных
+        """
+        self.class_path = class_path
+        self.columns = columns
+        self.count = count
+        self.first_id = first_id
+        self.last_id = last_id
+        self.raw_size = raw_size
+        self.compressed_size = compressed_size
+        self.digest = digest
+
+
+def _shuffle(data, itemsize):
+    """Переставить байты: сначала i-е байты всех элементов для каждого i."""
+    data = bytes(data)
+    return b''.join(data[i::itemsize] for i in range(itemsize))
+
+
+def _unshuffle(data, itemsize):
+    """Восстановить исходный порядок байтов после _shuffle."""
+    count = len(data) // itemsize
+    result = bytearray(len(data))
+    for i in range(itemsize):
+        result[i::itemsize] = data[i * count:(i + 1) * count]
+    return result
+
+
+def _class_path(cls):
+    """Получить путь класса для записи в файл."""
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _resolve_class(class_path):
+    """Найти класс фигуры по пути из файла."""
+    module_name, _, class_name = class_path.rpartition('.')
+    try:
+        return getattr(import_module(module_name), class_name)
+    except (ImportError, AttributeError):
+        raise SceneFormatError(f"Неизвестный класс фигуры '{class_path}'")
+
+
+def _encode_chunk(cls, items, compress):
+    """
+    Закодировать блок фигур одного класса.
+    
+    Args:
+        cls (type): Класс фигур
+        items (list): Пары (ID, фигура), отсортированные по ID
+        compress (callable): Функция сжатия
+    
+    Returns:
+        bytes: Описание и сжатые данные блока
+    """
+    ids = [shape_id for shape_id, _ in items]
+    shapes = [shape for _, shape in items]
+    
+    if cls.PARAMS is None:
+        columns = None
+        raw = pickle.dumps(items, protocol=pickle.HIGHEST_PROTOCOL)
+    else:
+        columns = []
+        parts = []
+        deltas = array('q', ids[:1])
+        deltas.extend(b - a for a, b in zip(ids, ids[1:]))
+        parts.append(_shuffle(deltas, deltas.itemsize))
+        for param in cls.PARAMS:
+            values = [getattr(shape, param) for shape in shapes]
+            if param == cls.VERTICES:
+                lengths = array('I', map(len, values))
+                coordinates = array('d')
+                for vertices in values:
+                    coordinates.extend(vertices)
+                columns.append((param, VERTEX_TYPECODE))
+                parts.append(_shuffle(lengths, lengths.itemsize))
+                parts.append(_shuffle(coordinates, coordinates.itemsize))
+                continue
+            typecode = 'q' if isinstance(values[0], int) else 'd'
+            column = array(typecode, values)
+            columns.append((param, typecode))
+            parts.append(_shuffle(column, column.itemsize))
+        names = [str(shape.name).encode('utf-8') for shape in shapes]
+        lengths = array('I', map(len, names))
+        parts.append(_shuffle(lengths, lengths.itemsize))
+        parts.append(b''.join(names))
+        raw = b''.join(parts)
+    
+    compressed = compress(raw)
+    class_path = _class_path(cls).encode('utf-8')
+    header = [struct.pack('<H', len(class_path)), class_path]
+    if columns is None:
+        header.append(struct.pack('<H', PICKLED_COLUMNS))
+    else:
+        header.append(struct.pack('<H', len(columns)))
+        for param, typecode in columns:
+            encoded = param.encode('utf-8')
+            header.append(struct.pack('<B', len(encoded)) + encoded + typecode.encode('ascii'))
+    header.append(CHUNK_HEADER.pack(len(items), ids[0], ids[-1], len(raw), len(compressed),
+                                    hashlib.sha1(raw).digest()))
+    return b''.join(header) + compressed
+
+
+def write_scene(file, shapes, next_id, codec='zlib', chunk_size=CHUNK_SIZE):
+    """
+    Записать сцену в сжатом формате.
+    
+    Args:
+        file: Файл, открытый для записи в двоичном режиме
+        shapes (dict): Словарь фигур (id -> фигура)
+        next_id (int): Следующий свободный ID
+        codec (str, optional): Кодек сжатия ('zlib' или 'lzma')
+        chunk_size (int, optional): Размер окна ID блока (и максимальное количество фигур в нем)
+    """
+    if codec not in CODECS:
+        raise SceneFormatError(f"Неизвестный кодек сжатия '{codec}'")
+    code, compress, _ = CODECS[codec]
+    file.write(FILE_HEADER.pack(MAGIC, VERSION, code, next_id))
+    
+    # Границы блоков привязаны к окнам ID, а не к количеству фигур, поэтому
+    # удаление или добавление фигуры меняет только блок ее окна (см. scene_diff.py)
+    groups = {}
+    for shape_id in sorted(shapes):
+        shape = shapes[shape_id]
+        groups.setdefault((type(shape), shape_id // chunk_size), []).append((shape_id, shape))
+    
+    for (cls, _), items in groups.items():
+        file.write(_encode_chunk(cls, items, compress))
+    file.write(struct.pack('<H', 0))
+
+
+def read_header(file):
+    """
+    Прочитать заголовок файла сцены.
+    
+    Args:
+        file: Файл, открытый для чтения в двоичном режиме
+    
+    Returns:
+        tuple: Пара (имя кодека, next_id)
+    
+    Raises:
+        SceneFormatError: Если файл не является сжатой сценой
+    """
+    data = file.read(FILE_HEADER.size)
+    if len(data) < FILE_HEADER.size:
+        raise SceneFormatError("Файл сцены поврежден: неполный заголовок")
+    magic, version, code, next_id = FILE_HEADER.unpack(data)
+    if magic != MAGIC:
+        raise SceneFormatError("Файл не является сжатой сценой")
+    if version != VERSION:
+        raise SceneFormatError(f"Неподдерживаемая версия формата: {version}")
+    if code not in CODEC_NAMES:
+        raise SceneFormatError(f"Неизвестный кодек сжатия: {code}")
+    return CODEC_NAMES[code], next_id
+
+
+def _read_exact(file, size):
+    """Прочитать ровно size байт."""
+    data = file.read(size)
+    if len(data) != size:
+        raise SceneFormatError("Файл сцены поврежден: неожиданный конец файла")
+    return data
+
+
+def read_chunk_header(file):
+    """
+    Прочитать описание очередного блока.
+    
+    Args:
+        file: Файл, позиционированный на начало блока
+    
+    Returns:
+        ChunkHeader: Описание блока или None, если блоков больше нет
+    """
+    path_size, = struct.unpack('<H', _read_exact(file, 2))
+    if path_size == 0:
+        return None
+    class_path = _read_exact(file, path_size).decode('utf-8')
+    column_count, = struct.unpack('<H', _read_exact(file, 2))
+    columns = None
+    if column_count != PICKLED_COLUMNS:
+        columns = []
+        for _ in range(column_count):
+            name_size = _read_exact(file, 1)[0]
+            name = _read_exact(file, name_size).decode('utf-8')
+            typecode = _read_exact(file, 1).decode('ascii')
+            columns.append((name, typecode))
+    fields = CHUNK_HEADER.unpack(_read_exact(file, CHUNK_HEADER.size))
+    return ChunkHeader(class_path, columns, *fields)
+
+
+def read_chunk_payload(file, header, codec):
+    """
+    Прочитать и потоково распаковать данные блока.
+    
+    Args:
+        file: Файл, позиционированный на данные блока
+        header (ChunkHeader): Описание блока
+        codec (str): Имя кодека сжатия
+    
+    Returns:
+        bytes: Несжатые данные блока
+    
+    Raises:
+        SceneFormatError: Если контрольная сумма не совпадает
+    """
+    decompressor = CODECS[codec][2]()
+    raw = bytearray()
+    remaining = header.compressed_size
+    while remaining:
+        piece = _read_exact(file, min(READ_SIZE, remaining))
+        remaining -= len(piece)
+        raw += decompressor.decompress(piece)
+    if len(raw) != header.raw_size or hashlib.sha1(raw).digest() != header.digest:
+        raise SceneFormatError("Файл сцены поврежден: контрольная сумма блока не совпадает")
+    return bytes(raw)
+
+
+def skip_chunk_payload(file, header):
+    """
+    Пропустить данные блока без чтения.
+    
+    Args:
+        file: Файл, позиционированный на данные блока
+        header (ChunkHeader): Описание блока
+    """
+    file.seek(header.compressed_size, 1)
+
+
+def decode_chunk(header, raw):
+    """
+    Восстановить фигуры блока.
+    
+    Args:
+        header (ChunkHeader): Описание блока
+        raw (bytes): Несжатые данные блока
+    
+    Returns:
+        list: Пары (ID, фигура)
+    """
+    if header.columns is None:
+        return pickle.loads(raw)
+    
+    cls = _resolve_class(header.class_path)
+    count = header.count
+    offset = 0
+    
+    def take(typecode, size=count):
+        nonlocal offset
+        column = array(typecode)
+        size *= column.itemsize
+        column.frombytes(_unshuffle(raw[offset:offset + size], column.itemsize))
+        offset += size
+        return column
+    
+    def take_vertices():
+        bounds = [0, *accumulate(take('I'))]
+        coordinates = take('d', bounds[-1])
+        return [coordinates[start:end] for start, end in zip(bounds, bounds[1:])]
+    
+    ids = list(accumulate(take('q')))
+    values = {param: take_vertices() if typecode == VERTEX_TYPECODE else take(typecode)
+              for param, typecode in header.columns}
+    lengths = take('I')
+    names = []
+    for length in lengths:
+        names.append(raw[offset:offset + length].decode('utf-8'))
+        offset += length
+    
+    try:
+        params = [values[param] for param in cls.PARAMS]
+    except KeyError as e:
+        raise SceneFormatError(f"В блоке класса '{header.class_path}' нет столбца {e}")
+    items = []
+    for index, shape_id in enumerate(ids):
+        shape = cls(*[column[index] for column in params], name=names[index])
+        shape.id = shape_id
+        items.append((shape_id, shape))
+    return items
+
+
+def iter_chunks(file):
+    """
+    Последовательно прочитать блоки сцены.
+    
+    Args:
+        file: Файл, открытый для чтения в двоичном режиме
+    
+    Yields:
+        list: Пары (ID, фигура) очередного блока
+    """
+    codec, _ = read_header(file)
+    while True:
+        header = read_chunk_header(file)
+        if header is None:
+            return
+        yield decode_chunk(header, read_chunk_payload(file, header, codec))
+
+
+def read_scene(file):
+    """
+    Прочитать сцену в сжатом формате.
+    
+    Args:
+        file: Файл, открытый для чтения в двоичном режиме
+    
+    Returns:
+        tuple: Пара (словарь фигур, next_id)
+    """
+    _, next_id = read_header(file)
+    file.seek(0)
+    items = []
+    for chunk in iter_chunks(file):
+        items.extend(chunk)
+    items.sort(key=lambda item: item[0])
+    return dict(items), next_id
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Сцена, разбитая на шарды.
+
+Сцена сохраняется в несколько файлов сжатого формата (см. scene_format.py),
+каждый из которых содержит непрерывный диапазон ID фигур, и файл-манифест
+в формате JSON. Манифест хранит next_id, кодек сжатия и для каждого шарда
+имя файла, количество фигур, диапазон ID, размер и контрольную сумму SHA-256.
+
+Шарды записываются и читаются пулом потоков. Сжатие, распаковка и хэширование
+в zlib, lzma и hashlib отпускают GIL и могут идти одновременно, но кодирование
+и разбор фигур выполняются под GIL, поэтому выигрыш ограничен долей сжатия
+во времени сохранения и загрузки и не растет пропорционально числу ядер.
+Каждое сохранение пишет шарды под новыми именами с поколением - случайным
+суффиксом, записанным в манифест вместе с именем файла, - поэтому файлы,
+на которые ссылается прежний манифест, не перезаписываются. Манифест
+записывается последним, так что прерванное сохранение не портит прежнюю
+сцену. Файлы шардов, которых нет в новом манифесте, удаляются после его записи.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+
+from scene_format import SceneFormatError, iter_chunks, read_scene, write_scene
+
+MANIFEST_FORMAT = 'vector-editor-shards'
+MANIFEST_VERSION = 1
+READ_SIZE = 1 << 20  # Размер порции при проверке контрольной суммы шарда
+GENERATION_LENGTH = 8  # Длина суффикса поколения в именах шардов
+
+
+class _HashingWriter:
+    """Обертка файла, считающая SHA-256 и размер записанных данных."""
+    
+    def __init__(self, file):
+        """
+        Инициализация обертки.
+        
+        Args:
+            file: Файл, открытый для записи в двоичном режиме
+        """
+        self.file = file
+        self.hash = hashlib.sha256()
+        self.size = 0
+    
+    def write(self, data):
+        self.hash.update(data)
+        self.size += len(data)
+        return self.file.write(data)
+
+
+def is_manifest(prefix):
+    """
+    Проверить, похоже ли начало файла на манифест сцены.
+    
+    Args:
+        prefix (bytes): Первые байты файла
+    
+    Returns:
+        bool: True, если файл начинается как JSON-объект
+    """
+    return prefix.lstrip()[:1] == b'{'
+
+
+def _shard_base(manifest_path):
+    """Получить общую часть путей шардов манифеста."""
+    return manifest_path[:-len('.shapes')] if manifest_path.endswith('.shapes') else manifest_path
+
+
+def shard_path(manifest_path, index, generation):
+    """
+    Получить путь файла шарда.
+    
+    Args:
+        manifest_path (str): Путь манифеста
+        index (int): Номер шарда
+        generation (str): Поколение сохранения (шестнадцатеричный суффикс)
+    
+    Returns:
+        str: Путь файла шарда (рядом с манифестом)
+    """
+    return f"{_shard_base(manifest_path)}.{generation}.{index:03d}.shard"
+
+
+def _remove_shards(paths):
+    """Удалить файлы шардов, не обращая внимания на уже отсутствующие."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _remove_stale_shards(manifest_path, entries):
+    """Удалить файлы шардов рядом с манифестом, которых нет в его списке шардов."""
+    directory = os.path.dirname(os.path.abspath(manifest_path))
+    prefix = os.path.basename(_shard_base(manifest_path)) + '.'
+    # Имена без поколения остались от сохранений прежних версий
+    pattern = re.compile(re.escape(prefix) + r'(?:[0-9a-f]{%d}\.)?\d{3,}\.shard(?:\.tmp)?' % GENERATION_LENGTH)
+    keep = {entry['file'] for entry in entries}
+    _remove_shards(os.path.join(directory, name) for name in os.listdir(directory)
+                   if name not in keep and pattern.fullmatch(name))
+
+
+def split_ids(shape_ids, shards):
+    """
+    Разбить отсортированные ID на непрерывные диапазоны примерно равного размера.
+    
+    Args:
+        shape_ids (list): Отсортированные ID фигур
+        shards (int): Количество шардов
+    
+    Returns:
+        list: Списки ID по шардам (пустые шарды не создаются)
+    """
+    shards = max(1, min(shards, len(shape_ids)))
+    size, extra = divmod(len(shape_ids), shards)
+    parts = []
+    start = 0
+    for index in range(shards):
+        end = start + size + (index < extra)
+        parts.append(shape_ids[start:end])
+        start = end
+    return [part for part in parts if part]
+
+
+def _write_shard(path, shapes, next_id, codec):
+    """Записать один шард и вернуть его описание для манифеста."""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        writer = _HashingWriter(file)
+        write_scene(writer, shapes, next_id, codec)
+    os.replace(temp_path, path)
+    return {
+        'file': os.path.basename(path),
+        'count': len(shapes),
+        'first_id': min(shapes) if shapes else None,
+        'last_id': max(shapes) if shapes else None,
+        'size': writer.size,
+        'sha256': writer.hash.hexdigest()
+    }
+
+
+def write_sharded_scene(path, shapes, next_id, shards, codec='zlib', workers=None):
+    """
+    Записать сцену в виде манифеста и шардов.
+    
+    Args:
+        path (str): Путь манифеста
+        shapes (dict): Словарь фигур (id -> фигура)
+        next_id (int): Следующий свободный ID
+        shards (int): Количество шардов
+        codec (str, optional): Кодек сжатия шардов ('zlib' или 'lzma')
+        workers (int, optional): Количество потоков (по умолчанию - по числу шардов, не больше числа ядер)
+    
+    Returns:
+        int: Общий размер записанных файлов в байтах
+    
+    Raises:
+        ValueError: Если количество шардов не положительное
+    """
+    if shards < 1:
+        raise ValueError("Количество шардов должно быть положительным числом")
+    parts = split_ids(sorted(shapes), shards) or [[]]
+    workers = workers or min(len(parts), os.cpu_count() or 1)
+    generation = secrets.token_hex(GENERATION_LENGTH // 2)
+    paths = [shard_path(path, index, generation) for index in range(len(parts))]
+    
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_write_shard, shard_file,
+                            {shape_id: shapes[shape_id] for shape_id in part}, next_id, codec)
+                for shard_file, part in zip(paths, parts)
+            ]
+            entries = [future.result() for future in futures]
+        
+        size = _write_manifest(path, {
+            'format': MANIFEST_FORMAT,
+            'version': MANIFEST_VERSION,
+            'next_id': next_id,
+            'codec': codec,
+            'count': len(shapes),
+            'shards': entries
+        })
+    except BaseException:
+        # Прежний манифест по-прежнему ссылается на свои шарды; убираем только новые
+        _remove_shards(paths + [shard_file + '.tmp' for shard_file in paths])
+        raise
+    _remove_stale_shards(path, entries)
+    return size + sum(entry['size'] for entry in entries)
+
+
+def _write_manifest(path, manifest):
+    """Атомарно записать манифест и вернуть его размер в байтах."""
+    data = json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8')
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(data)
+    os.replace(temp_path, path)
+    return len(data)
+
+
+def read_manifest(file):
+    """
+    Прочитать и проверить манифест сцены.
+    
+    Args:
+        file: Файл манифеста, открытый для чтения в двоичном режиме
+    
+    Returns:
+        dict: Манифест
+    
+    Raises:
+        SceneFormatError: Если файл не является манифестом сцены
+    """
+    try:
+        manifest = json.loads(file.read().decode('utf-8'))
+    except (UnicodeDecodeError, ValueError):
+        raise SceneFormatError("Файл манифеста сцены поврежден")
+    if not isinstance(manifest, dict) or manifest.get('format') != MANIFEST_FORMAT:
+        raise SceneFormatError("Файл не является манифестом сцены")
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise SceneFormatError(f"Неподдерживаемая версия манифеста: {manifest.get('version')}")
+    return manifest
+
+
+def _read_shard(directory, entry):
+    """Прочитать один шард, проверив его размер и контрольную сумму."""
+    path = os.path.join(directory, entry['file'])
+    try:
+        with open(path, 'rb') as file:
+            data = file.read()
+    except OSError:
+        raise SceneFormatError(f"Шард '{entry['file']}' не найден")
+    if len(data) != entry['size'] or hashlib.sha256(data).hexdigest() != entry['sha256']:
+        raise SceneFormatError(f"Шард '{entry['file']}' поврежден: контрольная сумма не совпадает")
+    shapes, _ = read_scene(io.BytesIO(data))
+    if len(shapes) != entry['count']:
+        raise SceneFormatError(f"Шард '{entry['file']}' поврежден: неверное количество фигур")
+    return shapes
+
+
+def read_sharded_scene(file, directory, workers=None):
+    """
+    Прочитать сцену по манифесту, загружая шарды параллельно.
+    
+    Args:
+        file: Файл манифеста, открытый для чтения в двоичном режиме
+        directory (str): Каталог манифеста (шарды ищутся в нем)
+        workers (int, optional): Количество потоков (по умолчанию - по числу шардов, не больше числа ядер)
+    
+    Returns:
+        tuple: Тройка (словарь фигур, next_id, общий размер файлов в байтах)
+    """
+    manifest = read_manifest(file)
+    entries = manifest['shards']
+    workers = workers or max(1, min(len(entries), os.cpu_count() or 1))
+    
+    shapes = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Шарды содержат возрастающие диапазоны ID, поэтому порядок ID сохраняется
+        for part in pool.map(lambda entry: _read_shard(directory, entry), entries):
+            shapes.update(part)
+    return shapes, manifest['next_id'], file.tell() + sum(entry['size'] for entry in entries)
+
+
+def _verify_shard(path, entry):
+    """Проверить размер и контрольную сумму файла шарда, читая его порциями."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as file:
+        while True:
+            piece = file.read(READ_SIZE)
+            if not piece:
+                break
+            digest.update(piece)
+            size += len(piece)
+    if size != entry['size'] or digest.hexdigest() != entry['sha256']:
+        raise SceneFormatError(f"Шард '{entry['file']}' поврежден: контрольная сумма не совпадает")
+
+
+def iter_sharded_chunks(file, directory):
+    """
+    Последовательно прочитать блоки всех шардов сцены.
+    
+    В памяти одновременно находится не больше одного блока.
+    
+    Args:
+        file: Файл манифеста, открытый для чтения в двоичном режиме
+        directory (str): Каталог манифеста (шарды ищутся в нем)
+    
+    Yields:
+        list: Пары (ID, фигура) очередного блока
+    """
+    for entry in read_manifest(file)['shards']:
+        path = os.path.join(directory, entry['file'])
+        if not os.path.exists(path):
+            raise SceneFormatError(f"Шард '{entry['file']}' не найден")
+        _verify_shard(path, entry)
+        with open(path, 'rb') as shard:
+            yield from iter_chunks(shard)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Разбор выборок фигур для команд векторного редактора.
+
+Выборка задается одним аргументом командной строки:
+  all                      - все фигуры
+  5,9,200-300              - список ID и диапазонов ID
+  type=<тип>               - все фигуры указанного типа
+  region=x1,y1,x2,y2       - 2D фигуры, пересекающие прямоугольник
+  region=x1,y1,z1,x2,y2,z2 - 3D фигуры, пересекающие параллелепипед
+  selected                 - фигуры, найденные последней командой select
+"""
+
+
+class SelectionError(ValueError):
+    """Ошибка разбора выборки."""
+    pass
+
+
+def parse_id_ranges(spec):
+    """
+    Разобрать список ID и диапазонов ID.
+    
+    Args:
+        spec (str): Строка вида "5,9,200-300"
+    
+    Returns:
+        list: Список пар (начало, конец) включительно
+    
+    Raises:
+        SelectionError: Если строка не является списком ID
+    """
+    ranges = []
+    for part in spec.split(','):
+        if not part:
+            continue
+        start, sep, end = part.partition('-')
+        try:
+            start = int(start)
+            end = int(end) if sep else start
+        except ValueError:
+            raise SelectionError(f"Некорректный ID или диапазон ID: '{part}'")
+        if start > end:
+            start, end = end, start
+        ranges.append((start, end))
+    if not ranges:
+        raise SelectionError("Не указаны ID фигур")
+    return ranges
+
+
+def ids_in_ranges(ranges, shapes):
+    """
+    Получить существующие ID фигур из диапазонов.
+    
+    Для каждого диапазона перебирается меньшее из двух множеств:
+    сам диапазон или словарь фигур.
+    
+    Args:
+        ranges (list): Список пар (начало, конец)
+        shapes (dict): Словарь фигур (id -> фигура)
+    
+    Returns:
+        list: ID найденных фигур без повторов, в порядке диапазонов
+    """
+    found = {}
+    for start, end in ranges:
+        if end - start + 1 <= len(shapes):
+            found.update((shape_id, None) for shape_id in range(start, end + 1) if shape_id in shapes)
+        else:
+            found.update((shape_id, None) for shape_id in sorted(shapes) if start <= shape_id <= end)
+    return list(found)
+
+
+def format_id_ranges(shape_ids, limit=20):
+    """
+    Записать отсортированные ID компактно, объединяя подряд идущие в диапазоны.
+    
+    Args:
+        shape_ids (list): Отсортированные ID
+        limit (int, optional): Максимальное количество выводимых диапазонов
+    
+    Returns:
+        str: Строка вида "1-5,9,12-14" (с многоточием, если диапазонов больше limit)
+    """
+    parts = []
+    start = previous = None
+    for shape_id in shape_ids:
+        if previous is not None and shape_id == previous + 1:
+            previous = shape_id
+            continue
+        if start is not None:
+            parts.append(f"{start}-{previous}" if previous != start else f"{start}")
+            if len(parts) >= limit:
+                return ','.join(parts) + ',...'
+        start = previous = shape_id
+    if start is not None:
+        parts.append(f"{start}-{previous}" if previous != start else f"{start}")
+    return ','.join(parts)
+
+
+def parse_region(spec):
+    """
+    Разобрать область вида "x1,y1,x2,y2" или "x1,y1,z1,x2,y2,z2".
+    
+    Args:
+        spec (str): Координаты двух противоположных углов области
+    
+    Returns:
+        tuple: Нормализованная область (min..., max...)
+    
+    Raises:
+        SelectionError: Если область задана некорректно
+    """
+    try:
+        values = [float(value) for value in spec.split(',')]
+    except ValueError:
+        raise SelectionError("Координаты области должны быть числами")
+    if len(values) not in (4, 6):
+        raise SelectionError("Область задается 4 (2D) или 6 (3D) координатами")
+    dims = len(values) // 2
+    low = [min(values[i], values[dims + i]) for i in range(dims)]
+    high = [max(values[i], values[dims + i]) for i in range(dims)]
+    return tuple(low + high)
+
+
+def parse_selection(spec):
+    """
+    Разобрать выборку.
+    
+    Args:
+        spec (str): Строка выборки
+    
+    Returns:
+        tuple: Пара (вид выборки, значение), где вид - 'all', 'ids', 'type', 'region' или 'selected'
+    
+    Raises:
+        SelectionError: Если выборка задана некорректно
+    """
+    if spec.lower() == 'all':
+        return 'all', None
+    if spec.lower() == 'selected':
+        return 'selected', None
+    key, sep, value = spec.partition('=')
+    if sep:
+        key = key.lower()
+        if key == 'type':
+            return 'type', value.lower()
+        if key == 'region':
+            return 'region', parse_region(value)
+        raise SelectionError(f"Неизвестный вид выборки '{key}'")
+    return 'ids', parse_id_ranges(spec)
@@ -7,12 +7,42 @@
 """
 
 from abc import ABC, abstractmethod
-import json
+from flyweight import intern_geometry, intern_name
+from tessellation import DEFAULT_LOD, segments_for
 
 
 class Shape(ABC):
     """Абстрактный базовый класс для всех фигур."""
     
+    # Параметры конструктора фигуры (совпадают с именами атрибутов);
+    # используются для поколоночного сохранения сцены (см. scene_format.py)
+    PARAMS = None
+    
+    # Параметры, от которых зависят метрики фигуры (площадь, объем и т.д.);
+    # фигуры с одинаковыми значениями разделяют одну запись геометрии (см. flyweight.py)
+    GEOMETRY = ()
+    
+    # Описание геометрии для пакетных преобразований (см. transforms.py):
+    # COORDS - атрибуты опорных точек, SIZES - линейные размеры,
+    # ANCHOR_SIZES - размеры, задающие смещение центра от опорной точки
+    # (для фигур, опорная точка которых является углом),
+    # AXIS_SIZES - размеры вдоль осей X и Y у фигур, выровненных по осям
+    # (при повороте на 90° они меняются местами, на другие углы такие фигуры не поворачиваются)
+    COORDS = ()
+    SIZES = ()
+    ANCHOR_SIZES = None
+    AXIS_SIZES = None
+    
+    # Параметр с координатами вершин x, y подряд в array('d') (см. shapes_2d.VertexShape2D);
+    # такие фигуры преобразуются и сохраняются целыми массивами
+    VERTICES = None
+    
+    # Составная фигура (группа, см. shapes_group.py); преобразования
+    # применяются к ее вложенным фигурам
+    COMPOSITE = False
+    
+    parent = None  # Группа, в которую входит фигура
+    
     def __init__(self, name):
         """
         Инициализация базового класса фигуры.
@@ -20,9 +50,119 @@ class Shape(ABC):
         Args:
             name (str): Название фигуры
         """
-        self.name = name
+        self.name = intern_name(name)
         self.id = None  # ID будет назначен при добавлении в редактор
     
+    @property
+    def geometry(self):
+        """
+        Получить общую запись геометрии фигуры.
+        
+        При первом обращении собственные значения параметров GEOMETRY заменяются
+        общими объектами из записи. После изменения параметров фигуры необходимо
+        вызвать invalidate_caches (пакетные преобразования делают это сами).
+        
+        Returns:
+            GeometryRecord: Запись геометрии с кэшем метрик
+        """
+        record = self.__dict__.get('_geometry')
+        if record is None:
+            values = tuple([getattr(self, attr) for attr in self.GEOMETRY])
+            record = self._geometry = intern_geometry(type(self), values)
+            self.__dict__.update(zip(self.GEOMETRY, record.values))
+        return record
+    
+    def invalidate_caches(self):
+        """Сбросить кэшированные производные данные после изменения параметров фигуры."""
+        self.__dict__.pop('_geometry', None)
+        if self.parent is not None:
+            self.parent.mark_dirty()
+    
+    def clone(self):
+        """
+        Получить поверхностную копию фигуры.
+        
+        Значения атрибутов фигур неизменяемы (числа, строки, общие записи
+        геометрии), поэтому копия не зависит от оригинала.
+        
+        Returns:
+            Shape: Копия фигуры
+        """
+        copy = object.__new__(type(self))
+        copy.__dict__.update(self.__dict__)
+        copy.__dict__.pop('_meshes', None)
+        return copy
+    
+    def get_mesh(self, lod=DEFAULT_LOD):
+        """
+        Получить тесселяцию фигуры (буферы вершин и индексов треугольников).
+        
+        Сетка кэшируется в фигуре для каждого уровня детализации вместе со
+        значениями PARAMS, по которым она построена, и строится заново, только
+        если параметры фигуры изменились. Буферы сетки общие для всех
+        потребителей и не должны изменяться.
+        
+        Args:
+            lod (int, optional): Уровень детализации (см. tessellation.py)
+        
+        Returns:
+            Mesh: Сетка фигуры
+        
+        Raises:
+            ValueError: Если уровень детализации вне допустимого диапазона
+        """
+        meshes = self.__dict__.get('_meshes')
+        if meshes is None:
+            meshes = self._meshes = {}
+        key = tuple([getattr(self, attr) for attr in self.PARAMS])
+        entry = meshes.get(lod)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        segments_for(lod)
+        mesh = self._build_mesh(lod)
+        meshes[lod] = (key, mesh)
+        return mesh
+    
+    def _build_mesh(self, lod):
+        """
+        Построить сетку фигуры.
+        
+        Args:
+            lod (int): Уровень детализации
+        
+        Returns:
+            Mesh: Сетка фигуры
+        """
+        raise NotImplementedError(f"Тесселяция фигур {type(self).__name__} не поддерживается")
+    
+    def __getstate__(self):
+        """
+        Получить состояние фигуры для pickle без кэшей сеток и метрик.
+        
+        Возвращается всегда копия словаря атрибутов: pickle перебирает
+        состояние, вызывая код Python для вложенных фигур, и фоновая запись
+        (autosave) иначе могла бы увидеть словарь, в который основной поток
+        в это время добавляет кэши. Копия делается одним вызовом dict(),
+        который другие потоки не прерывают.
+        
+        Returns:
+            dict: Атрибуты фигуры
+        """
+        state = dict(self.__dict__)
+        state.pop('_meshes', None)
+        state.pop('_metrics', None)
+        return state
+    
+    def __setstate__(self, state):
+        """
+        Восстановить фигуру при загрузке из pickle, интернируя имя.
+        
+        Args:
+            state (dict): Атрибуты фигуры
+        """
+        self.__dict__.update(state)
+        self.name = intern_name(self.name)
+    
     @abstractmethod
     def get_info(self):
         """
@@ -40,6 +180,8 @@ class Shape(ABC):
         Returns:
             str: JSON-представление фигуры
         """
+        import json
+        
         return json.dumps(self.get_info())
     
     @abstractmethod
@@ -66,6 +208,16 @@ class Shape2D(Shape):
         super().__init__(name)
         self.dimension = 2
     
+    @abstractmethod
+    def get_bounding_box(self):
+        """
+        Получить ограничивающий прямоугольник фигуры, выровненный по осям.
+        
+        Returns:
+            tuple: (min_x, min_y, max_x, max_y)
+        """
+        pass
+    
     @abstractmethod
     def get_area(self):
         """
@@ -156,6 +308,16 @@ class Shape3D(Shape):
         """
         pass
     
+    @abstractmethod
+    def get_bounding_box(self):
+        """
+        Получить ограничивающий параллелепипед фигуры, выровненный по осям.
+        
+        Returns:
+            tuple: (min_x, min_y, min_z, max_x, max_y, max_z)
+        """
+        pass
+    
     def get_info(self):
         """
         Получить информацию о 3D фигуре.
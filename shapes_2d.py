@@ -3,16 +3,25 @@
 
 """
 Реализация 2D фигур для векторного редактора.
-Включает классы: Point, Line, Circle, Square, Rectangle, Oval, RegularPolygon.
+Включает классы: Point, Line, Circle, Square, Rectangle, Oval, RegularPolygon,
+а также Polygon и Polyline с вершинами в массиве (базовый класс VertexShape2D).
 """
 
 import math
+from array import array
+from functools import wraps
+from operator import sub
 from shape import Shape2D
+from flyweight import cached_metric
+from tessellation import Mesh, ellipse_mesh, polygon_mesh, segments_for, signed_area, simple_polygon_mesh
 
 
 class Point(Shape2D):
     """Класс для представления точки в 2D пространстве."""
     
+    PARAMS = ('x', 'y')
+    COORDS = (('x', 'y'),)
+    
     def __init__(self, x, y, name="Point"):
         """
         Инициализация точки.
@@ -26,6 +35,15 @@ class Point(Shape2D):
         self.x = float(x)
         self.y = float(y)
     
+    def get_bounding_box(self):
+        """
+        Получить ограничивающий прямоугольник.
+        
+        Returns:
+            tuple: (min_x, min_y, max_x, max_y)
+        """
+        return (self.x, self.y, self.x, self.y)
+    
     def get_area(self):
         """
         Площадь точки всегда равна 0.
@@ -44,6 +62,18 @@ class Point(Shape2D):
         """
         return 0.0
     
+    def _build_mesh(self, lod):
+        """
+        Построить сетку точки (одна вершина).
+        
+        Args:
+            lod (int): Уровень детализации
+        
+        Returns:
+            Mesh: Сетка фигуры
+        """
+        return Mesh(2, array('d', (self.x, self.y)), closed=False)
+    
     def _get_specific_info(self):
         """
         Получить специфичную информацию о точке.
@@ -69,6 +99,9 @@ class Point(Shape2D):
 class Line(Shape2D):
     """Класс для представления отрезка в 2D пространстве."""
     
+    PARAMS = ('x1', 'y1', 'x2', 'y2')
+    COORDS = (('x1', 'y1'), ('x2', 'y2'))
+    
     def __init__(self, x1, y1, x2, y2, name="Line"):
         """
         Инициализация отрезка.
@@ -95,6 +128,16 @@ class Line(Shape2D):
         """
         return math.sqrt((self.x2 - self.x1) ** 2 + (self.y2 - self.y1) ** 2)
     
+    def get_bounding_box(self):
+        """
+        Получить ограничивающий прямоугольник.
+        
+        Returns:
+            tuple: (min_x, min_y, max_x, max_y)
+        """
+        return (min(self.x1, self.x2), min(self.y1, self.y2),
+                max(self.x1, self.x2), max(self.y1, self.y2))
+    
     def get_area(self):
         """
         Площадь отрезка всегда равна 0.
@@ -113,6 +156,18 @@ class Line(Shape2D):
         """
         return self.get_length()
     
+    def _build_mesh(self, lod):
+        """
+        Построить сетку отрезка (две вершины, без треугольников).
+        
+        Args:
+            lod (int): Уровень детализации
+        
+        Returns:
+            Mesh: Сетка фигуры
+        """
+        return Mesh(2, array('d', (self.x1, self.y1, self.x2, self.y2)), closed=False)
+    
     def _get_specific_info(self):
         """
         Получить специфичную информацию об отрезке.
@@ -139,6 +194,11 @@ class Line(Shape2D):
 class Circle(Shape2D):
     """Класс для представления круга в 2D пространстве."""
     
+    PARAMS = ('center_x', 'center_y', 'radius')
+    GEOMETRY = ('radius',)
+    COORDS = (('center_x', 'center_y'),)
+    SIZES = ('radius',)
+    
     def __init__(self, center_x, center_y, radius, name="Circle"):
         """
         Инициализация круга.
@@ -157,6 +217,16 @@ class Circle(Shape2D):
         if self.radius <= 0:
             raise ValueError("Радиус должен быть положительным числом")
     
+    def get_bounding_box(self):
+        """
+        Получить ограничивающий прямоугольник.
+        
+        Returns:
+            tuple: (min_x, min_y, max_x, max_y)
+        """
+        return (self.center_x - self.radius, self.center_y - self.radius,
+                self.center_x + self.radius, self.center_y + self.radius)
+    
     def get_area(self):
         """
         Получить площадь круга.
@@ -175,6 +245,18 @@ class Circle(Shape2D):
         """
         return 2 * math.pi * self.radius
     
+    def _build_mesh(self, lod):
+        """
+        Построить сетку окружности (вписанный многоугольник из segments_for(lod) сторон).
+        
+        Args:
+            lod (int): Уровень детализации
+        
+        Returns:
+            Mesh: Сетка фигуры
+        """
+        return ellipse_mesh(self.center_x, self.center_y, self.radius, self.radius, segments_for(lod))
+    
     def _get_specific_info(self):
         """
         Получить специфичную информацию о круге.
@@ -200,6 +282,13 @@ class Circle(Shape2D):
 class Square(Shape2D):
     """Класс для представления квадрата в 2D пространстве."""
     
+    PARAMS = ('x', 'y', 'side_length')
+    GEOMETRY = ('side_length',)
+    COORDS = (('x', 'y'),)
+    SIZES = ('side_length',)
+    ANCHOR_SIZES = ('side_length', 'side_length')
+    AXIS_SIZES = ('side_length', 'side_length')
+    
     def __init__(self, x, y, side_length, name="Square"):
         """
         Инициализация квадрата.
@@ -218,6 +307,15 @@ class Square(Shape2D):
         if self.side_length <= 0:
             raise ValueError("Длина стороны должна быть положительным числом")
     
+    def get_bounding_box(self):
+        """
+        Получить ограничивающий прямоугольник.
+        
+        Returns:
+            tuple: (min_x, min_y, max_x, max_y)
+        """
+        return (self.x, self.y, self.x + self.side_length, self.y + self.side_length)
+    
     def get_area(self):
         """
         Получить площадь квадрата.
@@ -236,6 +334,20 @@ class Square(Shape2D):
         """
         return 4 * self.side_length
     
+    def _build_mesh(self, lod):
+        """
+        Построить сетку квадрата (уровень детализации не используется).
+        
+        Args:
+            lod (int): Уровень детализации
+        
+        Returns:
+            Mesh: Сетка фигуры
+        """
+        x2 = self.x + self.side_length
+        y2 = self.y + self.side_length
+        return polygon_mesh([self.x, x2, x2, self.x], [self.y, self.y, y2, y2])
+    
     def _get_specific_info(self):
         """
         Получить специфичную информацию о квадрате.
@@ -262,6 +374,13 @@ class Square(Shape2D):
 class Rectangle(Shape2D):
     """Класс для представления прямоугольника в 2D пространстве."""
     
+    PARAMS = ('x', 'y', 'width', 'height')
+    GEOMETRY = ('width', 'height')
+    COORDS = (('x', 'y'),)
+    SIZES = ('width', 'height')
+    ANCHOR_SIZES = ('width', 'height')
+    AXIS_SIZES = ('width', 'height')
+    
     def __init__(self, x, y, width, height, name="Rectangle"):
         """
         Инициализация прямоугольника.
@@ -282,6 +401,15 @@ class Rectangle(Shape2D):
         if self.width <= 0 or self.height <= 0:
             raise ValueError("Ширина и высота должны быть положительными числами")
     
+    def get_bounding_box(self):
+        """
+        Получить ограничивающий прямоугольник.
+        
+        Returns:
+            tuple: (min_x, min_y, max_x, max_y)
+        """
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
+    
     def get_area(self):
         """
         Получить площадь прямоугольника.
@@ -300,6 +428,20 @@ class Rectangle(Shape2D):
         """
         return 2 * (self.width + self.height)
     
+    def _build_mesh(self, lod):
+        """
+        Построить сетку прямоугольника (уровень детализации не используется).
+        
+        Args:
+            lod (int): Уровень детализации
+        
+        Returns:
+            Mesh: Сетка фигуры
+        """
+        x2 = self.x + self.width
+        y2 = self.y + self.height
+        return polygon_mesh([self.x, x2, x2, self.x], [self.y, self.y, y2, y2])
+    
     def _get_specific_info(self):
         """
         Получить специфичную информацию о прямоугольнике.
@@ -327,6 +469,12 @@ class Rectangle(Shape2D):
 class Oval(Shape2D):
     """Класс для представления овала в 2D пространстве."""
     
+    PARAMS = ('center_x', 'center_y', 'radius_x', 'radius_y')
+    GEOMETRY = ('radius_x', 'radius_y')
+    COORDS = (('center_x', 'center_y'),)
+    SIZES = ('radius_x', 'radius_y')
+    AXIS_SIZES = ('radius_x', 'radius_y')
+    
     def __init__(self, center_x, center_y, radius_x, radius_y, name="Oval"):
         """
         Инициализация овала.
@@ -347,6 +495,16 @@ class Oval(Shape2D):
         if self.radius_x <= 0 or self.radius_y <= 0:
             raise ValueError("Радиусы должны быть положительными числами")
     
+    def get_bounding_box(self):
+        """
+        Получить ограничивающий прямоугольник.
+        
+        Returns:
+            tuple: (min_x, min_y, max_x, max_y)
+        """
+        return (self.center_x - self.radius_x, self.center_y - self.radius_y,
+                self.center_x + self.radius_x, self.center_y + self.radius_y)
+    
     def get_area(self):
         """
         Получить площадь овала.
@@ -356,6 +514,7 @@ class Oval(Shape2D):
         """
         return math.pi * self.radius_x * self.radius_y
     
+    @cached_metric
     def get_perimeter(self):
         """
         Получить приближенный периметр овала по формуле Рамануджана.
@@ -369,6 +528,18 @@ class Oval(Shape2D):
         h = ((a - b) / (a + b)) ** 2
         return math.pi * (a + b) * (1 + 3 * h / (10 + math.sqrt(4 - 3 * h)))
     
+    def _build_mesh(self, lod):
+        """
+        Построить сетку овала (вписанный многоугольник из segments_for(lod) сторон).
+        
+        Args:
+            lod (int): Уровень детализации
+        
+        Returns:
+            Mesh: Сетка фигуры
+        """
+        return ellipse_mesh(self.center_x, self.center_y, self.radius_x, self.radius_y, segments_for(lod))
+    
     def _get_specific_info(self):
         """
         Получить специфичную информацию об овале.
@@ -395,6 +566,11 @@ class Oval(Shape2D):
 class RegularPolygon(Shape2D):
     """Класс для представления правильного многоугольника в 2D пространстве."""
     
+    PARAMS = ('center_x', 'center_y', 'num_sides', 'side_length')
+    GEOMETRY = ('num_sides', 'side_length')
+    COORDS = (('center_x', 'center_y'),)
+    SIZES = ('side_length',)
+    
     def __init__(self, center_x, center_y, num_sides, side_length, name="RegularPolygon"):
         """
         Инициализация правильного многоугольника.
@@ -417,6 +593,7 @@ class RegularPolygon(Shape2D):
         if self.side_length <= 0:
             raise ValueError("Длина стороны должна быть положительным числом")
     
+    @cached_metric
     def get_radius(self):
         """
         Получить радиус описанной окружности.
@@ -426,6 +603,7 @@ class RegularPolygon(Shape2D):
         """
         return self.side_length / (2 * math.sin(math.pi / self.num_sides))
     
+    @cached_metric
     def get_apothem(self):
         """
         Получить апофему (радиус вписанной окружности).
@@ -435,6 +613,18 @@ class RegularPolygon(Shape2D):
         """
         return self.get_radius() * math.cos(math.pi / self.num_sides)
     
+    def get_bounding_box(self):
+        """
+        Получить ограничивающий прямоугольник (по описанной окружности).
+        
+        Returns:
+            tuple: (min_x, min_y, max_x, max_y)
+        """
+        radius = self.get_radius()
+        return (self.center_x - radius, self.center_y - radius,
+                self.center_x + radius, self.center_y + radius)
+    
+    @cached_metric
     def get_area(self):
         """
         Получить площадь правильного многоугольника.
@@ -453,6 +643,21 @@ class RegularPolygon(Shape2D):
         """
         return self.num_sides * self.side_length
     
+    def _build_mesh(self, lod):
+        """
+        Построить сетку многоугольника (нижняя сторона горизонтальна, уровень детализации не используется).
+        
+        Args:
+            lod (int): Уровень детализации
+        
+        Returns:
+            Mesh: Сетка фигуры
+        """
+        # Первая вершина - правый конец нижней стороны
+        start_angle = math.pi / self.num_sides - math.pi / 2
+        radius = self.get_radius()
+        return ellipse_mesh(self.center_x, self.center_y, radius, radius, self.num_sides, start_angle)
+    
     def _get_specific_info(self):
         """
         Получить специфичную информацию о правильном многоугольнике.
@@ -476,3 +681,221 @@ class RegularPolygon(Shape2D):
             str: Строковое представление
         """
         return f"{self.name} ({self.id}): RegularPolygon(center=({self.center_x}, {self.center_y}), sides={self.num_sides}, side_length={self.side_length})"
+
+
+def _vertex_metric(method):
+    """
+    Декоратор метрики фигуры с массивом вершин.
+    
+    Значение кэшируется в фигуре вместе с массивом вершин, по которому оно
+    вычислено. Преобразования заменяют массив новым, поэтому кэш сбрасывается
+    без явной инвалидации, а копии фигуры (clone) разделяют его с оригиналом.
+    
+    Args:
+        method (callable): Метод фигуры без аргументов
+    
+    Returns:
+        callable: Метод с кэшированием
+    """
+    name = method.__name__
+    
+    @wraps(method)
+    def wrapper(self):
+        cache = self.__dict__.get('_metrics')
+        if cache is None or cache[0] is not self.vertices:
+            cache = self._metrics = (self.vertices, {})
+        try:
+            return cache[1][name]
+        except KeyError:
+            value = cache[1][name] = method(self)
+            return value
+    
+    return wrapper
+
+
+class VertexShape2D(Shape2D):
+    """
+    Базовый класс 2D фигур, заданных списком вершин.
+    
+    Координаты вершин хранятся подряд (x, y, x, y, ...) в одном массиве
+    array('d'), метрики вычисляются проходами по срезам массива.
+    """
+    
+    PARAMS = ('vertices',)
+    VERTICES = 'vertices'
+    MIN_VERTICES = 2
+    CLOSED = False
+    
+    def __init__(self, vertices, name):
+        """
+        Инициализация фигуры по вершинам.
+        
+        Args:
+            vertices (iterable): Координаты вершин x, y подряд
+            name (str): Название фигуры
+        
+        Raises:
+            ValueError: Если координат нечетное количество или вершин слишком мало
+        """
+        super().__init__(name)
+        vertices = array('d', vertices)
+        if len(vertices) % 2:
+            raise ValueError("Количество координат вершин должно быть четным")
+        if self.CLOSED and len(vertices) > 2 and vertices[:2] == vertices[-2:]:
+            # Замыкающая вершина, совпадающая с первой, не хранится
+            del vertices[-2:]
+        if len(vertices) < 2 * self.MIN_VERTICES:
+            raise ValueError(f"Фигура {type(self).__name__} должна иметь не менее {self.MIN_VERTICES} вершин")
+        self.vertices = vertices
+    
+    def get_vertex_count(self):
+        """
+        Получить количество вершин.
+        
+        Returns:
+            int: Количество вершин
+        """
+        return len(self.vertices) // 2
+    
+    @_vertex_metric
+    def get_bounding_box(self):
+        """
+        Получить ограничивающий прямоугольник.
+        
+        Returns:
+            tuple: (min_x, min_y, max_x, max_y)
+        """
+        xs = self.vertices[0::2]
+        ys = self.vertices[1::2]
+        return (min(xs), min(ys), max(xs), max(ys))
+    
+    @_vertex_metric
+    def _get_edges_length(self):
+        """
+        Получить суммарную длину ребер (для замкнутой фигуры - с замыкающим ребром).
+        
+        Returns:
+            float: Длина ребер
+        """
+        xs = self.vertices[0::2]
+        ys = self.vertices[1::2]
+        lengths = list(map(math.hypot, map(sub, xs[1:], xs), map(sub, ys[1:], ys)))
+        if self.CLOSED:
+            lengths.append(math.hypot(xs[0] - xs[-1], ys[0] - ys[-1]))
+        return math.fsum(lengths)
+    
+    def get_perimeter(self):
+        """
+        Получить периметр фигуры.
+        
+        Returns:
+            float: Периметр фигуры
+        """
+        return self._get_edges_length()
+    
+    def _get_specific_info(self):
+        """
+        Получить специфичную информацию о фигуре.
+        
+        Returns:
+            dict: Словарь с количеством вершин и вершинами [x, y]
+        """
+        vertices = self.vertices
+        return {
+            'vertex_count': self.get_vertex_count(),
+            'vertices': [list(pair) for pair in zip(vertices[0::2], vertices[1::2])]
+        }
+    
+    def __str__(self):
+        """
+        Строковое представление фигуры (без списка вершин).
+        
+        Returns:
+            str: Строковое представление
+        """
+        min_x, min_y, max_x, max_y = self.get_bounding_box()
+        return (f"{self.name} ({self.id}): {type(self).__name__}(vertices={self.get_vertex_count()}, "
+                f"bbox=({min_x}, {min_y}, {max_x}, {max_y}))")
+
+
+class Polygon(VertexShape2D):
+    """Класс для представления произвольного простого многоугольника в 2D пространстве."""
+    
+    MIN_VERTICES = 3
+    CLOSED = True
+    
+    def __init__(self, vertices, name="Polygon"):
+        """
+        Инициализация многоугольника.
+        
+        Args:
+            vertices (iterable): Координаты вершин x, y подряд в любом направлении обхода
+            name (str, optional): Название многоугольника. По умолчанию "Polygon".
+        """
+        super().__init__(vertices, name)
+    
+    @_vertex_metric
+    def get_area(self):
+        """
+        Получить площадь многоугольника (формула шнурования).
+        
+        Returns:
+            float: Площадь многоугольника
+        """
+        return abs(signed_area(self.vertices))
+    
+    def _build_mesh(self, lod):
+        """
+        Построить сетку многоугольника отсечением ушей (уровень детализации не используется).
+        
+        Args:
+            lod (int): Уровень детализации
+        
+        Returns:
+            Mesh: Сетка фигуры
+        """
+        return simple_polygon_mesh(self.vertices)
+
+
+class Polyline(VertexShape2D):
+    """Класс для представления ломаной в 2D пространстве."""
+    
+    def __init__(self, vertices, name="Polyline"):
+        """
+        Инициализация ломаной.
+        
+        Args:
+            vertices (iterable): Координаты вершин x, y подряд
+            name (str, optional): Название ломаной. По умолчанию "Polyline".
+        """
+        super().__init__(vertices, name)
+    
+    def get_length(self):
+        """
+        Получить длину ломаной.
+        
+        Returns:
+            float: Длина ломаной
+        """
+        return self._get_edges_length()
+    
+    def get_area(self):
+        """
+        Площадь ломаной всегда равна 0.
+        
+        Returns:
+            float: 0
+        """
+        return 0.0
+    
+    def _build_mesh(self, lod):
+        """
+        Построить сетку ломаной (вершины без треугольников).
+        
+        Args:
+            lod (int): Уровень детализации
+        
+        Returns:
+            Mesh: Сетка фигуры
+        """
+        return Mesh(2, self.vertices, closed=False)
@@ -8,11 +8,31 @@
 
 import math
 from shape import Shape3D
+from flyweight import cached_metric
+from tessellation import polyhedron_mesh
+
+# Вершины параллелепипеда и тетраэдра в единицах размеров фигуры:
+# у параллелепипеда бит 0 номера вершины - x, бит 1 - y, бит 2 - z
+# (0 - минимум, 1 - максимум), у тетраэдра - знаки смещений от центра
+PARALLELEPIPED_CORNERS = tuple((index & 1, index >> 1 & 1, index >> 2 & 1) for index in range(8))
+TETRAHEDRON_CORNERS = ((1, 1, 1), (1, -1, -1), (-1, 1, -1), (-1, -1, 1))
+
+# Грани параллелепипеда и тетраэдра: индексы вершин против часовой стрелки
+# при взгляде снаружи (нормали треугольников направлены наружу)
+PARALLELEPIPED_FACES = ((0, 2, 3, 1), (4, 5, 7, 6), (0, 1, 5, 4), (2, 6, 7, 3), (0, 4, 6, 2), (1, 3, 7, 5))
+TETRAHEDRON_FACES = ((0, 1, 2), (0, 3, 1), (0, 2, 3), (1, 3, 2))
 
 
 class Parallelepiped(Shape3D):
     """Класс для представления параллелепипеда в 3D пространстве."""
     
+    PARAMS = ('x', 'y', 'z', 'width', 'height', 'depth')
+    GEOMETRY = ('width', 'height', 'depth')
+    COORDS = (('x', 'y', 'z'),)
+    SIZES = ('width', 'height', 'depth')
+    ANCHOR_SIZES = ('width', 'height', 'depth')
+    AXIS_SIZES = ('width', 'height')
+    
     def __init__(self, x, y, z, width, height, depth, name="Parallelepiped"):
         """
         Инициализация параллелепипеда.
@@ -55,6 +75,30 @@ class Parallelepiped(Shape3D):
         """
         return 2 * (self.width * self.height + self.width * self.depth + self.height * self.depth)
     
+    def get_bounding_box(self):
+        """
+        Получить ограничивающий параллелепипед.
+        
+        Returns:
+            tuple: (min_x, min_y, min_z, max_x, max_y, max_z)
+        """
+        return (self.x, self.y, self.z,
+                self.x + self.width, self.y + self.height, self.z + self.depth)
+    
+    def _build_mesh(self, lod):
+        """
+        Построить сетку параллелепипеда (12 треугольников, уровень детализации не используется).
+        
+        Args:
+            lod (int): Уровень детализации
+        
+        Returns:
+            Mesh: Сетка фигуры
+        """
+        points = [(self.x + a * self.width, self.y + b * self.height, self.z + c * self.depth)
+                  for a, b, c in PARALLELEPIPED_CORNERS]
+        return polyhedron_mesh(points, PARALLELEPIPED_FACES)
+    
     def _get_specific_info(self):
         """
         Получить специфичную информацию о параллелепипеде.
@@ -82,6 +126,11 @@ class Parallelepiped(Shape3D):
 class Tetrahedron(Shape3D):
     """Класс для представления тетраэдра (правильного четырехгранника) в 3D пространстве."""
     
+    PARAMS = ('x', 'y', 'z', 'edge_length')
+    GEOMETRY = ('edge_length',)
+    COORDS = (('x', 'y', 'z'),)
+    SIZES = ('edge_length',)
+    
     def __init__(self, x, y, z, edge_length, name="Tetrahedron"):
         """
         Инициализация тетраэдра.
@@ -102,6 +151,7 @@ class Tetrahedron(Shape3D):
         if self.edge_length <= 0:
             raise ValueError("Длина ребра должна быть положительным числом")
     
+    @cached_metric
     def get_volume(self):
         """
         Получить объем тетраэдра.
@@ -111,6 +161,7 @@ class Tetrahedron(Shape3D):
         """
         return (math.sqrt(2) / 12) * self.edge_length ** 3
     
+    @cached_metric
     def get_surface_area(self):
         """
         Получить площадь поверхности тетраэдра.
@@ -120,6 +171,7 @@ class Tetrahedron(Shape3D):
         """
         return math.sqrt(3) * self.edge_length ** 2
     
+    @cached_metric
     def get_height(self):
         """
         Получить высоту тетраэдра.
@@ -129,6 +181,42 @@ class Tetrahedron(Shape3D):
         """
         return math.sqrt(6) * self.edge_length / 3
     
+    def get_vertices(self):
+        """
+        Получить вершины тетраэдра.
+        
+        Вершины тетраэдра совпадают с чередующимися вершинами куба
+        с ребром edge_length / sqrt(2) и тем же центром.
+        
+        Returns:
+            list: Список из четырех кортежей (x, y, z)
+        """
+        s = self.edge_length / (2 * math.sqrt(2))
+        return [(self.x + a * s, self.y + b * s, self.z + c * s) for a, b, c in TETRAHEDRON_CORNERS]
+    
+    def get_bounding_box(self):
+        """
+        Получить ограничивающий параллелепипед.
+        
+        Returns:
+            tuple: (min_x, min_y, min_z, max_x, max_y, max_z)
+        """
+        s = self.edge_length / (2 * math.sqrt(2))
+        return (self.x - s, self.y - s, self.z - s,
+                self.x + s, self.y + s, self.z + s)
+    
+    def _build_mesh(self, lod):
+        """
+        Построить сетку тетраэдра (4 треугольника, уровень детализации не используется).
+        
+        Args:
+            lod (int): Уровень детализации
+        
+        Returns:
+            Mesh: Сетка фигуры
+        """
+        return polyhedron_mesh(self.get_vertices(), TETRAHEDRON_FACES)
+    
     def _get_specific_info(self):
         """
         Получить специфичную информацию о тетраэдре.
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Составные фигуры (группы).
+
+Группа содержит дочерние фигуры одной размерности, в том числе другие группы,
+и сообщает их суммарные метрики (площадь и периметр для 2D, объем и площадь
+поверхности для 3D) и общий ограничивающий прямоугольник (параллелепипед).
+
+Суммарные значения кэшируются в каждой группе. При изменении дочерней фигуры
+(см. Shape.invalidate_caches) кэш сбрасывается только у групп на пути от нее
+к корню иерархии, а при следующем запросе пересчитываются только эти группы:
+остальные дочерние группы отдают ранее вычисленные значения. Так же
+кэшируются объединенные сетки группы (см. get_mesh).
+"""
+
+from shape import Shape, Shape2D, Shape3D
+from tessellation import DEFAULT_LOD, merge_meshes, segments_for
+
+
+class Group(Shape):
+    """Базовый класс группы фигур."""
+    
+    COMPOSITE = True
+    
+    # Методы суммируемых метрик дочерних фигур (задаются в подклассах)
+    METRICS = ()
+    
+    def __init__(self, children, name="Group"):
+        """
+        Инициализация группы.
+        
+        Args:
+            children (list): Дочерние фигуры одной размерности
+            name (str, optional): Название группы. По умолчанию "Group".
+        """
+        super().__init__(name)
+        self.children = list(children)
+        for child in self.children:
+            child.parent = self
+        self._aggregates = None  # (метрики..., ограничивающий бокс, количество фигур) или None
+    
+    def mark_dirty(self):
+        """Сбросить кэш суммарных значений и сеток у группы и ее предков."""
+        group = self
+        while group is not None and group._aggregates is not None:
+            group._aggregates = None
+            group.__dict__.pop('_meshes', None)
+            group = group.parent
+    
+    def invalidate_caches(self):
+        """Сбросить кэшированные данные группы и ее предков."""
+        super().invalidate_caches()
+        self.mark_dirty()
+    
+    def _get_aggregates(self):
+        """
+        Получить суммарные значения, пересчитывая их при необходимости.
+        
+        Returns:
+            tuple: Суммы метрик (в порядке METRICS), ограничивающий бокс
+                и количество нераздельных фигур в группе
+        """
+        aggregates = self._aggregates
+        if aggregates is None:
+            aggregates = self._aggregates = self._compute_aggregates()
+        return aggregates
+    
+    def _compute_aggregates(self):
+        """Вычислить суммарные значения по дочерним фигурам."""
+        totals = [0.0] * len(self.METRICS)
+        boxes = []
+        leaves = 0
+        for child in self.children:
+            for index, method in enumerate(self.METRICS):
+                totals[index] += getattr(child, method)()
+            boxes.append(child.get_bounding_box())
+            leaves += child.count_leaves() if type(child).COMPOSITE else 1
+        dims = self.dimension
+        box = tuple(min(box[axis] for box in boxes) for axis in range(dims)) + \
+            tuple(max(box[dims + axis] for box in boxes) for axis in range(dims))
+        return (*totals, box, leaves)
+    
+    def get_bounding_box(self):
+        """
+        Получить общий ограничивающий бокс дочерних фигур.
+        
+        Returns:
+            tuple: (min_x, min_y, max_x, max_y) или (min_x, min_y, min_z, max_x, max_y, max_z)
+        """
+        return self._get_aggregates()[-2]
+    
+    def count_leaves(self):
+        """
+        Получить количество нераздельных (не являющихся группами) фигур в группе.
+        
+        Returns:
+            int: Количество фигур на всех уровнях вложенности
+        """
+        return self._get_aggregates()[-1]
+    
+    def get_mesh(self, lod=DEFAULT_LOD):
+        """
+        Получить объединенную сетку дочерних фигур.
+        
+        Сетка кэшируется до изменения любой вложенной фигуры: кэш сбрасывается
+        вместе с суммарными значениями (см. mark_dirty), поэтому после изменения
+        одной фигуры заново объединяются только группы на пути к корню,
+        а сетки остальных фигур берутся из их кэшей.
+        
+        Args:
+            lod (int, optional): Уровень детализации (см. tessellation.py)
+        
+        Returns:
+            Mesh: Объединенная сетка
+        
+        Raises:
+            ValueError: Если уровень детализации вне допустимого диапазона
+        """
+        # Кэш сеток сбрасывается только у групп с актуальными суммарными значениями
+        self._get_aggregates()
+        meshes = self.__dict__.get('_meshes')
+        if meshes is None:
+            meshes = self._meshes = {}
+        mesh = meshes.get(lod)
+        if mesh is None:
+            segments_for(lod)
+            mesh = meshes[lod] = merge_meshes(self.dimension, [child.get_mesh(lod) for child in self.children])
+        return mesh
+    
+    def iter_descendants(self):
+        """
+        Перебрать все вложенные фигуры, включая вложенные группы.
+        
+        Yields:
+            Shape: Вложенная фигура
+        """
+        stack = list(reversed(self.children))
+        while stack:
+            shape = stack.pop()
+            yield shape
+            if type(shape).COMPOSITE:
+                stack.extend(reversed(shape.children))
+    
+    def iter_leaves(self):
+        """
+        Перебрать нераздельные фигуры группы на всех уровнях вложенности.
+        
+        Yields:
+            Shape: Фигура, не являющаяся группой
+        """
+        for shape in self.iter_descendants():
+            if not type(shape).COMPOSITE:
+                yield shape
+    
+    def clone(self):
+        """
+        Получить копию группы со скопированными дочерними фигурами.
+        
+        Returns:
+            Group: Копия группы (без родителя)
+        """
+        copy = super().clone()
+        copy.children = [child.clone() for child in self.children]
+        for child in copy.children:
+            child.parent = copy
+        copy.parent = None
+        return copy
+    
+    def _get_specific_info(self):
+        """
+        Получить специфичную информацию о группе.
+        
+        Returns:
+            dict: Словарь с ID дочерних фигур, их количеством и ограничивающим боксом
+        """
+        box = self.get_bounding_box()
+        dims = self.dimension
+        return {
+            'children': [child.id for child in self.children],
+            'leaf_count': self.count_leaves(),
+            'bounding_box': {'min': list(box[:dims]), 'max': list(box[dims:])}
+        }
+    
+    def __str__(self):
+        """
+        Строковое представление группы.
+        
+        Returns:
+            str: Строковое представление
+        """
+        return f"{self.name} ({self.id}): Group{self.dimension}D(children={len(self.children)}, shapes={self.count_leaves()})"
+
+
+class Group2D(Group, Shape2D):
+    """Группа 2D фигур."""
+    
+    METRICS = ('get_area', 'get_perimeter')
+    
+    def get_area(self):
+        """
+        Получить суммарную площадь дочерних фигур.
+        
+        Returns:
+            float: Суммарная площадь
+        """
+        return self._get_aggregates()[0]
+    
+    def get_perimeter(self):
+        """
+        Получить суммарный периметр дочерних фигур.
+        
+        Returns:
+            float: Суммарный периметр
+        """
+        return self._get_aggregates()[1]
+
+
+class Group3D(Group, Shape3D):
+    """Группа 3D фигур."""
+    
+    METRICS = ('get_volume', 'get_surface_area')
+    
+    def get_volume(self):
+        """
+        Получить суммарный объем дочерних фигур.
+        
+        Returns:
+            float: Суммарный объем
+        """
+        return self._get_aggregates()[0]
+    
+    def get_surface_area(self):
+        """
+        Получить суммарную площадь поверхности дочерних фигур.
+        
+        Returns:
+            float: Суммарная площадь поверхности
+        """
+        return self._get_aggregates()[1]
+
+
+def make_group(children, name="Group"):
+    """
+    Создать группу нужной размерности.
+    
+    Args:
+        children (list): Дочерние фигуры
+        name (str, optional): Название группы
+    
+    Returns:
+        Group: Группа 2D или 3D фигур
+    
+    Raises:
+        ValueError: Если фигур нет или они разной размерности
+    """
+    children = list(children)
+    if not children:
+        raise ValueError("Группа должна содержать хотя бы одну фигуру")
+    dimensions = {child.dimension for child in children}
+    if len(dimensions) != 1:
+        raise ValueError("Группа может содержать только 2D или только 3D фигуры")
+    group_class = Group2D if dimensions.pop() == 2 else Group3D
+    return group_class(children, name)
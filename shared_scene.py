@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Публикация сцены в разделяемой памяти (команда share).
+
+Снимок сцены записывается в один блок multiprocessing.shared_memory
+поколоночно, как в сжатом формате файла (scene_format.py), но без сжатия:
+
+  заголовок       - MAGIC, версия и длина оглавления
+  оглавление      - JSON: next_id и для каждого класса фигур количество,
+                    смещения и коды типов столбцов
+  столбцы         - ID фигур (int64, по возрастанию), параметры конструктора
+                    (PARAMS класса: int64 или float64), смещения имен (int64)
+                    и имена в UTF-8; каждый столбец выровнен на 8 байт
+  pickle-данные   - фигуры классов без PARAMS (группы) и фигуры с массивами
+                    вершин переменной длины (многоугольники, ломаные)
+
+Рабочие процессы (отрисовка, анализ, экспорт) подключаются к блоку по имени
+(attach_scene) и получают столбцы как memoryview только для чтения прямо
+поверх разделяемой памяти: фигуры не сериализуются и не копируются в каждый
+процесс. Объекты фигур можно построить из столбцов по требованию
+(SharedShapes.shapes).
+
+Блок удаляет процесс, опубликовавший сцену (SharedScene.unlink). Подключение
+не регистрирует блок в resource_tracker, иначе при завершении рабочего
+процесса блок был бы удален или выдано предупреждение об утечке.
+"""
+
+import json
+import pickle
+import struct
+import sys
+import threading
+from array import array
+from importlib import import_module
+from multiprocessing import resource_tracker, shared_memory
+
+MAGIC = b'VSHM'
+VERSION = 1
+HEADER = struct.Struct('<4sBI')
+ALIGNMENT = 8
+
+_tracker_lock = threading.Lock()
+
+
+class SharedSceneError(ValueError):
+    """Ошибка формата сцены в разделяемой памяти."""
+    pass
+
+
+def _class_path(cls):
+    """Получить путь класса для оглавления."""
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _resolve_class(class_path):
+    """Найти класс фигуры по пути из оглавления."""
+    module_name, _, class_name = class_path.rpartition('.')
+    try:
+        return getattr(import_module(module_name), class_name)
+    except (ImportError, AttributeError):
+        raise SharedSceneError(f"Неизвестный класс фигуры '{class_path}'")
+
+
+def _align(offset):
+    """Выровнять смещение на ALIGNMENT байт."""
+    return offset + (-offset % ALIGNMENT)
+
+
+def _encode_columns(cls, items):
+    """
+    Разложить фигуры одного класса на столбцы.
+    
+    Args:
+        cls (type): Класс фигур с PARAMS
+        items (list): Пары (ID, фигура), отсортированные по ID
+    
+    Returns:
+        list: Пары (имя столбца, array или bytes); имена служебных столбцов начинаются с '.'
+    """
+    shapes = [shape for _, shape in items]
+    columns = [('.ids', array('q', [shape_id for shape_id, _ in items]))]
+    for param in cls.PARAMS:
+        values = [getattr(shape, param) for shape in shapes]
+        typecode = 'q' if all(type(value) is int for value in values) else 'd'
+        columns.append((param, array(typecode, values)))
+    names = [str(shape.name).encode('utf-8') for shape in shapes]
+    offsets = array('q', [0])
+    total = 0
+    for name in names:
+        total += len(name)
+        offsets.append(total)
+    columns.append(('.name_offsets', offsets))
+    columns.append(('.names', b''.join(names)))
+    return columns
+
+
+def _open_untracked(name):
+    """Подключиться к блоку разделяемой памяти, не регистрируя его в resource_tracker."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # До Python 3.13 SharedMemory всегда регистрирует блок; регистрация
+    # отключается на время подключения
+    with _tracker_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedShapes:
+    """Столбцы фигур одного класса в разделяемой памяти."""
+    
+    def __init__(self, class_path, count, ids, columns, name_offsets, names):
+        """
+        Инициализация представления класса фигур.
+        
+        Args:
+            class_path (str): Модуль и имя класса фигур ("shapes_2d.Circle")
+            count (int): Количество фигур
+            ids (memoryview): ID фигур по возрастанию
+            columns (dict): Имя параметра -> memoryview значений
+            name_offsets (memoryview): Смещения имен (count + 1 значений)
+            names (memoryview): Имена фигур в UTF-8 подряд
+        """
+        self.class_path = class_path
+        self.count = count
+        self.ids = ids
+        self.columns = columns
+        self._name_offsets = name_offsets
+        self._names = names
+    
+    def __len__(self):
+        """Количество фигур класса."""
+        return self.count
+    
+    def column(self, param):
+        """
+        Получить столбец параметра.
+        
+        Args:
+            param (str): Имя параметра из PARAMS класса
+        
+        Returns:
+            memoryview: Значения параметра (только для чтения)
+        
+        Raises:
+            KeyError: Если у класса нет такого параметра
+        """
+        return self.columns[param]
+    
+    def name(self, index):
+        """
+        Получить имя фигуры по ее номеру в классе.
+        
+        Args:
+            index (int): Номер фигуры (0 <= index < count)
+        
+        Returns:
+            str: Имя фигуры
+        """
+        return str(self._names[self._name_offsets[index]:self._name_offsets[index + 1]], 'utf-8')
+    
+    def shapes(self, start=0, stop=None):
+        """
+        Построить объекты фигур из столбцов.
+        
+        Args:
+            start (int, optional): Номер первой фигуры
+            stop (int, optional): Номер после последней фигуры (по умолчанию - до конца)
+        
+        Yields:
+            tuple: Пары (ID, фигура)
+        """
+        cls = _resolve_class(self.class_path)
+        stop = self.count if stop is None else min(stop, self.count)
+        params = [self.columns[param] for param in cls.PARAMS]
+        for index in range(start, stop):
+            shape = cls(*[column[index] for column in params], name=self.name(index))
+            shape.id = self.ids[index]
+            yield shape.id, shape
+    
+    def _release(self):
+        """Освободить memoryview столбцов."""
+        for view in (self.ids, *self.columns.values(), self._name_offsets, self._names):
+            view.release()
+
+
+class SharedScene:
+    """Снимок сцены в блоке разделяемой памяти."""
+    
+    def __init__(self, shm, owner):
+        """
+        Разобрать оглавление блока.
+        
+        Args:
+            shm (SharedMemory): Блок разделяемой памяти
+            owner (bool): Блок создан этим процессом (удаляется методом unlink)
+        
+        Raises:
+            SharedSceneError: Если блок не содержит сцену
+        """
+        self._shm = shm
+        self.owner = owner
+        self.types = {}  # Путь класса -> SharedShapes
+        buffer = shm.buf.toreadonly()
+        try:
+            magic, version, directory_size = HEADER.unpack_from(buffer)
+            if magic != MAGIC:
+                raise SharedSceneError(f"Блок '{shm.name}' не содержит сцену")
+            if version != VERSION:
+                raise SharedSceneError(f"Неподдерживаемая версия сцены в разделяемой памяти: {version}")
+            directory = json.loads(bytes(buffer[HEADER.size:HEADER.size + directory_size]))
+            
+            def view(offset, size, typecode):
+                return buffer[offset:offset + size].cast(typecode)
+            
+            for entry in directory['types']:
+                count = entry['count']
+                columns = {param: view(offset, count * 8, typecode)
+                           for param, (typecode, offset) in entry['columns'].items()}
+                ids = columns.pop('.ids')
+                name_offsets = view(entry['name_offsets'], (count + 1) * 8, 'q')
+                names = view(entry['names'], name_offsets[count], 'B')
+                self.types[entry['class']] = SharedShapes(entry['class'], count, ids, columns, name_offsets, names)
+            self.next_id = directory['next_id']
+            self._pickled = directory['pickled']
+            self.count = sum(len(shapes) for shapes in self.types.values()) + directory['pickled_count']
+        finally:
+            buffer.release()
+    
+    @property
+    def name(self):
+        """Имя блока разделяемой памяти."""
+        return self._shm.name
+    
+    @property
+    def size(self):
+        """Размер блока в байтах."""
+        return self._shm.size
+    
+    def pickled_shapes(self):
+        """
+        Загрузить фигуры, не разложенные на столбцы (группы, многоугольники, ломаные).
+        
+        Returns:
+            list: Пары (ID, фигура); эти фигуры распаковываются из pickle-данных
+        """
+        offset, size = self._pickled
+        if not size:
+            return []
+        return pickle.loads(self._shm.buf[offset:offset + size])
+    
+    def iter_shapes(self):
+        """
+        Построить все фигуры сцены.
+        
+        Yields:
+            tuple: Пары (ID, фигура) в порядке классов
+        """
+        for shapes in self.types.values():
+            yield from shapes.shapes()
+        yield from self.pickled_shapes()
+    
+    def close(self):
+        """Отключиться от блока (столбцы после этого недоступны)."""
+        if self._shm is None:
+            return
+        for shapes in self.types.values():
+            shapes._release()
+        self.types = {}
+        self._shm.close()
+        if not self.owner:
+            self._shm = None
+    
+    def unlink(self):
+        """Отключиться от блока и удалить его (только для опубликовавшего процесса)."""
+        if not self.owner:
+            raise SharedSceneError("Удалить блок может только процесс, опубликовавший сцену")
+        if self._shm is None:
+            return
+        self.close()
+        self._shm.unlink()
+        self._shm = None
+    
+    def __enter__(self):
+        """Использовать сцену в блоке with."""
+        return self
+    
+    def __exit__(self, *exc_info):
+        """Удалить опубликованную сцену или отключиться от подключенной."""
+        if self.owner:
+            self.unlink()
+        else:
+            self.close()
+
+
+def publish_scene(shapes, next_id, name=None):
+    """
+    Записать снимок сцены в новый блок разделяемой памяти.
+    
+    Args:
+        shapes (dict): Словарь фигур (id -> фигура)
+        next_id (int): Следующий свободный ID
+        name (str, optional): Имя блока (по умолчанию выбирается системой)
+    
+    Returns:
+        SharedScene: Опубликованная сцена; блок нужно удалить методом unlink
+    
+    Raises:
+        FileExistsError: Если блок с таким именем уже существует
+    """
+    groups = {}
+    pickled = []
+    for shape_id in sorted(shapes):
+        shape = shapes[shape_id]
+        if type(shape).PARAMS is None or type(shape).VERTICES:
+            pickled.append((shape_id, shape))
+        else:
+            groups.setdefault(type(shape), []).append((shape_id, shape))
+    
+    # Первый проход: столбцы и их смещения относительно начала данных
+    entries = []
+    parts = []
+    position = 0
+    for cls, items in groups.items():
+        columns = {}
+        entry = {'class': _class_path(cls), 'count': len(items), 'columns': columns}
+        for column_name, data in _encode_columns(cls, items):
+            position = _align(position)
+            if column_name == '.names':
+                entry['names'] = position
+            elif column_name == '.name_offsets':
+                entry['name_offsets'] = position
+            else:
+                columns[column_name] = [data.typecode, position]
+            parts.append((position, data))
+            position += len(data) * getattr(data, 'itemsize', 1)
+        entries.append(entry)
+    pickled_data = pickle.dumps(pickled, protocol=pickle.HIGHEST_PROTOCOL) if pickled else b''
+    position = _align(position)
+    parts.append((position, pickled_data))
+    pickled_offset = position
+    position += len(pickled_data)
+    
+    # Оглавление содержит абсолютные смещения, поэтому его длина подбирается
+    # вместе с началом данных
+    base = 0
+    while True:
+        directory = json.dumps({
+            'next_id': next_id,
+            'types': [dict(entry, columns={param: [typecode, base + offset]
+                                           for param, (typecode, offset) in entry['columns'].items()},
+                           names=base + entry['names'], name_offsets=base + entry['name_offsets'])
+                      for entry in entries],
+            'pickled': [base + pickled_offset, len(pickled_data)],
+            'pickled_count': len(pickled)
+        }, ensure_ascii=False).encode('utf-8')
+        needed = _align(HEADER.size + len(directory))
+        if needed <= base:
+            break
+        base = needed
+    
+    shm = shared_memory.SharedMemory(name=name, create=True, size=max(base + position, 1))
+    try:
+        buffer = shm.buf
+        HEADER.pack_into(buffer, 0, MAGIC, VERSION, len(directory))
+        buffer[HEADER.size:HEADER.size + len(directory)] = directory
+        for offset, data in parts:
+            data = memoryview(data).cast('B')
+            buffer[base + offset:base + offset + len(data)] = data
+        return SharedScene(shm, owner=True)
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+
+
+def attach_scene(name):
+    """
+    Подключиться к сцене, опубликованной другим процессом.
+    
+    Args:
+        name (str): Имя блока разделяемой памяти
+    
+    Returns:
+        SharedScene: Сцена со столбцами только для чтения; после работы вызвать close
+    
+    Raises:
+        FileNotFoundError: Если блока с таким именем нет
+        SharedSceneError: Если блок не содержит сцену
+    """
+    shm = _open_untracked(name)
+    try:
+        return SharedScene(shm, owner=False)
+    except BaseException:
+        shm.close()
+        raise
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Пространственный индекс для векторного редактора.
+Содержит класс SpatialTree: октодерево (3D) или квадродерево (2D)
+над ограничивающими прямоугольниками (параллелепипедами) фигур.
+"""
+
+import math
+import sys
+from itertools import product
+
+
+class _Node:
+    """Узел пространственного дерева."""
+    
+    __slots__ = ('center', 'half', 'items', 'children')
+    
+    def __init__(self, center, half):
+        """
+        Инициализация узла.
+        
+        Args:
+            center (tuple): Координаты центра узла
+            half (float): Половина длины ребра узла
+        """
+        self.center = center
+        self.half = half
+        self.items = {}  # id -> ограничивающий прямоугольник
+        self.children = None
+
+
+class SpatialTree:
+    """
+    Дерево для поиска фигур по области.
+    
+    Ограничивающий прямоугольник задается кортежем
+    (min_x, min_y[, min_z], max_x, max_y[, max_z]).
+    Элемент хранится в самом глубоком узле, целиком его содержащем,
+    поэтому запрос обходит только узлы, пересекающие область поиска.
+    """
+    
+    # Наибольшее количество точек, которые query_points ищет по отдельности
+    POINT_QUERY_LIMIT = 64
+    
+    def __init__(self, dimensions=3, capacity=8, max_depth=20):
+        """
+        Инициализация дерева.
+        
+        Args:
+            dimensions (int): Размерность пространства (2 или 3)
+            capacity (int): Количество элементов в листе, после которого он делится
+            max_depth (int): Максимальная глубина деления
+        """
+        if dimensions not in (2, 3):
+            raise ValueError("Размерность дерева должна быть 2 или 3")
+        self.dimensions = dimensions
+        self.capacity = capacity
+        self.max_depth = max_depth
+        self._root = None
+        self._nodes = {}  # id -> узел, в котором хранится элемент
+        self._unbounded = {}  # элементы с бесконечными координатами
+    
+    def __len__(self):
+        return len(self._nodes) + len(self._unbounded)
+    
+    def __contains__(self, item_id):
+        return item_id in self._nodes or item_id in self._unbounded
+    
+    def clear(self):
+        """Удалить все элементы из дерева."""
+        self._root = None
+        self._nodes.clear()
+        self._unbounded.clear()
+    
+    def rebuild(self, items):
+        """
+        Перестроить дерево заново.
+        
+        Args:
+            items (iterable): Пары (id, ограничивающий прямоугольник)
+        """
+        self.clear()
+        for item_id, box in items:
+            self.insert(item_id, box)
+    
+    def insert(self, item_id, box):
+        """
+        Добавить элемент в дерево.
+        
+        Args:
+            item_id: Идентификатор элемента
+            box (tuple): Ограничивающий прямоугольник элемента
+        """
+        if item_id in self:
+            self.remove(item_id)
+        
+        if not all(math.isfinite(value) for value in box):
+            self._unbounded[item_id] = box
+            return
+        
+        self._ensure_covers(box)
+        node = self._root
+        depth = 0
+        while True:
+            if node.children is None:
+                node.items[item_id] = box
+                self._nodes[item_id] = node
+                if len(node.items) > self.capacity and depth < self.max_depth:
+                    self._split(node)
+                return
+            index = self._child_index(node, box)
+            if index is None:
+                node.items[item_id] = box
+                self._nodes[item_id] = node
+                return
+            node = node.children[index]
+            depth += 1
+    
+    def remove(self, item_id):
+        """
+        Удалить элемент из дерева.
+        
+        Args:
+            item_id: Идентификатор элемента
+        
+        Returns:
+            bool: True, если элемент был найден и удален
+        """
+        if self._unbounded.pop(item_id, None) is not None:
+            return True
+        node = self._nodes.pop(item_id, None)
+        if node is None:
+            return False
+        del node.items[item_id]
+        return True
+    
+    def update(self, item_id, box):
+        """
+        Обновить ограничивающий прямоугольник элемента.
+        
+        Args:
+            item_id: Идентификатор элемента
+            box (tuple): Новый ограничивающий прямоугольник
+        """
+        self.insert(item_id, box)
+    
+    def query(self, box):
+        """
+        Найти элементы, пересекающие область.
+        
+        Args:
+            box (tuple): Область поиска
+        
+        Returns:
+            list: Идентификаторы найденных элементов
+        """
+        return [item_id for item_id, _ in self._query_items(box)]
+    
+    def _query_items(self, box):
+        """
+        Найти элементы, пересекающие область, вместе с их прямоугольниками.
+        
+        Args:
+            box (tuple): Область поиска
+        
+        Returns:
+            list: Пары (идентификатор, ограничивающий прямоугольник)
+        """
+        dims = self.dimensions
+        low = box[:dims]
+        high = box[dims:]
+        result = [(item_id, item_box) for item_id, item_box in self._unbounded.items()
+                  if self._intersects(item_box, low, high)]
+        
+        if self._root is None:
+            return result
+        
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            center = node.center
+            half = node.half
+            if any(center[i] + half < low[i] or center[i] - half > high[i] for i in range(dims)):
+                continue
+            for item_id, item_box in node.items.items():
+                if self._intersects(item_box, low, high):
+                    result.append((item_id, item_box))
+            if node.children is not None:
+                stack.extend(node.children)
+        return result
+    
+    def entry_size(self, item_id):
+        """
+        Оценить память, занимаемую записью элемента (без узлов дерева).
+        
+        Args:
+            item_id: Идентификатор элемента
+        
+        Returns:
+            int: Размер ограничивающего прямоугольника и доля таблицы
+                элемент -> узел в байтах (0, если элемента нет)
+        """
+        node = self._nodes.get(item_id)
+        box = node.items[item_id] if node is not None else self._unbounded.get(item_id)
+        if box is None:
+            return 0
+        size = sys.getsizeof(box) + sum(map(sys.getsizeof, box))
+        if node is not None:
+            size += sys.getsizeof(self._nodes) // len(self._nodes)
+        return size
+    
+    def nodes_size(self):
+        """
+        Оценить память узлов дерева (без прямоугольников элементов).
+        
+        Returns:
+            tuple: (количество узлов, размер в байтах)
+        """
+        count = 0
+        size = 0
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            count += 1
+            size += sys.getsizeof(node) + sys.getsizeof(node.center) + sys.getsizeof(node.items)
+            if node.children is not None:
+                size += sys.getsizeof(node.children)
+                stack.extend(node.children)
+        return count, size
+    
+    def query_points(self, columns, tolerance=0.0):
+        """
+        Найти для набора точек элементы, прямоугольники которых их содержат.
+        
+        Кандидаты - элементы, пересекающие общую область точек. Небольшой набор
+        точек обрабатывается запросами по каждой точке, а большой раскладывается
+        по равномерной сетке с ячейкой порядка среднего размера кандидатов:
+        каждый элемент проверяет только точки ячеек, которые он покрывает
+        (точки ячеек, целиком лежащих внутри прямоугольника, - без проверки).
+        
+        Args:
+            columns (tuple): Списки координат точек по осям (xs, ys[, zs])
+            tolerance (float, optional): Расширение прямоугольников элементов
+        
+        Yields:
+            tuple: Пары (идентификатор элемента, список номеров точек
+                в его прямоугольнике); элементы без точек пропускаются
+        """
+        dims = self.dimensions
+        count = len(columns[0])
+        if not count:
+            return
+        if count <= self.POINT_QUERY_LIMIT:
+            found = {}
+            for index, point in enumerate(zip(*columns)):
+                box = tuple(value - tolerance for value in point) + tuple(value + tolerance for value in point)
+                for item_id, _ in self._query_items(box):
+                    found.setdefault(item_id, []).append(index)
+            yield from found.items()
+            return
+        
+        low = [min(column) for column in columns]
+        high = [max(column) for column in columns]
+        items = self._query_items(tuple(value - tolerance for value in low) +
+                                  tuple(value + tolerance for value in high))
+        if not items:
+            return
+        
+        # Ячейка - медианный размер кандидатов, но ячеек не больше, чем точек
+        extents = sorted(max(box[dims + axis] - box[axis] for axis in range(dims)) for _, box in items)
+        spans = [high[axis] - low[axis] for axis in range(dims)]
+        cell = max(extents[len(extents) // 2] + 2 * tolerance,
+                   math.prod(max(span, 1e-12) for span in spans) ** (1 / dims) / count ** (1 / dims),
+                   1e-12)
+        inverse = 1 / cell
+        sizes = [int(span * inverse) + 1 for span in spans]
+        strides = [math.prod(sizes[:axis]) for axis in range(dims)]
+        
+        keys = [0] * count
+        for axis in range(dims):
+            base = low[axis]
+            stride = strides[axis]
+            keys = [key + int((value - base) * inverse) * stride for key, value in zip(keys, columns[axis])]
+        cells = {}
+        for index, key in enumerate(keys):
+            cells.setdefault(key, []).append(index)
+        
+        for item_id, box in items:
+            ranges = []
+            for axis in range(dims):
+                start = box[axis] - tolerance
+                end = box[dims + axis] + tolerance
+                first = max(int((start - low[axis]) * inverse), 0)
+                last = min(int((end - low[axis]) * inverse), sizes[axis] - 1)
+                # Ячейка оси целиком внутри прямоугольника - проверка по оси не нужна
+                ranges.append([(k * strides[axis],
+                                start <= low[axis] + k * cell and low[axis] + (k + 1) * cell <= end)
+                               for k in range(first, last + 1)])
+            inner = []
+            border = []
+            for combination in product(*ranges):
+                indices = cells.get(sum(offset for offset, _ in combination))
+                if indices is not None:
+                    (inner if all(flag for _, flag in combination) else border).extend(indices)
+            if border and dims == 2:
+                xs, ys = columns
+                x1, y1, x2, y2 = box
+                x1, y1, x2, y2 = x1 - tolerance, y1 - tolerance, x2 + tolerance, y2 + tolerance
+                border = [index for index in border if x1 <= xs[index] <= x2 and y1 <= ys[index] <= y2]
+            elif border:
+                for axis in range(dims):
+                    column = columns[axis]
+                    start = box[axis] - tolerance
+                    end = box[dims + axis] + tolerance
+                    border = [index for index in border if start <= column[index] <= end]
+            if inner or border:
+                yield item_id, inner + border
+    
+    def _intersects(self, box, low, high):
+        """Проверить пересечение прямоугольника с областью [low, high]."""
+        dims = self.dimensions
+        for i in range(dims):
+            if box[i] > high[i] or box[dims + i] < low[i]:
+                return False
+        return True
+    
+    def _contains(self, node, box):
+        """Проверить, что узел целиком содержит прямоугольник."""
+        dims = self.dimensions
+        for i in range(dims):
+            if box[i] < node.center[i] - node.half or box[dims + i] > node.center[i] + node.half:
+                return False
+        return True
+    
+    def _ensure_covers(self, box):
+        """Расширить корень дерева так, чтобы он содержал прямоугольник."""
+        dims = self.dimensions
+        if self._root is None:
+            center = tuple((box[i] + box[dims + i]) / 2 for i in range(dims))
+            half = max(max(box[dims + i] - box[i] for i in range(dims)) / 2, 1.0)
+            self._root = _Node(center, half)
+            return
+        
+        while not self._contains(self._root, box):
+            old_root = self._root
+            half = old_root.half
+            # Новый корень вдвое больше и смещен в сторону прямоугольника
+            center = tuple(
+                old_root.center[i] - half if box[i] < old_root.center[i] - half
+                else old_root.center[i] + half
+                for i in range(dims)
+            )
+            new_root = _Node(center, half * 2)
+            self._create_children(new_root)
+            index = 0
+            for i in range(dims):
+                if old_root.center[i] > center[i]:
+                    index |= 1 << i
+            new_root.children[index] = old_root
+            self._root = new_root
+    
+    def _create_children(self, node):
+        """Создать дочерние узлы."""
+        half = node.half / 2
+        children = []
+        for index in range(1 << self.dimensions):
+            center = tuple(
+                node.center[i] + (half if index & (1 << i) else -half)
+                for i in range(self.dimensions)
+            )
+            children.append(_Node(center, half))
+        node.children = children
+    
+    def _child_index(self, node, box):
+        """
+        Найти дочерний узел, целиком содержащий прямоугольник.
+        
+        Returns:
+            int: Индекс дочернего узла или None, если прямоугольник пересекает центр узла
+        """
+        dims = self.dimensions
+        index = 0
+        for i in range(dims):
+            if box[dims + i] <= node.center[i]:
+                continue
+            if box[i] >= node.center[i]:
+                index |= 1 << i
+            else:
+                return None
+        return index
+    
+    def _split(self, node):
+        """Разделить лист на дочерние узлы и перераспределить элементы."""
+        self._create_children(node)
+        items = node.items
+        node.items = {}
+        for item_id, box in items.items():
+            index = self._child_index(node, box)
+            target = node if index is None else node.children[index]
+            target.items[item_id] = box
+            self._nodes[item_id] = target
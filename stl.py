@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Потоковый экспорт 3D фигур в двоичный STL (команда export stl).
+
+Двоичный STL состоит из 80-байтного заголовка, количества треугольников
+(uint32) и записей треугольников по 50 байт: нормаль и три вершины
+(12 float32) и двухбайтовый атрибут. Количество треугольников вычисляется
+заранее отдельным проходом по фигурам, поэтому файл пишется за один проход
+без перемотки, а в памяти находится только текущий пакет треугольников.
+
+Треугольники параллелепипеда и тетраэдра строятся по шаблону типа:
+вершины шаблона заданы в единицах размеров фигуры, а нормали граней
+вычисляются один раз для типа. Вершина треугольника фигуры - это
+начало фигуры плюс вершина шаблона, умноженная на размеры. Группы
+экспортируются по нераздельным фигурам, фигуры остальных типов -
+по треугольникам их сеток (Shape.get_mesh).
+"""
+
+import math
+import struct
+from functools import lru_cache
+
+from shapes_3d import PARALLELEPIPED_CORNERS, PARALLELEPIPED_FACES, TETRAHEDRON_CORNERS, TETRAHEDRON_FACES
+
+HEADER = b'Binary STL exported by vector editor'.ljust(80, b'\0')
+BATCH_TRIANGLES = 4096  # треугольников в одной операции записи
+
+
+def _normal(a, b, c):
+    """Единичная нормаль треугольника (вершины против часовой стрелки)."""
+    ux, uy, uz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    vx, vy, vz = c[0] - a[0], c[1] - a[1], c[2] - a[2]
+    nx, ny, nz = uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx
+    length = math.sqrt(nx * nx + ny * ny + nz * nz)
+    if length == 0:
+        return 0.0, 0.0, 0.0
+    return nx / length, ny / length, nz / length
+
+
+def _solid_template(corners, faces):
+    """
+    Построить шаблон треугольников многогранника.
+    
+    Args:
+        corners (tuple): Вершины в единицах размеров фигуры
+        faces (tuple): Грани - индексы вершин против часовой стрелки снаружи
+    
+    Returns:
+        tuple: Треугольники (нормаль, вершина, вершина, вершина)
+    """
+    triangles = []
+    for face in faces:
+        for index in range(1, len(face) - 1):
+            a, b, c = corners[face[0]], corners[face[index]], corners[face[index + 1]]
+            triangles.append((_normal(a, b, c), a, b, c))
+    return tuple(triangles)
+
+
+def _parallelepiped_frame(shape):
+    """Начало и размеры параллелепипеда для шаблона."""
+    return shape.x, shape.y, shape.z, shape.width, shape.height, shape.depth
+
+
+def _tetrahedron_frame(shape):
+    """Центр и половина ребра описанного куба тетраэдра для шаблона."""
+    s = shape.edge_length / (2 * math.sqrt(2))
+    return shape.x, shape.y, shape.z, s, s, s
+
+
+# Шаблоны треугольников по именам классов фигур (ищутся по MRO класса):
+# (треугольники шаблона, функция фигура -> (x, y, z, sx, sy, sz))
+TEMPLATES = {
+    'Parallelepiped': (_solid_template(PARALLELEPIPED_CORNERS, PARALLELEPIPED_FACES), _parallelepiped_frame),
+    'Tetrahedron': (_solid_template(TETRAHEDRON_CORNERS, TETRAHEDRON_FACES), _tetrahedron_frame)
+}
+
+_templates = {}  # класс -> шаблон или None
+
+
+def template_for(cls):
+    """
+    Получить шаблон треугольников для класса фигур.
+    
+    Args:
+        cls (type): Класс 3D фигур
+    
+    Returns:
+        tuple: (треугольники шаблона, функция размеров) или None, если шаблона нет
+    """
+    if cls not in _templates:
+        _templates[cls] = next((TEMPLATES[base.__name__] for base in cls.__mro__ if base.__name__ in TEMPLATES), None)
+    return _templates[cls]
+
+
+def _leaves(shape):
+    """Нераздельные фигуры (сама фигура или фигуры группы)."""
+    return shape.iter_leaves() if getattr(shape, 'COMPOSITE', False) else (shape,)
+
+
+def triangle_count(shapes):
+    """
+    Подсчитать треугольники фигур.
+    
+    Args:
+        shapes (list): 3D фигуры
+    
+    Returns:
+        int: Количество треугольников
+    """
+    count = 0
+    for shape in shapes:
+        for leaf in _leaves(shape):
+            template = template_for(type(leaf))
+            count += len(template[0]) if template is not None else leaf.get_mesh().triangle_count
+    return count
+
+
+def _leaf_values(leaf, values):
+    """Добавить значения записей треугольников фигуры и вернуть количество треугольников."""
+    template = template_for(type(leaf))
+    if template is None:
+        triangles = 0
+        for a, b, c in leaf.get_mesh().iter_triangles():
+            values.extend(_normal(a, b, c))
+            values.extend(a)
+            values.extend(b)
+            values.extend(c)
+            values.append(0)
+            triangles += 1
+        return triangles
+    
+    triangles, frame = template
+    x, y, z, sx, sy, sz = frame(leaf)
+    for (nx, ny, nz), (ax, ay, az), (bx, by, bz), (cx, cy, cz) in triangles:
+        values.extend((nx, ny, nz,
+                       x + ax * sx, y + ay * sy, z + az * sz,
+                       x + bx * sx, y + by * sy, z + bz * sz,
+                       x + cx * sx, y + cy * sy, z + cz * sz,
+                       0))
+    return len(triangles)
+
+
+@lru_cache(maxsize=16)
+def _batch_struct(count):
+    """Формат пакета из count записей треугольников."""
+    return struct.Struct('<' + '12fH' * count)
+
+
+def write_stl(file, shapes, batch=BATCH_TRIANGLES):
+    """
+    Записать фигуры в двоичный STL.
+    
+    Args:
+        file: Файл, открытый для записи в двоичном режиме
+        shapes (list): 3D фигуры (список проходится дважды)
+        batch (int, optional): Количество треугольников в одной операции записи
+    
+    Returns:
+        int: Количество записанных треугольников
+    """
+    count = triangle_count(shapes)
+    file.write(HEADER)
+    file.write(struct.pack('<I', count))
+    
+    values = []
+    pending = 0
+    for shape in shapes:
+        for leaf in _leaves(shape):
+            pending += _leaf_values(leaf, values)
+            if pending >= batch:
+                file.write(_batch_struct(pending).pack(*values))
+                values.clear()
+                pending = 0
+    if pending:
+        file.write(_batch_struct(pending).pack(*values))
+    return count
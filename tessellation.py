@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Тесселяция фигур в непрерывные буферы вершин и индексов.
+
+Сетка (Mesh) хранит координаты вершин подряд в array('d') (x, y или x, y, z)
+и индексы треугольников в array('I'). Вершины 2D фигур перечисляются
+по контуру против часовой стрелки, а в parts хранятся номера первых вершин
+контуров (у группы их несколько). Сетки строятся методом Shape.get_mesh
+и кэшируются в фигуре для каждого уровня детализации, поэтому отрисовка,
+экспорт и проверка попадания используют одни и те же буферы.
+
+Уровень детализации (LOD) влияет только на криволинейные фигуры:
+окружность и овал на уровне lod аппроксимируются 8 * 2**lod отрезками.
+"""
+
+import heapq
+import math
+from array import array
+from operator import mul
+
+DEFAULT_LOD = 2
+MAX_LOD = 8
+
+
+class Mesh:
+    """Буферы вершин и индексов фигуры."""
+    
+    __slots__ = ('dimension', 'vertices', 'triangles', 'parts', 'closed')
+    
+    def __init__(self, dimension, vertices, triangles=None, parts=None, closed=True):
+        """
+        Инициализация сетки.
+        
+        Args:
+            dimension (int): Размерность вершин (2 или 3)
+            vertices (array): Координаты вершин подряд, array('d')
+            triangles (array, optional): Индексы вершин треугольников, array('I')
+            parts (array, optional): Номера первых вершин контуров, array('I')
+            closed (bool, optional): Замкнуты ли контуры (False для точки и отрезка)
+        """
+        self.dimension = dimension
+        self.vertices = vertices
+        self.triangles = triangles if triangles is not None else array('I')
+        self.parts = parts if parts is not None else array('I', [0])
+        self.closed = closed
+    
+    @property
+    def vertex_count(self):
+        """Количество вершин."""
+        return len(self.vertices) // self.dimension
+    
+    @property
+    def triangle_count(self):
+        """Количество треугольников."""
+        return len(self.triangles) // 3
+    
+    def points(self):
+        """
+        Получить вершины в виде кортежей координат.
+        
+        Returns:
+            list: Кортежи (x, y) или (x, y, z)
+        """
+        vertices = self.vertices
+        if self.dimension == 2:
+            return list(zip(vertices[0::2], vertices[1::2]))
+        return list(zip(vertices[0::3], vertices[1::3], vertices[2::3]))
+    
+    def contours(self):
+        """
+        Получить контуры 2D сетки.
+        
+        Returns:
+            list: Списки вершин (x, y) каждого контура
+        """
+        points = self.points()
+        bounds = list(self.parts) + [len(points)]
+        return [points[start:end] for start, end in zip(bounds, bounds[1:])]
+    
+    def iter_triangles(self):
+        """
+        Перебрать треугольники сетки.
+        
+        Yields:
+            tuple: Три вершины треугольника
+        """
+        points = self.points()
+        triangles = self.triangles
+        for index in range(0, len(triangles), 3):
+            yield points[triangles[index]], points[triangles[index + 1]], points[triangles[index + 2]]
+
+
+def segments_for(lod):
+    """
+    Получить количество отрезков аппроксимации кривой для уровня детализации.
+    
+    Args:
+        lod (int): Уровень детализации от 0 до MAX_LOD
+    
+    Returns:
+        int: Количество отрезков
+    
+    Raises:
+        ValueError: Если уровень вне допустимого диапазона
+    """
+    if not 0 <= lod <= MAX_LOD:
+        raise ValueError(f"Уровень детализации должен быть от 0 до {MAX_LOD}")
+    return 8 << lod
+
+
+def fan_triangles(count):
+    """
+    Получить индексы треугольников веера для выпуклого контура.
+    
+    Args:
+        count (int): Количество вершин контура
+    
+    Returns:
+        array: Индексы (0, i, i + 1) для i от 1 до count - 2
+    """
+    triangles = array('I')
+    for index in range(1, count - 1):
+        triangles.extend((0, index, index + 1))
+    return triangles
+
+
+def polygon_mesh(xs, ys):
+    """
+    Построить сетку выпуклого многоугольника.
+    
+    Args:
+        xs (list): X-координаты вершин против часовой стрелки
+        ys (list): Y-координаты вершин
+    
+    Returns:
+        Mesh: Сетка многоугольника
+    """
+    vertices = array('d', [0.0]) * (2 * len(xs))
+    vertices[0::2] = array('d', xs)
+    vertices[1::2] = array('d', ys)
+    return Mesh(2, vertices, fan_triangles(len(xs)))
+
+
+def signed_area(vertices):
+    """
+    Получить ориентированную площадь контура (формула шнурования).
+    
+    Args:
+        vertices (array): Координаты вершин x, y подряд
+    
+    Returns:
+        float: Площадь, положительная при обходе против часовой стрелки
+    """
+    xs = vertices[0::2]
+    ys = vertices[1::2]
+    if len(xs) < 3:
+        return 0.0
+    # Координаты отсчитываются от первой вершины, чтобы не терять точность на больших значениях
+    x0, y0 = xs[0], ys[0]
+    xs = [x - x0 for x in xs]
+    ys = [y - y0 for y in ys]
+    return math.fsum(map(mul, xs, ys[1:] + ys[:1])) / 2 - math.fsum(map(mul, ys, xs[1:] + xs[:1])) / 2
+
+
+def ear_triangles(vertices):
+    """
+    Разбить простой многоугольник на треугольники отсечением ушей.
+    
+    Вершина - ухо, если угол при ней выпуклый и в треугольник с соседями
+    не попадает ни одна вогнутая вершина. Вогнутые вершины раскладываются
+    по ячейкам сетки с пирамидой счетчиков (как в квадродереве), поэтому
+    проверка уха просматривает только непустые ячейки, пересекающие
+    треугольник. Выпуклый многоугольник разбивается веером без проверок.
+    
+    Args:
+        vertices (array): Координаты вершин x, y подряд против часовой стрелки
+    
+    Returns:
+        array: Индексы вершин треугольников, array('I')
+    """
+    xs = vertices[0::2]
+    ys = vertices[1::2]
+    count = len(xs)
+    if count < 3:
+        return array('I')
+    
+    def cross(a, b, c):
+        return (xs[b] - xs[a]) * (ys[c] - ys[a]) - (ys[b] - ys[a]) * (xs[c] - xs[a])
+    
+    prev = [count - 1] + list(range(count - 1))
+    next_ = list(range(1, count)) + [0]
+    reflex = [i for i in range(count) if cross(prev[i], i, next_[i]) <= 0]
+    if not reflex:
+        return fan_triangles(count)
+    if len(reflex) == count and not any(cross(prev[i], i, next_[i]) for i in range(count)):
+        return array('I')  # все вершины на одной прямой: площадь нулевая
+    
+    # Вогнутые вершины раскладываются по ячейкам сетки 2**depth x 2**depth,
+    # над которой строится пирамида счетчиков: ячейка уровня level объединяет
+    # 2**level x 2**level ячеек сетки. Проверка уха спускается от корня только
+    # в непустые ячейки, пересекающие треугольник, поэтому длинные узкие
+    # треугольники не перебирают пустые ячейки вдоль своих сторон
+    min_x, min_y = min(xs), min(ys)
+    depth = max(1, (count.bit_length() + 1) // 2 + 2)
+    extent = max(max(xs) - min_x, max(ys) - min_y) or 1.0
+    scale = (1 << depth) / extent
+    last = (1 << depth) - 1
+    sizes = [(1 << level) / scale for level in range(depth + 1)]
+    cells = {}  # ячейка сетки -> множество вогнутых вершин
+    counts = [None] + [{} for _ in range(depth)]  # уровень -> ячейка -> количество вершин
+    
+    def cell(i):
+        return min(int((xs[i] - min_x) * scale), last), min(int((ys[i] - min_y) * scale), last)
+    
+    def add_reflex(i):
+        reflex.add(i)
+        col, row = cell(i)
+        cells.setdefault((col, row), set()).add(i)
+        for level in range(1, depth + 1):
+            key = (col >> level, row >> level)
+            counts[level][key] = counts[level].get(key, 0) + 1
+    
+    def remove_reflex(i):
+        reflex.discard(i)
+        col, row = cell(i)
+        cells[col, row].discard(i)
+        for level in range(1, depth + 1):
+            counts[level][col >> level, row >> level] -= 1
+    
+    initial = reflex
+    reflex = set()
+    for i in initial:
+        add_reflex(i)
+    
+    def is_ear(a, b, c):
+        if cross(a, b, c) <= 0:
+            return False
+        ax, ay, bx, by, cx, cy = xs[a], ys[a], xs[b], ys[b], xs[c], ys[c]
+        # Точка внутри или на границе треугольника, если она не правее ни одной стороны
+        ux, uy, vx, vy, wx, wy = bx - ax, by - ay, cx - bx, cy - by, ax - cx, ay - cy
+        ku, kv, kw = ux * ay - uy * ax, vx * by - vy * bx, wx * cy - wy * cx
+        if len(reflex) <= 16:
+            candidates = reflex
+        else:
+            low_x, low_y = min(ax, bx, cx), min(ay, by, cy)
+            high_x, high_y = max(ax, bx, cx), max(ay, by, cy)
+            # Прибавка к стороне ячейки для угла ячейки, ближайшего к внутренней
+            # стороне каждого ребра треугольника
+            du = max(ux, 0.0) + max(-uy, 0.0)
+            dv = max(vx, 0.0) + max(-vy, 0.0)
+            dw = max(wx, 0.0) + max(-wy, 0.0)
+            candidates = []
+            stack = [(depth, 0, 0)]
+            while stack:
+                level, col, row = stack.pop()
+                size = sizes[level]
+                x1, y1 = min_x + col * size, min_y + row * size
+                # Ячейка отбрасывается, если она вне прямоугольника треугольника
+                # или целиком правее одной из его сторон
+                if (x1 > high_x or x1 + size < low_x or y1 > high_y or y1 + size < low_y
+                        or ux * y1 - uy * x1 + du * size < ku
+                        or vx * y1 - vy * x1 + dv * size < kv
+                        or wx * y1 - wy * x1 + dw * size < kw):
+                    continue
+                if level == 0:
+                    candidates.extend(cells[col, row])
+                    continue
+                level -= 1
+                level_counts = counts[level] if level else cells
+                col, row = col * 2, row * 2
+                for key in ((col, row), (col + 1, row), (col, row + 1), (col + 1, row + 1)):
+                    if level_counts.get(key):
+                        stack.append((level, *key))
+        for p in candidates:
+            px, py = xs[p], ys[p]
+            if ux * py - uy * px < ku or vx * py - vy * px < kv or wx * py - wy * px < kw:
+                continue
+            if p == a or p == c or (px == ax and py == ay) or (px == cx and py == cy):
+                continue
+            return False
+        return True
+    
+    def diagonal(i):
+        a, c = prev[i], next_[i]
+        return (xs[c] - xs[a]) ** 2 + (ys[c] - ys[a]) ** 2
+    
+    # Уши отсекаются в порядке возрастания длины новой стороны (диагонали):
+    # треугольники остаются небольшими и не сходятся веером к одной вершине
+    current = [diagonal(i) for i in range(count)]
+    heap = list(zip(current, range(count)))
+    heapq.heapify(heap)
+    alive = [True] * count
+    blocked = set()  # Вершины, не оказавшиеся ушами при последней проверке
+    triangles = array('I')
+    remaining = count
+    progress = True
+    force = False
+    vertex = 0
+    while remaining > 3:
+        if not heap:
+            # Отложенные вершины проверяются снова; если за целый проход не
+            # отсечено ни одного уха (контур с самопересечениями), ближайшая
+            # вершина отсекается без проверки
+            heap = [(current[i], i) for i in blocked if alive[i]]
+            heapq.heapify(heap)
+            blocked.clear()
+            force = not progress
+            progress = False
+        key, vertex = heapq.heappop(heap)
+        if not alive[vertex] or key != current[vertex]:
+            continue
+        a, c = prev[vertex], next_[vertex]
+        if cross(a, vertex, c) == 0:
+            # Вершина на одной прямой с соседями площади не добавляет и удаляется
+            # без треугольника (вдоль длинной прямой ушей может не быть вовсе)
+            pass
+        elif force or is_ear(a, vertex, c):
+            triangles.extend((a, vertex, c))
+        else:
+            blocked.add(vertex)
+            continue
+        next_[a] = c
+        prev[c] = a
+        alive[vertex] = False
+        remaining -= 1
+        progress = True
+        force = False
+        if vertex in reflex:
+            remove_reflex(vertex)
+        for i in (a, c):
+            if cross(prev[i], i, next_[i]) > 0:
+                if i in reflex:
+                    remove_reflex(i)
+            elif i not in reflex:
+                add_reflex(i)
+            current[i] = diagonal(i)
+            heapq.heappush(heap, (current[i], i))
+        vertex = c
+    # Последний треугольник не добавляется, если оставшиеся вершины на одной прямой
+    if cross(prev[vertex], vertex, next_[vertex]) != 0:
+        triangles.extend((prev[vertex], vertex, next_[vertex]))
+    return triangles
+
+
+def simple_polygon_mesh(vertices):
+    """
+    Построить сетку простого (в том числе невыпуклого) многоугольника.
+    
+    Args:
+        vertices (array): Координаты вершин x, y подряд в любом направлении обхода
+    
+    Returns:
+        Mesh: Сетка многоугольника с вершинами против часовой стрелки
+    """
+    if signed_area(vertices) < 0:
+        # Обратный порядок вершин: пары (x, y) переставляются целиком
+        reversed_vertices = array('d', vertices)
+        reversed_vertices[0::2] = vertices[-2::-2]
+        reversed_vertices[1::2] = vertices[::-2]
+        vertices = reversed_vertices
+    return Mesh(2, vertices, ear_triangles(vertices))
+
+
+def ellipse_mesh(center_x, center_y, radius_x, radius_y, segments, start_angle=0.0):
+    """
+    Построить сетку эллипса (или правильного многоугольника при равных радиусах).
+    
+    Args:
+        center_x (float): X-координата центра
+        center_y (float): Y-координата центра
+        radius_x (float): Радиус по оси X
+        radius_y (float): Радиус по оси Y
+        segments (int): Количество вершин
+        start_angle (float, optional): Угол первой вершины в радианах
+    
+    Returns:
+        Mesh: Сетка эллипса
+    """
+    step = 2 * math.pi / segments
+    angles = [start_angle + step * index for index in range(segments)]
+    return polygon_mesh([center_x + radius_x * math.cos(angle) for angle in angles],
+                        [center_y + radius_y * math.sin(angle) for angle in angles])
+
+
+def polyhedron_mesh(points, faces):
+    """
+    Построить сетку многогранника.
+    
+    Args:
+        points (list): Вершины (x, y, z)
+        faces (list): Грани - списки индексов вершин против часовой стрелки
+            при взгляде снаружи (разбиваются на треугольники веером)
+    
+    Returns:
+        Mesh: Сетка многогранника
+    """
+    vertices = array('d')
+    for point in points:
+        vertices.extend(point)
+    triangles = array('I')
+    for face in faces:
+        for index in range(1, len(face) - 1):
+            triangles.extend((face[0], face[index], face[index + 1]))
+    return Mesh(3, vertices, triangles)
+
+
+def merge_meshes(dimension, meshes):
+    """
+    Объединить сетки в одну (например, для группы фигур).
+    
+    Args:
+        dimension (int): Размерность вершин
+        meshes (list): Сетки
+    
+    Returns:
+        Mesh: Объединенная сетка
+    """
+    vertices = array('d')
+    triangles = array('I')
+    parts = array('I')
+    for mesh in meshes:
+        offset = len(vertices) // dimension
+        parts.extend(part + offset for part in mesh.parts)
+        triangles.extend(index + offset for index in mesh.triangles)
+        vertices.extend(mesh.vertices)
+    return Mesh(dimension, vertices, triangles, parts, all(mesh.closed for mesh in meshes))
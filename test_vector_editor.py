@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
+import json
 import os
+import struct
 import subprocess
 import time
+from array import array
 
 # Функция для запуска команды и получения вывода
 def run_command(command, inputs=None):
@@ -50,6 +53,34 @@ def run_command(command, inputs=None):
     print('\033[1;35m' + '-' * 60 + '\033[0m')
     return stdout, stderr
 
+# Функция для запуска последовательности команд в одном сеансе редактора
+def run_session(commands):
+    process = subprocess.Popen(
+        ['python3', 'main.py'],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    
+    time.sleep(0.5)
+    
+    for cmd in commands:
+        process.stdin.write(cmd + '\n')
+        process.stdin.flush()
+        time.sleep(0.3)
+    
+    stdout, stderr = process.communicate()
+    print('\033[1;36mРезультат:\033[0m')
+    print(stdout)
+    
+    if stderr:
+        print('\033[1;31mОшибки:\033[0m')
+        print(stderr)
+    
+    print('\033[1;35m' + '-' * 60 + '\033[0m')
+    return stdout, stderr
+
 # Тестирование справки
 def test_help():
     print('\033[1;32m=== Тестирование справки ===\033[0m')
@@ -193,6 +224,786 @@ def test_delete():
     
     print('\033[1;35m' + '-' * 60 + '\033[0m')
 
+# Тестирование поиска 3D фигур по области
+def test_query3d():
+    print('\033[1;32m=== Тестирование поиска 3D фигур ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create parallelepiped 0 0 0 3 4 5 QueryBox',
+        'create tetrahedron 100 100 100 1 FarTetrahedron',
+        'query3d -1 -1 -1 2 2 2',
+        'exit'
+    ])
+    found = stdout.split('Найдено 3D фигур')[-1]
+    assert 'QueryBox (1)' in found
+    assert 'FarTetrahedron' not in found
+
+# Тестирование преобразований выборки фигур
+def test_transforms():
+    print('\033[1;32m=== Тестирование преобразований фигур ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create square 0 0 2 MoveSquare',
+        'create circle 5 5 1 ScaleCircle',
+        'move 1-2 10 10',
+        'scale type=circle 2',
+        'rotate 1 90',
+        'list',
+        'exit'
+    ])
+    assert 'MoveSquare (1): Square(bottom_left=(-12.0, 10.0), side_length=2.0)' in stdout
+    assert 'ScaleCircle (2): Circle(center=(30.0, 30.0), radius=2.0)' in stdout
+    
+    stdout, stderr = run_session([
+        'create rectangle 0 0 4 2 RotRectangle',
+        'create oval 0 0 4 1 RotOval',
+        'create parallelepiped 0 0 0 4 2 1 RotBox',
+        'rotate all 90',
+        'rotate 1 45',
+        'list',
+        'exit'
+    ])
+    # При повороте на 90° размеры по осям X и Y меняются местами
+    assert 'RotRectangle (1): Rectangle(bottom_left=(-2.0, 0.0), width=2.0, height=4.0)' in stdout
+    assert 'RotOval (2): Oval(center=(0.0, 0.0), radius_x=1.0, radius_y=4.0)' in stdout
+    assert 'width=2.0, height=4.0, depth=1.0' in stdout
+    assert 'только на углы, кратные 90°' in stdout
+
+# Тестирование пакетного режима и времени запуска
+def test_batch_startup():
+    print('\033[1;32m=== Тестирование пакетного режима ===\033[0m')
+    
+    with open('test_script.txt', 'w', encoding='utf-8') as script:
+        script.write('# Пакетный скрипт\n')
+        script.write('create point 1 2 BatchPoint\n')
+        script.write('delete 1\n')
+        script.write('list\n')
+    
+    result = subprocess.run(
+        ['python3', 'main.py', '--batch', 'test_script.txt'],
+        capture_output=True,
+        text=True
+    )
+    os.remove('test_script.txt')
+    print('\033[1;36mРезультат:\033[0m')
+    print(result.stdout)
+    assert 'Удалена фигура: BatchPoint' in result.stdout
+    assert 'Список фигур пуст' in result.stdout
+    
+    result = subprocess.run(
+        ['python3', 'bench_startup.py', '--runs', '3', '--budget-ms', '1000'],
+        capture_output=True,
+        text=True
+    )
+    print(result.stdout)
+    assert result.returncode == 0
+
+# Тестирование разбора параметров фигур
+def test_create_parsing():
+    print('\033[1;32m=== Тестирование разбора параметров ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create polygon 0 0 6 6 Hexagon',
+        'create polygon 0 0 6.5 2',
+        'create circle 1 1',
+        'exit'
+    ])
+    assert 'Hexagon (1): RegularPolygon(center=(0.0, 0.0), sides=6, side_length=6.0)' in stdout
+    assert 'num_sides должен быть целым числом' in stdout
+    assert 'Недостаточно параметров' in stdout
+
+# Тестирование профилирования команд
+def test_profiling():
+    print('\033[1;32m=== Тестирование профилирования ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'profile on',
+        'mem snapshot',
+        'create oval 10 10 5 3 ProfiledOval',
+        'info 1',
+        'mem diff',
+        'profile off',
+        'mem off',
+        'exit'
+    ])
+    assert 'Самые затратные функции' in stdout
+    assert 'show_shape_info' in stdout
+    assert 'Места выделения памяти' in stdout
+
+# Тестирование метрик производительности
+def test_metrics():
+    print('\033[1;32m=== Тестирование метрик ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create point 1 1 MetricPoint',
+        'create point 2 2 MetricPoint2',
+        'metrics export test_metrics.prom 0',
+        'list',
+        'metrics',
+        'exit'
+    ])
+    assert 'Задержки команд' in stdout
+    with open('test_metrics.prom', encoding='utf-8') as file:
+        exported = file.read()
+    os.remove('test_metrics.prom')
+    assert 'vector_editor_command_duration_seconds_count{command="create"} 2' in exported
+    assert 'vector_editor_shapes_created_total 2' in exported
+    
+    # Ошибка периодической записи выключает экспорт, а не прерывает каждую команду
+    from metrics import Metrics
+    metrics = Metrics()
+    os.makedirs('test_metrics_dir', exist_ok=True)
+    metrics.export_path = os.path.join('test_metrics_dir', 'm.prom')
+    metrics.export_interval = 0
+    metrics.export()
+    os.remove(metrics.export_path)
+    os.rmdir('test_metrics_dir')
+    assert isinstance(metrics.maybe_export(), OSError)
+    assert metrics.export_path is None
+    assert metrics.maybe_export() is None
+
+# Тестирование сжатого сохранения и загрузки
+def test_compressed_save_load():
+    print('\033[1;32m=== Тестирование сжатого сохранения ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create polygon 5 5 6 2 PackedPolygon',
+        'create tetrahedron 1 1 1 3 PackedTetrahedron',
+        'save test_packed --compress lzma',
+        'clear',
+        'y',
+        'load test_packed',
+        'list',
+        'exit'
+    ])
+    os.remove('test_packed.shapes')
+    assert 'Загружено фигур: 2' in stdout
+    assert 'PackedPolygon (1): RegularPolygon(center=(5.0, 5.0), sides=6, side_length=2.0)' in stdout
+    assert 'PackedTetrahedron (2): Tetrahedron(center=(1.0, 1.0, 1.0), edge_length=3.0)' in stdout
+
+# Тестирование общих записей геометрии
+def test_shared_geometry():
+    print('\033[1;32m=== Тестирование общих записей геометрии ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create polygon 0 0 6 1 SharedA',
+        'create polygon 5 5 6 1 SharedB',
+        'info 1',
+        'scale 2 2',
+        'info 2',
+        'info 1',
+        'exit'
+    ])
+    # Масштабированная фигура получает новую запись, метрики второй не меняются
+    assert stdout.count('2.598076211353317') == 2
+    assert '10.392304845413268' in stdout
+
+# Тестирование сохранения и загрузки сцены из шардов
+def test_sharded_save_load():
+    print('\033[1;32m=== Тестирование сцены из шардов ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create circle 0 0 1 ShardCircle',
+        'create square 1 1 2 ShardSquare',
+        'create tetrahedron 0 0 0 1 ShardTetrahedron',
+        'save test_sharded --shards 2',
+        'clear',
+        'y',
+        'load test_sharded',
+        'list',
+        'create point 0 0 AfterLoad',
+        'save test_resharded --shards 3',
+        'save test_resharded --shards 1',
+        'exit'
+    ])
+    with open('test_sharded.shapes', encoding='utf-8') as file:
+        manifest = json.load(file)
+    for entry in manifest['shards']:
+        os.remove(entry['file'])
+    os.remove('test_sharded.shapes')
+    # Повторное сохранение удаляет шарды прежнего сохранения
+    resharded = [name for name in os.listdir('.') if name.startswith('test_resharded.') and name.endswith('.shard')]
+    for name in resharded + ['test_resharded.shapes']:
+        os.remove(name)
+    assert len(resharded) == 1
+    assert len(manifest['shards']) == 2
+    assert manifest['next_id'] == 4
+    assert 'Загружено фигур: 3' in stdout
+    assert 'ShardTetrahedron (3)' in stdout
+    assert 'AfterLoad (4)' in stdout
+
+# Тестирование прерванного сохранения в шарды
+def test_sharded_save_interrupted():
+    print('\033[1;32m=== Тестирование прерванного сохранения в шарды ===\033[0m')
+    
+    import scene_shards
+    from shapes_2d import Circle, Square
+    
+    def fail_manifest(path, manifest):
+        raise OSError("Сбой перед записью манифеста")
+    
+    path = 'test_interrupted.shapes'
+    write_manifest = scene_shards._write_manifest
+    try:
+        scene_shards.write_sharded_scene(path, {1: Circle(0, 0, 1)}, 2, 2)
+        # Сбой между записью шардов и записью манифеста
+        scene_shards._write_manifest = fail_manifest
+        try:
+            scene_shards.write_sharded_scene(path, {1: Square(0, 0, 1), 2: Square(1, 1, 2)}, 3, 2)
+        except OSError:
+            pass
+        else:
+            assert False, "Ожидался сбой сохранения"
+        scene_shards._write_manifest = write_manifest
+        with open(path, 'rb') as file:
+            shapes, next_id, _ = scene_shards.read_sharded_scene(file, '.')
+        assert next_id == 2
+        assert isinstance(shapes[1], Circle) and len(shapes) == 1
+        shard_files = [name for name in os.listdir('.') if name.startswith('test_interrupted.') and name.endswith('.shard')]
+        assert len(shard_files) == 1
+    finally:
+        scene_shards._write_manifest = write_manifest
+        for name in os.listdir('.'):
+            if name.startswith('test_interrupted.'):
+                os.remove(name)
+
+# Тестирование фонового автосохранения
+def test_autosave():
+    print('\033[1;32m=== Тестирование автосохранения ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'autosave test_autosave 0',
+        'create circle 0 0 1 AutoCircle',
+        'move all 2 3',
+        'autosave',
+        'exit'
+    ])
+    assert "Сцена сохраняется в файл 'test_autosave.shapes'" in stdout
+    
+    # При выходе записываются последние изменения
+    stdout, stderr = run_session([
+        'load test_autosave',
+        'list',
+        'exit'
+    ])
+    os.remove('test_autosave.shapes')
+    assert 'AutoCircle (1): Circle(center=(2.0, 3.0), radius=1.0)' in stdout
+
+# Тестирование объединения сцен
+def test_merge():
+    print('\033[1;32m=== Тестирование объединения сцен ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create circle 0 0 1 MergeCircle',
+        'create tetrahedron 1 1 1 2 MergeTetrahedron',
+        'save test_merge --compress',
+        'merge test_merge',
+        'merge test_merge',
+        'list',
+        'create point 0 0 AfterMerge',
+        'exit'
+    ])
+    os.remove('test_merge.shapes')
+    assert 'Добавлено фигур из файла' in stdout and '(ID 5-6)' in stdout
+    assert 'MergeCircle (5): Circle' in stdout
+    assert 'MergeTetrahedron (6): Tetrahedron' in stdout
+    assert 'AfterMerge (7)' in stdout
+
+# Тестирование языка запросов
+def test_select():
+    print('\033[1;32m=== Тестирование запросов select ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create circle 0 0 5 BigCircle',
+        'create circle 200 0 5 FarCircle',
+        'create circle 1 1 1 SmallCircle',
+        'create square 0 0 4 QuerySquare',
+        'select type=circle and area>10 and center_x<100',
+        'list selected',
+        'select (type=square or radius<2) and not name=SmallCircle',
+        'select foo>1',
+        'select type=circle',
+        'delete selected',
+        'y',
+        'list',
+        'exit'
+    ])
+    assert 'Найдено фигур: 1' in stdout
+    assert 'ID: 1\n' in stdout and 'ID: 4\n' in stdout
+    assert "Неизвестное поле 'foo'" in stdout
+    assert 'Удалено фигур: 3' in stdout
+    assert stdout.rstrip().count('QuerySquare (4)') == 2
+
+# Тестирование ранжирования фигур
+def test_top_and_sort():
+    print('\033[1;32m=== Тестирование top и list --sort-by ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create circle 0 0 5 BigCircle',
+        'create circle 200 0 2 SmallCircle',
+        'create square 0 0 4 MidSquare',
+        'create tetrahedron 0 0 0 3 Solid',
+        'top 2 by area',
+        'list --sort-by area --desc',
+        'exit'
+    ])
+    top = stdout.split('наибольшим значением area')[1]
+    assert top.index('BigCircle (1)') < top.index('MidSquare (3)')
+    assert 'SmallCircle (2)' not in top.split('Список фигур')[0]
+    listing = stdout.split('Список фигур')[1]
+    assert listing.index('BigCircle') < listing.index('MidSquare') < listing.index('SmallCircle') < listing.index('Solid')
+
+# Тестирование групп фигур
+def test_groups():
+    print('\033[1;32m=== Тестирование групп ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create square 0 0 2 GroupSquare',
+        'create square 10 0 1 GroupSquare2',
+        'create tetrahedron 0 0 0 1 GroupTetrahedron',
+        'group 1,3 Mixed',
+        'group 1-2 Squares',
+        'move 4 1 1',
+        'info 4',
+        'ungroup 4',
+        'list',
+        'exit'
+    ])
+    assert 'только 2D или только 3D' in stdout
+    assert 'Создана группа: Squares (4): Group2D(children=2, shapes=2)' in stdout
+    info = stdout.split('Информация о фигуре 4')[1].split('Разгруппировано')[0]
+    assert ': 5.0' in info  # суммарная площадь
+    assert ': 12.0' in info  # суммарный периметр
+    assert '12.0,' in info  # правая граница общего бокса после перемещения
+    assert 'Разгруппировано фигур: 2' in stdout
+    assert 'GroupSquare2 (2): Square(bottom_left=(11.0, 1.0), side_length=1.0)' in stdout
+    # После разгруппировки list снова выводит фигуры по возрастанию ID
+    listing = stdout.split('Разгруппировано фигур: 2')[1]
+    assert listing.index('GroupSquare (1)') < listing.index('GroupSquare2 (2)') < listing.index('GroupTetrahedron (3)')
+
+# Тестирование тесселяции фигур
+def test_mesh():
+    print('\033[1;32m=== Тестирование тесселяции ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create circle 0 0 1 MeshCircle',
+        'create polygon 0 0 6 1 MeshPolygon',
+        'create rectangle 0 0 2 1 MeshRectangle',
+        'create tetrahedron 0 0 0 1 MeshTetrahedron',
+        'create parallelepiped 0 0 0 1 1 1 MeshBox',
+        'mesh all',
+        'mesh 1 0',
+        'group 1-3 Flat',
+        'mesh 6 0',
+        'mesh all 9',
+        'exit'
+    ])
+    assert '1\033[0m: вершин 32, треугольников 30' in stdout
+    assert '2\033[0m: вершин 6, треугольников 4' in stdout
+    assert '4\033[0m: вершин 4, треугольников 4' in stdout
+    assert '5\033[0m: вершин 8, треугольников 12' in stdout
+    assert 'Сетки фигур: 5, вершин 54, треугольников 52 (lod 2' in stdout
+    assert '1\033[0m: вершин 8, треугольников 6' in stdout
+    # Сетка группы объединяет сетки дочерних фигур
+    assert '6\033[0m: вершин 18, треугольников 12' in stdout
+    assert 'Уровень детализации должен быть целым числом от 0 до 8' in stdout
+
+# Тестирование проверки попадания точек
+def test_hit():
+    print('\033[1;32m=== Тестирование проверки попадания ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create circle 0 0 2 HitCircle',
+        'create polygon 0 0 6 2 HitHexagon',
+        'create square 1 1 2 HitSquare',
+        'create line 0 0 4 4 HitLine',
+        'create oval 10 0 3 1 HitOval',
+        'group 1,3 HitGroup',
+        'hit 1.2 1.2 --tol 0.01',
+        'hit 1.9 0 10 0.9 12 1 5 5',
+        'hit --sample 1000',
+        'hit 1 2 3',
+        'exit'
+    ])
+    # Точка на отрезке внутри группы, шестиугольника и квадрата
+    assert 'Точка (1.2, 1.2): фигур 3' in stdout
+    assert '2\033[0m: \033[1;37mHitHexagon' in stdout
+    # Угол шестиугольника с нижней горизонтальной стороной - на оси X (радиус 2)
+    assert 'Точка (1.9, 0): фигур 2' in stdout
+    assert 'Точка (10, 0.9): фигур 1' in stdout
+    assert 'Точка (12, 1): фигур нет' in stdout
+    assert 'Точка (5, 5): фигур нет' in stdout
+    assert 'Точек: 1000, попавших в фигуры' in stdout
+    assert 'Координаты точек должны задаваться парами' in stdout
+    
+    # Проверка по контурам сетки учитывает точки на всех сторонах фигуры
+    from hittest import _hit_mesh
+    from shapes_2d import Square
+    assert _hit_mesh(Square(0, 0, 2), [2, 1, 0, 1, 3], [1, 2, 1, 0, 1], range(5), 0) == [0, 1, 2, 3]
+
+# Тестирование площади покрытия
+def test_coverage():
+    print('\033[1;32m=== Тестирование площади покрытия ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create square 0 0 2 CoverSquare',
+        'create rectangle 1 1 2 2 CoverRectangle',
+        'create circle 10 10 1 CoverCircle',
+        'create circle 10.5 10 1 CoverCircle2',
+        'create tetrahedron 0 0 0 1 CoverTetrahedron',
+        'coverage 1-2',
+        'coverage all --error 0.00001',
+        'coverage 5',
+        'exit'
+    ])
+    # Прямоугольники - точно, перекрытие 1x1 учитывается один раз
+    assert 'Площадь объединения: \033[1;32m7\033[0m (точно)' in stdout
+    assert 'Площадь перекрытий: 1\n' in stdout
+    # 7 + 2*pi - площадь линзы двух единичных кругов на расстоянии 0.5 = 11.13108
+    union = stdout.split('Покрытие 2D фигур: 4')[1]
+    assert 'Площадь объединения: \033[1;32m11.131 ±' in union
+    assert 'Выборка не содержит 2D фигур' in stdout
+
+# Тестирование контроля регрессий производительности
+def test_bench_regression():
+    print('\033[1;32m=== Тестирование контроля регрессий ===\033[0m')
+    
+    command = ['python3', 'bench_regression.py', '--count', '90', '--runs', '1',
+               '--baseline', 'test_baselines.json', '--machine', 'test']
+    try:
+        first = subprocess.run(command, capture_output=True, text=True)
+        print(first.stdout)
+        assert first.returncode == 0
+        assert 'Базовые значения сохранены' in first.stdout
+        
+        # Уменьшенные базовые значения имитируют регрессию всех операций
+        with open('test_baselines.json', encoding='utf-8') as file:
+            baselines = json.load(file)
+        assert 'create.tetrahedron' in baselines['test']['metrics']
+        assert 'save_load.compressed' in baselines['test']['metrics']
+        for metrics in baselines['test']['metrics'].values():
+            metrics['time'] /= 100
+            metrics['peak'] //= 100
+        with open('test_baselines.json', 'w', encoding='utf-8') as file:
+            json.dump(baselines, file)
+        
+        second = subprocess.run(command, capture_output=True, text=True)
+        print(second.stdout)
+        assert second.returncode == 1
+        assert 'обнаружены регрессии' in second.stdout
+        assert 'to_json: время +' in second.stdout
+    finally:
+        os.remove('test_baselines.json')
+
+# Тестирование оценки памяти сцены
+def test_memstat():
+    print('\033[1;32m=== Тестирование оценки памяти сцены ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create square 0 0 2 MemSquare',
+        'create square 5 5 2 MemSquare2',
+        'create circle 0 0 1 MemCircle',
+        'create tetrahedron 0 0 0 1 MemTetrahedron',
+        'group 1-2 MemGroup',
+        'memstat',
+        'memstat 1',
+        'memstat 0',
+        'exit'
+    ])
+    assert 'Память сцены (3 фигур' in stdout
+    for category in ('object', 'attributes', 'names', 'index', 'caches'):
+        assert category in stdout
+    # Группа учитывается как отдельный тип вместе с вложенными фигурами
+    assert 'Group2D' in stdout
+    assert 'Tetrahedron' in stdout
+    assert 'Общие структуры: словарь фигур' in stdout
+    assert 'Итого по оценке:' in stdout
+    assert 'RSS процесса' in stdout
+    assert 'Размер выборки должен быть положительным целым числом' in stdout
+
+# Тестирование информации и удаления по диапазонам ID
+def test_info_delete_ranges():
+    print('\033[1;32m=== Тестирование info и delete для выборок ===\033[0m')
+    
+    stdout, stderr = run_session([
+        'create circle 0 0 1 RangeCircle',
+        'create square 1 1 2 RangeSquare',
+        'create tetrahedron 0 0 0 3 RangeTetrahedron',
+        'create point 5 5 RangePoint',
+        'create line 0 0 1 1 RangeLine',
+        'info 1-3',
+        'info 2,4 --ndjson',
+        'delete 1,3-4',
+        'y',
+        'delete 7-9',
+        'list',
+        'exit'
+    ])
+    assert 'Информация о фигурах (3 шт.)' in stdout
+    assert 'RangeTetrahedron' in stdout
+    assert '{"id":2,"name":"RangeSquare","type":"Square"' in stdout
+    assert '{"id":4,"name":"RangePoint","type":"Point"' in stdout
+    # Одно подтверждение на всю выборку
+    assert stdout.count('(y/n)') == 1
+    assert 'удалить фигуры 1,3-4 (3 шт.)' in stdout
+    assert 'Удалено фигур: 3' in stdout
+    assert 'Выборка не содержит фигур' in stdout
+    remaining = stdout.split('Список фигур:')[1]
+    assert 'RangeSquare' in remaining and 'RangeLine' in remaining
+    assert 'RangeCircle' not in remaining and 'RangePoint' not in remaining
+
+# Тестирование матрицы расстояний
+def test_distances():
+    print('\033[1;32m=== Тестирование матрицы расстояний ===\033[0m')
+    
+    try:
+        stdout, stderr = run_session([
+            'create circle 0 0 1 DistCircle',
+            'create circle 3 4 1 DistCircle2',
+            'create square -1 -1 2 DistSquare',
+            'create tetrahedron 0 0 0 1 DistTetrahedron',
+            'distances 1-3 test_distances --tile 2',
+            'distances 1-2 test_boundary --boundary --dtype f4',
+            'distances 1-3 test_bad --boundary',
+            'distances all test_bad',
+            'exit'
+        ])
+        assert "Матрица расстояний между центрами 3x3" in stdout
+        assert "Матрица расстояний между границами 2x2" in stdout
+        assert 'вычисляются только для кругов' in stdout
+        assert 'фигуры одной размерности' in stdout
+        
+        def read_npy(filename, typecode):
+            with open(filename, 'rb') as file:
+                data = file.read()
+            assert data[:8] == b'\x93NUMPY\x01\x00'
+            header_length = struct.unpack('<H', data[8:10])[0]
+            assert (10 + header_length) % 64 == 0
+            values = array(typecode)
+            values.frombytes(data[10 + header_length:])
+            return data[10:10 + header_length].decode('latin-1'), list(values)
+        
+        header, matrix = read_npy('test_distances.npy', 'd')
+        assert "'descr': '<f8'" in header and "'shape': (3, 3)" in header
+        # Центр квадрата совпадает с центром первого круга
+        assert matrix == [0.0, 5.0, 0.0, 5.0, 0.0, 5.0, 0.0, 5.0, 0.0]
+        header, ids = read_npy('test_distances.ids.npy', 'q')
+        assert ids == [1, 2, 3]
+        header, matrix = read_npy('test_boundary.npy', 'f')
+        assert "'descr': '<f4'" in header
+        assert matrix == [0.0, 3.0, 3.0, 0.0]
+    finally:
+        for filename in ('test_distances.npy', 'test_distances.ids.npy', 'test_boundary.npy', 'test_boundary.ids.npy'):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+# Тестирование экспорта в STL
+def test_export_stl():
+    print('\033[1;32m=== Тестирование экспорта в STL ===\033[0m')
+    
+    try:
+        stdout, stderr = run_session([
+            'create parallelepiped 0 0 0 1 2 3 StlBox',
+            'create tetrahedron 5 5 5 2 StlTetrahedron',
+            'create circle 0 0 1 StlCircle',
+            'export stl test_export',
+            'export stl test_empty 3',
+            'export obj test_export',
+            'exit'
+        ])
+        assert "Фигуры экспортированы в файл 'test_export.stl': фигур 2, треугольников 16" in stdout
+        assert 'Пропущено 2D фигур: 1' in stdout
+        assert 'Выборка не содержит 3D фигур' in stdout
+        assert 'Неверные аргументы команды export' in stdout
+        
+        with open('test_export.stl', 'rb') as file:
+            data = file.read()
+        count = struct.unpack('<I', data[80:84])[0]
+        assert count == 16 and len(data) == 84 + 50 * count
+        # Объем по теореме о дивергенции: 1*2*3 + 2**3 / (6 * sqrt(2))
+        volume = 0.0
+        for record in struct.iter_unpack('<12fH', data[84:]):
+            ax, ay, az, bx, by, bz, cx, cy, cz = record[3:12]
+            volume += (ax * (by * cz - bz * cy) - ay * (bx * cz - bz * cx) + az * (bx * cy - by * cx)) / 6
+        assert abs(volume - (6 + 8 / (6 * 2 ** 0.5))) < 1e-4
+    finally:
+        if os.path.exists('test_export.stl'):
+            os.remove('test_export.stl')
+
+# Тестирование сравнения сцен
+def test_diff():
+    print('\033[1;32m=== Тестирование сравнения сцен ===\033[0m')
+    
+    files = ['test_diff_a.shapes', 'test_diff_b.shapes', 'test_diff_p.shapes', 'test_diff_s.shapes']
+    try:
+        stdout, stderr = run_session([
+            'create circle 0 0 1 DiffCircle',
+            'create square 1 1 2 DiffSquare',
+            'create tetrahedron 0 0 0 1 DiffTetrahedron',
+            'create point 5 5 DiffPoint',
+            'save test_diff_a --compress',
+            'delete 2',
+            'y',
+            'scale 3 2',
+            'create line 0 0 1 1 DiffLine',
+            'save test_diff_b --compress',
+            'save test_diff_p',
+            'save test_diff_s --shards 2',
+            'diff test_diff_a test_diff_b',
+            'diff test_diff_a test_diff_p',
+            'diff test_diff_b test_diff_s',
+            'diff test_diff_a',
+            'diff test_diff_a test_diff_missing',
+            'exit'
+        ])
+        comparisons = stdout.split('Сравнение ')[1:]
+        assert len(comparisons) == 3
+        for text in comparisons[:2]:
+            assert 'Добавлено: 1 (5)' in text and 'DiffLine' in text
+            assert 'Удалено: 1 (2)' in text and 'DiffSquare' in text
+            assert 'Изменено: 1 (3)' in text and 'edge_length=2.0' in text
+            assert 'DiffCircle' not in text and 'DiffPoint' not in text
+        # В первом сравнении блоки круга и точки совпали и не распаковывались
+        assert 'совпали без чтения: 4 (фигур 2), прочитано фигур: 4' in comparisons[0]
+        assert 'Сцены совпадают' in comparisons[2]
+        assert 'Укажите два файла сцены' in stdout
+        assert "Файл 'test_diff_missing.shapes' не найден" in stdout
+    finally:
+        shard_files = [name for name in os.listdir('.') if name.startswith('test_diff_s.') and name.endswith('.shard')]
+        for filename in files + shard_files:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+def test_shared_scene():
+    print('\033[1;32m=== Тестирование сцены в разделяемой памяти ===\033[0m')
+    
+    from shared_scene import attach_scene
+    
+    name = f'vshm_test_{os.getpid()}'
+    process = subprocess.Popen(
+        ['python3', 'main.py'],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    try:
+        for cmd in ['create circle 1 2 3 SharedCircle', 'create circle 4 5 6 Круг',
+                    'create polygon 0 0 6 2 SharedPolygon', 'create square 0 0 1',
+                    'group 3,4 SharedGroup', 'share', f'share publish {name}']:
+            process.stdin.write(cmd + '\n')
+        process.stdin.flush()
+        time.sleep(1.0)
+        
+        # Другой процесс читает столбцы опубликованной сцены без копирования
+        scene = attach_scene(name)
+        try:
+            assert scene.count == 3 and scene.next_id == 6
+            circles = scene.types['shapes_2d.Circle']
+            assert list(circles.ids) == [1, 2]
+            assert list(circles.column('radius')) == [3.0, 6.0]
+            assert circles.name(1) == 'Круг'
+            try:
+                circles.column('radius')[0] = 0
+                assert False, 'столбец доступен для записи'
+            except TypeError:
+                pass
+            shapes = dict(scene.iter_shapes())
+            assert shapes[2].radius == 6.0 and shapes[2].name == 'Круг'
+            assert [child.name for child in shapes[5].children] == ['SharedPolygon', 'Square 4']
+        finally:
+            scene.close()
+        
+        for cmd in ['share', f'share publish {name}', 'share off', 'share off', 'share publish', 'exit']:
+            process.stdin.write(cmd + '\n')
+    finally:
+        stdout, stderr = process.communicate()
+    print('\033[1;36mРезультат:\033[0m')
+    print(stdout)
+    
+    assert 'Сцена не опубликована' in stdout
+    assert "Снимок сцены (3 фигур" in stdout and f"в разделяемой памяти '{name}'" in stdout
+    assert 'Фигур: 3, классов в столбцах: 1' in stdout
+    assert f"Блок разделяемой памяти '{name}' удален" in stdout
+    assert not stderr
+    # При выходе из редактора блок удаляется
+    try:
+        attach_scene(name).close()
+        assert False, 'блок разделяемой памяти не удален'
+    except FileNotFoundError:
+        pass
+    print('\033[1;35m' + '-' * 60 + '\033[0m')
+
+# Тестирование многоугольников и ломаных с массивом вершин
+def test_polygons():
+    print('\033[1;32m=== Тестирование многоугольников и ломаных ===\033[0m')
+    
+    with open('test_vertices.txt', 'w', encoding='utf-8') as file:
+        file.write('0,0\n4,0\n4,1\n1,1\n1,3\n0,3\n0,0\n')
+    try:
+        stdout, stderr = run_session([
+            'create poly 0 0 4 0 4 1 1 1 1 3 0 3 Notch',
+            'create poly @test_vertices.txt FileNotch',
+            'create polyline 0 0 3 4 6 0 Zigzag',
+            'create poly 0 0 1 1',
+            'create poly @missing_vertices.txt',
+            'info 1',
+            'info 3',
+            'mesh 1',
+            'hit 0.5 2 3 2 3 0.5 --tol 0.1',
+            'hit 3 4 --tol 0.1',
+            'select type=poly and vertex_count=6',
+            'move 2 10 0',
+            'save test_polygons --compress',
+            'clear',
+            'y',
+            'load test_polygons',
+            'list',
+            'exit'
+        ])
+    finally:
+        os.remove('test_vertices.txt')
+        if os.path.exists('test_polygons.shapes'):
+            os.remove('test_polygons.shapes')
+    assert 'Notch (1): Polygon(vertices=6, bbox=(0.0, 0.0, 4.0, 3.0))' in stdout
+    # Замыкающая вершина файла, совпадающая с первой, не хранится
+    assert 'FileNotch (2): Polygon(vertices=6, bbox=(0.0, 0.0, 4.0, 3.0))' in stdout
+    assert 'Недостаточно параметров для создания фигуры' in stdout
+    assert 'Не удалось прочитать файл вершин' in stdout
+    assert 'area\033[1;34m"\033[0m\033[0m: 6.0' in stdout
+    assert 'perimeter\033[1;34m"\033[0m\033[0m: 14.0' in stdout
+    assert 'perimeter\033[1;34m"\033[0m\033[0m: 10.0' in stdout  # длина ломаной
+    # Невыпуклый шестиугольник разбивается на 4 треугольника
+    assert '1\033[0m: вершин 6, треугольников 4' in stdout
+    # Точка в вырезе многоугольника не попадает в него
+    assert 'Точка (0.5, 2): фигур 2' in stdout
+    assert 'Точка (3, 2): фигур нет' in stdout
+    assert 'Точка (3, 0.5): фигур 2' in stdout
+    assert 'Точка (3, 4): фигур 1' in stdout
+    assert 'Найдено фигур: 2' in stdout
+    assert 'Загружено фигур: 3' in stdout
+    assert 'FileNotch (2): Polygon(vertices=6, bbox=(10.0, 0.0, 14.0, 3.0))' in stdout
+    assert 'Zigzag (3): Polyline(vertices=3, bbox=(0.0, 0.0, 6.0, 4.0))' in stdout
+    
+    stdout, stderr = run_session([
+        'create poly 0 0 2 0 2 2 0 2 Square',
+        'create poly 0 0 1 0 2 0 Flat',
+        'create poly 0 0 2 0 2 2 0',
+        'hit 2 1 1 2 3 1',
+        'mesh all',
+        'coverage all',
+        'exit'
+    ])
+    assert 'Traceback' not in stderr
+    assert 'Координаты вершин должны задаваться парами x y' in stdout
+    # Точки на правой и верхней сторонах попадают в многоугольник
+    assert 'Точка (2, 1): фигур 1' in stdout
+    assert 'Точка (1, 2): фигур 1' in stdout
+    assert 'Точка (3, 1): фигур нет' in stdout
+    # Многоугольник нулевой площади не дает треугольников
+    assert '2\033[0m: вершин 3, треугольников 0' in stdout
+    assert 'Покрытие 2D фигур: 2' in stdout
+
 # Запуск всех тестов
 def run_all_tests():
     print('\033[1;32m======= НАЧАЛО ТЕСТИРОВАНИЯ =======\033[0m')
@@ -202,6 +1013,32 @@ def run_all_tests():
     test_shape_info()
     test_save_load()
     test_delete()
+    test_query3d()
+    test_transforms()
+    test_batch_startup()
+    test_create_parsing()
+    test_profiling()
+    test_metrics()
+    test_compressed_save_load()
+    test_shared_geometry()
+    test_sharded_save_load()
+    test_sharded_save_interrupted()
+    test_autosave()
+    test_merge()
+    test_select()
+    test_top_and_sort()
+    test_groups()
+    test_mesh()
+    test_hit()
+    test_coverage()
+    test_bench_regression()
+    test_memstat()
+    test_info_delete_ranges()
+    test_distances()
+    test_export_stl()
+    test_diff()
+    test_shared_scene()
+    test_polygons()
     
     print('\033[1;32m======= ТЕСТИРОВАНИЕ ЗАВЕРШЕНО =======\033[0m')
 
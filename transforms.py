@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Пакетные аффинные преобразования фигур.
+
+Фигуры группируются по классу, после чего координаты каждой группы
+извлекаются в столбцы, преобразуются за один проход и записываются обратно.
+Геометрия класса описывается атрибутами COORDS, SIZES и ANCHOR_SIZES (см. shape.py).
+Массив вершин фигур с VERTICES преобразуется целиком и заменяется новым
+массивом: исходный может разделяться копиями фигуры и кэшами сеток.
+"""
+
+import math
+from array import array
+from itertools import chain, cycle, repeat
+from operator import add, attrgetter, mul, sub
+
+
+def group_by_class(shapes):
+    """
+    Сгруппировать фигуры по классу (группы заменяются вложенными в них фигурами).
+    
+    Args:
+        shapes (iterable): Фигуры
+    
+    Returns:
+        dict: Словарь класс -> список фигур
+    """
+    groups = {}
+    for shape in shapes:
+        if type(shape).COMPOSITE:
+            for leaf in shape.iter_leaves():
+                groups.setdefault(type(leaf), []).append(leaf)
+        else:
+            groups.setdefault(type(shape), []).append(shape)
+    return groups
+
+
+def _column(shapes, attr):
+    """Извлечь значения атрибута фигур в список."""
+    return list(map(attrgetter(attr), shapes))
+
+
+def _store(shapes, attr, values):
+    """Записать значения атрибута обратно в фигуры."""
+    for shape, value in zip(shapes, values):
+        setattr(shape, attr, value)
+
+
+def _notify_parents(shapes):
+    """Сообщить группам, содержащим фигуры, что их геометрия изменилась."""
+    for shape in shapes:
+        if shape.parent is not None:
+            shape.parent.mark_dirty()
+
+
+def _rotate_vertices(vertices, cos_a, sin_a, px, py):
+    """Получить новый массив вершин x, y, повернутых вокруг точки."""
+    xs = [x - px for x in vertices[0::2]]
+    ys = [y - py for y in vertices[1::2]]
+    new_xs = [px + x * cos_a - y * sin_a for x, y in zip(xs, ys)]
+    new_ys = [py + x * sin_a + y * cos_a for x, y in zip(xs, ys)]
+    return array('d', chain.from_iterable(zip(new_xs, new_ys)))
+
+
+def move_shapes(shapes, dx, dy, dz=0.0):
+    """
+    Переместить фигуры.
+    
+    Args:
+        shapes (iterable): Фигуры
+        dx (float): Смещение по оси X
+        dy (float): Смещение по оси Y
+        dz (float, optional): Смещение по оси Z (только для 3D фигур)
+    """
+    offsets = (dx, dy, dz)
+    for cls, group in group_by_class(shapes).items():
+        for point in cls.COORDS:
+            for attr, offset in zip(point, offsets):
+                if offset:
+                    _store(group, attr, [value + offset for value in _column(group, attr)])
+        if cls.VERTICES:
+            _store(group, cls.VERTICES, [array('d', map(add, vertices, cycle((dx, dy))))
+                                         for vertices in _column(group, cls.VERTICES)])
+        _notify_parents(group)
+
+
+def scale_shapes(shapes, factor, px=0.0, py=0.0, pz=0.0):
+    """
+    Масштабировать фигуры относительно точки.
+    
+    Args:
+        shapes (iterable): Фигуры
+        factor (float): Коэффициент масштабирования (положительный)
+        px (float, optional): X-координата центра масштабирования
+        py (float, optional): Y-координата центра масштабирования
+        pz (float, optional): Z-координата центра масштабирования
+    
+    Raises:
+        ValueError: Если коэффициент не положительный
+    """
+    if factor <= 0:
+        raise ValueError("Коэффициент масштабирования должен быть положительным числом")
+    pivot = (px, py, pz)
+    for cls, group in group_by_class(shapes).items():
+        for point in cls.COORDS:
+            for attr, origin in zip(point, pivot):
+                _store(group, attr, [origin + (value - origin) * factor
+                                     for value in _column(group, attr)])
+        for attr in cls.SIZES:
+            _store(group, attr, [value * factor for value in _column(group, attr)])
+        if cls.VERTICES:
+            origin = (px, py)
+            _store(group, cls.VERTICES,
+                   [array('d', map(add, map(mul, map(sub, vertices, cycle(origin)), repeat(factor)), cycle(origin)))
+                    for vertices in _column(group, cls.VERTICES)])
+        if cls.SIZES:
+            # Размеры входят в геометрию фигуры - общие записи больше не подходят
+            for shape in group:
+                shape.invalidate_caches()
+        else:
+            _notify_parents(group)
+
+
+def rotate_shapes(shapes, angle, px=0.0, py=0.0):
+    """
+    Повернуть фигуры вокруг точки в плоскости XY (для 3D фигур - вокруг оси Z).
+    
+    Опорные точки фигур поворачиваются вокруг центра поворота. У фигур,
+    выровненных по осям (AXIS_SIZES: квадрат, прямоугольник, овал,
+    параллелепипед), при повороте на 90° и 270° размеры по осям X и Y
+    меняются местами; на углы, не кратные 90°, такие фигуры не поворачиваются.
+    Правильный многоугольник и тетраэдр не хранят ориентацию, поэтому у них
+    поворачивается только центр.
+    
+    Args:
+        shapes (iterable): Фигуры
+        angle (float): Угол поворота в градусах против часовой стрелки
+        px (float, optional): X-координата центра поворота
+        py (float, optional): Y-координата центра поворота
+    
+    Raises:
+        ValueError: Если угол не кратен 90°, а среди фигур есть выровненные по осям
+    """
+    groups = group_by_class(shapes)
+    quarter_turn = angle % 90 == 0
+    if not quarter_turn and any(cls.AXIS_SIZES for cls in groups):
+        raise ValueError("Фигуры, выровненные по осям (квадрат, прямоугольник, овал, параллелепипед), "
+                         "поворачиваются только на углы, кратные 90°")
+    if quarter_turn:
+        # Точные значения, чтобы повороты на 90° не накапливали ошибку округления
+        quarters = int(angle // 90) % 4
+        cos_a, sin_a = ((1.0, 0.0), (0.0, 1.0), (-1.0, 0.0), (0.0, -1.0))[quarters]
+    else:
+        radians = math.radians(angle)
+        cos_a = math.cos(radians)
+        sin_a = math.sin(radians)
+    swap = quarter_turn and quarters % 2 == 1
+    
+    for cls, group in groups.items():
+        if cls.ANCHOR_SIZES:
+            half_w = [value / 2 for value in _column(group, cls.ANCHOR_SIZES[0])]
+            half_h = [value / 2 for value in _column(group, cls.ANCHOR_SIZES[1])]
+            # После поворота на четверть оборота ширина и высота меняются местами
+            new_half_w, new_half_h = (half_h, half_w) if swap else (half_w, half_h)
+        for point in cls.COORDS:
+            attr_x, attr_y = point[0], point[1]
+            xs = _column(group, attr_x)
+            ys = _column(group, attr_y)
+            if cls.ANCHOR_SIZES:
+                xs = [x + w for x, w in zip(xs, half_w)]
+                ys = [y + h for y, h in zip(ys, half_h)]
+            new_xs = [px + (x - px) * cos_a - (y - py) * sin_a for x, y in zip(xs, ys)]
+            new_ys = [py + (x - px) * sin_a + (y - py) * cos_a for x, y in zip(xs, ys)]
+            if cls.ANCHOR_SIZES:
+                new_xs = [x - w for x, w in zip(new_xs, new_half_w)]
+                new_ys = [y - h for y, h in zip(new_ys, new_half_h)]
+            _store(group, attr_x, new_xs)
+            _store(group, attr_y, new_ys)
+        if cls.VERTICES:
+            _store(group, cls.VERTICES, [_rotate_vertices(vertices, cos_a, sin_a, px, py)
+                                         for vertices in _column(group, cls.VERTICES)])
+        attr_w, attr_h = cls.AXIS_SIZES or (None, None)
+        if swap and attr_w != attr_h:
+            widths = _column(group, attr_w)
+            _store(group, attr_w, _column(group, attr_h))
+            _store(group, attr_h, widths)
+            # Размеры входят в геометрию фигуры - общие записи больше не подходят
+            for shape in group:
+                shape.invalidate_caches()
+        else:
+            _notify_parents(group)